@@ -0,0 +1,382 @@
+# app/admission.py
+"""
+Admission control in front of the scoring pipeline.
+
+Three independent guards:
+
+- AdmissionMiddleware: rate limiting of scoring submissions (POST under
+  ADMISSION_LIMITED_PATHS) before any upload is read. Each API key listed
+  in ADMISSION_TENANT_RATES has its own token bucket at its rate; every
+  other request - no key, or a key nobody registered - shares one default
+  bucket at ADMISSION_RATE_PER_SECOND, so minting a fresh key per request
+  buys nothing. Buckets (burst ADMISSION_BURST) are GCRA: one
+  "theoretical arrival time" float per key, so a decision is a compare and
+  an add with no lock (the event loop is single threaded). Over the limit
+  -> 429 with Retry-After.
+- Priority classes: interactive routes (ADMISSION_INTERACTIVE_PATHS) run
+  as "interactive", everything else - batch, job workers, the bulk CLI -
+  as "batch". A client can downgrade itself with `X-Priority: batch`.
+- ModelGate: at most ADMISSION_MAX_MODEL_CALLS Gemini calls in flight;
+  waiting calls are served interactive first, FIFO within a class. A call
+  whose expected wait already exceeds its class's SLO
+  (ADMISSION_*_MAX_WAIT_SECONDS), or that waits that long, is shed with
+  503 instead of queueing into a timeout.
+
+Sharing across uvicorn workers: the "memory" backend keeps bucket state
+per process and divides every rate by ADMISSION_PROCESSES (default
+WEB_CONCURRENCY), which is exact when the load balancer spreads keys
+evenly. ADMISSION_BACKEND=redis keeps one GCRA value per key in Redis,
+updated atomically by a Lua script (one round trip per decision), shared
+by all workers and hosts; it needs the 'redis' package. The model-call
+cap is always per process (ADMISSION_MAX_MODEL_CALLS / processes).
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from .config import get_settings
+from .logger import logger
+from .telemetry import ADMISSION, ADMISSION_WAIT_SECONDS, MODEL_INFLIGHT
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Set per request by AdmissionMiddleware; anything outside a request (job
+# workers, the bulk CLI) is batch work
+priority_var: ContextVar[str] = ContextVar("priority", default=BATCH)
+
+
+def _processes() -> int:
+    settings = get_settings()
+    if settings.admission_processes > 0:
+        return settings.admission_processes
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+# ---------------------------------------------------------
+# Rate limiting (GCRA token buckets)
+# ---------------------------------------------------------
+class MemoryRateLimiter:
+    """
+    Per-process GCRA buckets. `allow()` returns 0.0 when the request may
+    proceed, else the seconds until it would.
+    """
+
+    # Stale buckets (full again) are pruned once the table grows past this
+    MAX_KEYS = 100_000
+
+    def __init__(self, clock=time.monotonic):
+        self._tat: Dict[str, float] = {}
+        self._clock = clock
+
+    async def allow(self, key: str, rate: float, burst: float) -> float:
+        return self.allow_now(key, rate, burst)
+
+    def allow_now(self, key: str, rate: float, burst: float) -> float:
+        now = self._clock()
+        interval = 1.0 / rate
+        tat = self._tat.get(key, now)
+        if tat < now:
+            tat = now
+        new_tat = tat + interval
+        wait = new_tat - now - burst * interval
+        if wait > 0:
+            return wait
+        self._tat[key] = new_tat
+        if len(self._tat) > self.MAX_KEYS:
+            self._prune(now)
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        # A bucket whose arrival time has passed is full: same as no entry
+        self._tat = {k: t for k, t in self._tat.items() if t > now}
+
+
+# KEYS[1] bucket key; ARGV: now, interval, burst. Returns the wait as a
+# string ("0" = allowed)
+_GCRA_LUA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then tat = now end
+local new_tat = tat + interval
+local wait = new_tat - now - tonumber(ARGV[3]) * interval
+if wait > 0 then return tostring(wait) end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000) + 1)
+return '0'
+"""
+
+
+class RedisRateLimiter:
+    """GCRA buckets in Redis, shared by every worker and host."""
+
+    def __init__(self, url: str, prefix: str = "lifestyle:admission:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("ADMISSION_BACKEND=redis requires the 'redis' package") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_LUA)
+
+    async def allow(self, key: str, rate: float, burst: float) -> float:
+        # Wall clock: comparable across hosts, unlike monotonic time
+        wait = await self._script(keys=[self.prefix + key], args=[time.time(), 1.0 / rate, burst])
+        return float(wait)
+
+
+# Shared by all requests without a registered API key
+DEFAULT_BUCKET = "default"
+
+
+def _bucket_key(api_key: str) -> str:
+    # API keys are secrets: buckets (and Redis keys) use a short hash
+    return hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+
+
+# ---------------------------------------------------------
+# Model-call concurrency gate
+# ---------------------------------------------------------
+class Overloaded(RuntimeError):
+    """A model call was shed: its wait for a slot would exceed the SLO."""
+
+    def __init__(self, priority: str, retry_after: float):
+        super().__init__(f"model calls are saturated; {priority} request shed")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class ModelGate:
+    """
+    Priority semaphore: `capacity` holders at a time, waiters woken
+    interactive first, FIFO within a class.
+
+    A new waiter is shed at once when the calls ahead of it would take
+    longer than its class's max wait (estimated from the smoothed hold
+    time), and shed later if it actually waits that long.
+    """
+
+    def __init__(self, capacity: int, max_wait: Dict[str, float]):
+        self.capacity = max(1, capacity)
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self._hold_seconds = 0.0
+        self.shed = 0
+
+    def _ahead(self, priority: str) -> int:
+        if priority == INTERACTIVE:
+            return len(self._waiters[INTERACTIVE])
+        return len(self._waiters[INTERACTIVE]) + len(self._waiters[BATCH])
+
+    def expected_wait(self, priority: str) -> float:
+        if self.in_flight < self.capacity and not self._ahead(priority):
+            return 0.0
+        return (self._ahead(priority) + 1) * (self._hold_seconds or 1.0) / self.capacity
+
+    async def acquire(self, priority: str) -> None:
+        if self.in_flight < self.capacity and not self._ahead(priority):
+            self.in_flight += 1
+            return
+
+        max_wait = self.max_wait[priority]
+        expected = self.expected_wait(priority)
+        if expected > max_wait:
+            self.shed += 1
+            raise Overloaded(priority, expected)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._waiters[priority]
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, max_wait)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            raise Overloaded(priority, self.expected_wait(priority))
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()  # granted just as we were cancelled
+            raise
+        finally:
+            if waiter in queue:
+                queue.remove(waiter)
+        # The slot was handed over by release(): in_flight already counts it
+
+    def release(self, held_seconds: float) -> None:
+        self._hold_seconds = (
+            held_seconds if not self._hold_seconds else 0.9 * self._hold_seconds + 0.1 * held_seconds
+        )
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        for priority in PRIORITIES:
+            queue = self._waiters[priority]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)  # hand the slot over
+                    return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": {p: len(q) for p, q in self._waiters.items()},
+            "hold_seconds_avg": round(self._hold_seconds, 3),
+            "shed": self.shed,
+        }
+
+
+_gate: Optional[ModelGate] = None
+
+
+def get_model_gate() -> ModelGate:
+    global _gate
+    if _gate is None:
+        settings = get_settings()
+        _gate = ModelGate(
+            math.ceil(settings.admission_max_model_calls / _processes()),
+            {
+                INTERACTIVE: settings.admission_interactive_max_wait_seconds,
+                BATCH: settings.admission_batch_max_wait_seconds,
+            },
+        )
+    return _gate
+
+
+@asynccontextmanager
+async def model_slot() -> AsyncIterator[None]:
+    """
+    Hold one of the process's model-call slots for the body, at the
+    current request's priority. Raises Overloaded when shed.
+    """
+    if get_settings().admission_max_model_calls <= 0:
+        yield
+        return
+    gate = get_model_gate()
+    priority = priority_var.get()
+    start = time.perf_counter()
+    try:
+        await gate.acquire(priority)
+    except Overloaded:
+        ADMISSION.inc(priority, "shed")
+        raise
+    waited = time.perf_counter() - start
+    ADMISSION_WAIT_SECONDS.observe(waited, priority)
+    MODEL_INFLIGHT.set(gate.in_flight)
+    held_from = time.perf_counter()
+    try:
+        yield
+    finally:
+        gate.release(time.perf_counter() - held_from)
+        MODEL_INFLIGHT.set(gate.in_flight)
+
+
+# ---------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware: sets the request's priority class and rate-limits
+    scoring submissions per registered API key (else in the shared default
+    bucket) before the body is read. The header is not authenticated here,
+    which is why unknown keys never get a bucket of their own.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        settings = get_settings()
+        self.header = settings.admission_api_key_header.lower().encode("latin-1")
+        self.limited = tuple(settings.admission_limited_paths)
+        self.interactive = tuple(settings.admission_interactive_paths)
+        processes = _processes()
+        backend = settings.admission_backend.strip().lower()
+        if backend == "memory":
+            self.limiter = MemoryRateLimiter()
+            share = processes
+        elif backend == "redis":
+            self.limiter = RedisRateLimiter(settings.admission_redis_url)
+            share = 1
+        else:
+            raise ValueError(f"Unknown ADMISSION_BACKEND: {settings.admission_backend}")
+        self.rate = settings.admission_rate_per_second / share
+        self.burst = max(1.0, settings.admission_burst / share)
+        # Raw API key -> (bucket, rate); anything else -> (DEFAULT_BUCKET, self.rate)
+        self.tenants = {
+            key: (_bucket_key(key), rate / share)
+            for key, rate in settings.admission_tenant_rates.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        api_key = None
+        downgrade = False
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                api_key = value.decode("latin-1")
+            elif name == b"x-priority":
+                downgrade = value.strip().lower() == b"batch"
+        priority = INTERACTIVE if path in self.interactive and not downgrade else BATCH
+
+        if scope["method"] == "POST" and path.startswith(self.limited):
+            key, rate = self.tenants.get(api_key, (DEFAULT_BUCKET, self.rate))
+            if rate > 0:
+                try:
+                    wait = await self.limiter.allow(key, rate, self.burst)
+                except Exception:
+                    # Fail open: a limiter outage must not take scoring down
+                    logger.warning("Rate limiter unavailable; admitting request.", exc_info=True)
+                    wait = 0.0
+                if wait > 0:
+                    ADMISSION.inc(priority, "rate_limited")
+                    await _reject(send, 429, "Rate limit exceeded.", wait)
+                    return
+            ADMISSION.inc(priority, "admitted")
+
+        token = priority_var.set(priority)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            priority_var.reset(token)
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def admission_stats() -> Dict[str, Any]:
+    settings = get_settings()
+    return {
+        "backend": settings.admission_backend,
+        "processes": _processes(),
+        "model_gate": get_model_gate().stats() if settings.admission_max_model_calls > 0 else None,
+    }
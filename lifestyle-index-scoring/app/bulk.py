@@ -0,0 +1,163 @@
+# app/bulk.py
+"""
+Offline bulk scoring of a household manifest.
+
+    python -m app.bulk manifest.jsonl --out results.jsonl --concurrency 8
+    python -m app.bulk manifest.jsonl --out results.jsonl --resume
+    python -m app.bulk manifest.jsonl --out results.jsonl --parquet results.parquet
+
+Each manifest line is a JSON object:
+
+    {"household_id": "H1", "images": ["h1/kitchen.jpg", "h1/hall.jpg"],
+     "state": "Karnataka", "city": "Bengaluru", "pincode": "560001"}
+
+Results are appended to the JSONL output as each household finishes, so the
+output file doubles as the checkpoint: --resume skips every household that
+already has a status="ok" line and retries the rest.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Iterator, Optional, Set
+
+from .config import get_settings
+from .schemas import HouseholdManifestEntry
+from .scoring_tables import reload_scoring_table
+from .services.bulk_runner import run_batch
+
+
+def iter_manifest(path: str, skip_ids: Set[str]) -> Iterator[HouseholdManifestEntry]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = HouseholdManifestEntry.parse_raw(line)
+            except ValueError as e:
+                print(f"manifest line {line_no}: skipped ({e})", file=sys.stderr)
+                continue
+            if entry.household_id not in skip_ids:
+                yield entry
+
+
+def load_checkpoint(out_path: str) -> Set[str]:
+    """
+    Return household IDs already scored successfully. A torn last line left
+    by a crash is truncated so new results append cleanly.
+    """
+    if not os.path.exists(out_path):
+        return set()
+
+    with open(out_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[: data.rfind(b"\n") + 1]
+
+    done: Set[str] = set()
+    for line in data.splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        if row.get("status") == "ok":
+            done.add(row["household_id"])
+    return done
+
+
+def write_parquet(jsonl_path: str, parquet_path: str) -> None:
+    """Flatten the JSONL results into a Parquet table (needs pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("--parquet requires the 'pyarrow' package")
+
+    rows = []
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            result = row.get("result") or {}
+            breakdown = result.get("breakdown") or {}
+            rows.append(
+                {
+                    "household_id": row["household_id"],
+                    "status": row["status"],
+                    "error": row.get("error"),
+                    "lifestyle_index": result.get("lifestyle_index"),
+                    "persona_hint": result.get("persona_hint"),
+                    "metro_flag": breakdown.get("metro_flag"),
+                    "climate_zone": breakdown.get("climate_zone"),
+                    "scoring_version": breakdown.get("scoring_version"),
+                    "result_json": json.dumps(result) if result else None,
+                }
+            )
+    pq.write_table(pa.Table.from_pylist(rows), parquet_path)
+
+
+async def run(
+    manifest: str,
+    out: str,
+    concurrency: int,
+    resume: bool,
+    image_root: Optional[str],
+) -> int:
+    done = load_checkpoint(out) if resume else set()
+    if done:
+        print(f"resuming: {len(done)} households already scored", file=sys.stderr)
+
+    ok = failed = 0
+    start = time.perf_counter()
+    with open(out, "a" if resume else "w", encoding="utf-8") as f:
+        async for result in run_batch(iter_manifest(manifest, done), concurrency, image_root):
+            f.write(result.json() + "\n")
+            f.flush()
+            if result.status == "ok":
+                ok += 1
+            else:
+                failed += 1
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"scored {ok} households, {failed} failed in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bulk",
+        description="Score a manifest of households offline.",
+    )
+    parser.add_argument("manifest", help="JSONL manifest of households")
+    parser.add_argument("--out", required=True, help="JSONL results / checkpoint file")
+    parser.add_argument("--concurrency", type=int, default=settings.bulk_concurrency)
+    parser.add_argument("--resume", action="store_true", help="skip households already in --out")
+    parser.add_argument(
+        "--image-root",
+        default=settings.bulk_image_root,
+        help="directory manifest image paths are relative to",
+    )
+    parser.add_argument("--parquet", help="also write a flattened Parquet file here")
+    args = parser.parse_args()
+
+    if settings.scoring_config_path:
+        reload_scoring_table(settings.scoring_config_path)
+
+    code = asyncio.run(
+        run(args.manifest, args.out, args.concurrency, args.resume, args.image_root)
+    )
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 import os
 from functools import lru_cache
 from pydantic import BaseSettings, Field, AnyHttpUrl
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -13,16 +13,189 @@ class Settings(BaseSettings):
         "Lifestyle index scoring using Vertex AI Gemini Vision + state-aware rules"
     )
 
+    # Runtime environment ("development" | "staging" | "production")
+    environment: str = Field("development", env="ENVIRONMENT")
+
     # CORS
     backend_cors_origins: list[AnyHttpUrl] = []
+    allowed_origins: list[str] = []
 
     # Google / Vertex AI
-    gcp_project_id: str = Field(..., env="GCP_PROJECT_ID")
+    # Only needed for Gemini calls; checked when the SDK is first initialized
+    gcp_project_id: Optional[str] = Field(None, env="GCP_PROJECT_ID")
     gcp_region: str = Field("asia-south1", env="GCP_REGION")  # good for India
     gemini_vision_model: str = Field(
         "gemini-1.5-flash-001", env="GEMINI_VISION_MODEL"
     )  # you can change to latest
 
+    # Max concurrent SDK calls pushed onto worker threads when the model
+    # has no native async method (keeps one worker from spawning unbounded threads)
+    vertex_blocking_call_limit: int = Field(8, env="VERTEX_BLOCKING_CALL_LIMIT")
+
+    # When the Vertex AI SDK is imported and the model built ("eager" before
+    # serving | "background" thread at startup | "lazy" on the first call)
+    vertex_init_mode: str = Field("background", env="VERTEX_INIT_MODE")
+
+    # The shared GenerativeModel is rebuilt after this many seconds (0 = never)
+    vertex_client_max_age_seconds: int = Field(0, env="VERTEX_CLIENT_MAX_AGE_SECONDS")
+
+    # How a household's images are sent to Gemini ("single" call | "fanout":
+    # groups of at most extraction_group_max_tokens estimated image tokens,
+    # 258 per image tile, extracted concurrently and merged). With
+    # allow_partial, a failed group drops only its own images
+    extraction_mode: str = Field("single", env="EXTRACTION_MODE")
+    extraction_group_max_tokens: int = Field(258, env="EXTRACTION_GROUP_MAX_TOKENS")
+    extraction_fanout_concurrency: int = Field(4, env="EXTRACTION_FANOUT_CONCURRENCY")
+    extraction_fanout_allow_partial: bool = Field(True, env="EXTRACTION_FANOUT_ALLOW_PARTIAL")
+
+    # How Gemini is asked for JSON ("schema": application/json with a response
+    # schema generated from GeminiRawSignals, asset names limited to the
+    # scoring table | "freeform": the JSON shape is only described in the
+    # prompt). A model that rejects the schema falls back to freeform
+    gemini_output_mode: str = Field("schema", env="GEMINI_OUTPUT_MODE")
+
+    # The prompt's static instruction goes to Gemini's system-instruction
+    # channel. With the context cache enabled it is also stored in a Vertex
+    # AI context cache (renewed before the TTL runs out) and billed at the
+    # cached-token rate; Vertex only caches prefixes of at least a minimum
+    # size, so shorter instructions are sent uncached
+    gemini_context_cache_enabled: bool = Field(False, env="GEMINI_CONTEXT_CACHE_ENABLED")
+    gemini_context_cache_ttl_seconds: int = Field(3600, env="GEMINI_CONTEXT_CACHE_TTL_SECONDS")
+    gemini_context_cache_min_tokens: int = Field(4096, env="GEMINI_CONTEXT_CACHE_MIN_TOKENS")
+
+    # Add the request's Gemini token usage (prompt / image / cached / output)
+    # to score responses as `token_usage`
+    response_include_token_usage: bool = Field(False, env="RESPONSE_INCLUDE_TOKEN_USAGE")
+
+    # Resilience around each Gemini call (see app/services/resilience.py):
+    # per-attempt timeout inside an overall deadline, full-jitter exponential
+    # retries on the listed status codes (and timeouts), an optional hedged
+    # second request once an attempt outlives the observed latency quantile,
+    # and a circuit breaker that fails fast after consecutive failures
+    gemini_timeout_seconds: float = Field(30.0, env="GEMINI_TIMEOUT_SECONDS")
+    gemini_deadline_seconds: float = Field(60.0, env="GEMINI_DEADLINE_SECONDS")
+    gemini_max_retries: int = Field(2, env="GEMINI_MAX_RETRIES")
+    gemini_retry_base_seconds: float = Field(0.5, env="GEMINI_RETRY_BASE_SECONDS")
+    gemini_retry_max_seconds: float = Field(8.0, env="GEMINI_RETRY_MAX_SECONDS")
+    gemini_retry_status_codes: list[int] = Field(
+        [429, 500, 502, 503, 504], env="GEMINI_RETRY_STATUS_CODES"
+    )
+    gemini_hedge_enabled: bool = Field(False, env="GEMINI_HEDGE_ENABLED")
+    gemini_hedge_quantile: float = Field(0.95, env="GEMINI_HEDGE_QUANTILE")
+    gemini_hedge_min_delay_seconds: float = Field(1.0, env="GEMINI_HEDGE_MIN_DELAY_SECONDS")
+    gemini_hedge_min_samples: int = Field(20, env="GEMINI_HEDGE_MIN_SAMPLES")
+    gemini_breaker_failure_threshold: int = Field(5, env="GEMINI_BREAKER_FAILURE_THRESHOLD")
+    gemini_breaker_reset_seconds: float = Field(30.0, env="GEMINI_BREAKER_RESET_SECONDS")
+
+    # Result cache for parsed Gemini signals ("memory" | "sqlite" | "redis" | "none")
+    result_cache_backend: str = Field("memory", env="RESULT_CACHE_BACKEND")
+    result_cache_ttl_seconds: int = Field(7 * 24 * 3600, env="RESULT_CACHE_TTL_SECONDS")
+    result_cache_max_entries: int = Field(10_000, env="RESULT_CACHE_MAX_ENTRIES")
+    result_cache_sqlite_path: str = Field(
+        "lifestyle_cache.sqlite3", env="RESULT_CACHE_SQLITE_PATH"
+    )
+    result_cache_redis_url: str = Field(
+        "redis://localhost:6379/0", env="RESULT_CACHE_REDIS_URL"
+    )
+
+    # Whole request body, checked as it is received (413 above it; 0 = off).
+    # Default: 10 images at UPLOAD_MAX_BYTES plus form overhead
+    request_max_bytes: int = Field(151 * 1024 * 1024, env="REQUEST_MAX_BYTES")
+
+    # Upload ingestion: per-image byte cap, read chunk size and the size/quality
+    # images are downscaled + re-encoded to before being sent to Vertex AI
+    upload_max_bytes: int = Field(15 * 1024 * 1024, env="UPLOAD_MAX_BYTES")
+    upload_chunk_bytes: int = Field(64 * 1024, env="UPLOAD_CHUNK_BYTES")
+    image_max_side: int = Field(1536, env="IMAGE_MAX_SIDE")
+    image_jpeg_quality: int = Field(85, env="IMAGE_JPEG_QUALITY")
+    # Width x height limit, checked from the header before any decode (413 above it);
+    # a PNG has no draft mode, so it is fully decoded up to this size
+    image_max_pixels: int = Field(64_000_000, env="IMAGE_MAX_PIXELS")
+
+    # Near-duplicate image suppression (perceptual hash, Hamming distance on 64 bits)
+    image_dedup_enabled: bool = Field(True, env="IMAGE_DEDUP_ENABLED")
+    image_dedup_max_distance: int = Field(6, env="IMAGE_DEDUP_MAX_DISTANCE")
+    image_hash_index_size: int = Field(100_000, env="IMAGE_HASH_INDEX_SIZE")
+
+    # Local pre-filter in front of the model (see app/services/image_prefilter.py):
+    # "enforce" skips blank / document / screenshot images and those the
+    # optional ONNX classifier labels outside keep_labels with at least
+    # min_confidence, "shadow" only counts what it would skip, "off" disables
+    # it. If every image would be skipped, the request is refused with 422
+    # ("reject") or the images go to the model anyway ("model"): no evidence
+    # must never be scored as the lowest persona
+    prefilter_mode: str = Field("enforce", env="PREFILTER_MODE")
+    prefilter_all_skipped: str = Field("reject", env="PREFILTER_ALL_SKIPPED")
+    prefilter_onnx_model_path: Optional[str] = Field(None, env="PREFILTER_ONNX_MODEL_PATH")
+    prefilter_onnx_labels: list[str] = Field(
+        ["household", "document", "screenshot", "selfie", "other"], env="PREFILTER_ONNX_LABELS"
+    )
+    prefilter_onnx_keep_labels: list[str] = Field(["household"], env="PREFILTER_ONNX_KEEP_LABELS")
+    prefilter_onnx_min_confidence: float = Field(0.85, env="PREFILTER_ONNX_MIN_CONFIDENCE")
+
+    # Batch / bulk scoring
+    bulk_concurrency: int = Field(4, env="BULK_CONCURRENCY")
+    bulk_image_root: Optional[str] = Field(None, env="BULK_IMAGE_ROOT")
+    batch_max_households: int = Field(1000, env="BATCH_MAX_HOUSEHOLDS")
+
+    # Asynchronous jobs (POST /score/lifestyle/jobs, see app/services/job_queue.py):
+    # worker tasks per process, waiting jobs beyond which submissions get 429,
+    # how long / how many finished jobs stay pollable, and the hosts callback
+    # URLs may point at (empty = callbacks disabled)
+    job_workers: int = Field(4, env="JOB_WORKERS")
+    job_queue_max_depth: int = Field(100, env="JOB_QUEUE_MAX_DEPTH")
+    job_result_ttl_seconds: int = Field(3600, env="JOB_RESULT_TTL_SECONDS")
+    job_max_retained: int = Field(10_000, env="JOB_MAX_RETAINED")
+    job_callback_allowed_hosts: list[str] = Field([], env="JOB_CALLBACK_ALLOWED_HOSTS")
+    job_callback_timeout_seconds: float = Field(10.0, env="JOB_CALLBACK_TIMEOUT_SECONDS")
+
+    # SQLite file the produced GeminiRawSignals are kept in for rescoring, one
+    # row per household (opt-in; "" = off)
+    signal_store_path: str = Field("", env="SIGNAL_STORE_PATH")
+
+    # Versioned ASSET_WEIGHTS / STATE_PROFILES file (.json, or .yaml with PyYAML);
+    # unset = built-in tables. Reloaded on SIGHUP, POST /score/config/reload,
+    # and (when > 0) whenever its mtime changes, checked every N seconds
+    scoring_config_path: Optional[str] = Field(None, env="SCORING_CONFIG_PATH")
+    scoring_config_poll_seconds: float = Field(0, env="SCORING_CONFIG_POLL_SECONDS")
+
+    # Pincode / city -> district profile index (CSV, see app/location_index.py);
+    # unset = the bundled seed file, "" = state-level profiles only
+    pincode_index_path: Optional[str] = Field(None, env="PINCODE_INDEX_PATH")
+
+    # LRU of resolved free-text state names (see app/state_resolver.py)
+    state_resolver_cache_size: int = Field(8192, env="STATE_RESOLVER_CACHE_SIZE")
+
+    # Admission control (see app/admission.py). Token buckets on POSTs under
+    # the limited paths: API keys in tenant_rates get their own bucket at
+    # their rate, everything else shares one bucket at rate_per_second
+    # (0 = no limit), priority classes (interactive paths vs the
+    # rest) and a cap on in-flight Gemini calls (0 = none) that sheds calls
+    # expected to wait longer than their class's max wait. "memory" state
+    # is per process with rates split over ADMISSION_PROCESSES (0 = from
+    # WEB_CONCURRENCY); "redis" shares the buckets across workers and hosts
+    admission_backend: str = Field("memory", env="ADMISSION_BACKEND")
+    admission_redis_url: str = Field("redis://localhost:6379/0", env="ADMISSION_REDIS_URL")
+    admission_processes: int = Field(0, env="ADMISSION_PROCESSES")
+    admission_api_key_header: str = Field("X-API-Key", env="ADMISSION_API_KEY_HEADER")
+    admission_rate_per_second: float = Field(0.0, env="ADMISSION_RATE_PER_SECOND")
+    admission_burst: float = Field(20.0, env="ADMISSION_BURST")
+    admission_tenant_rates: Dict[str, float] = Field({}, env="ADMISSION_TENANT_RATES")
+    admission_limited_paths: list[str] = Field(["/score/lifestyle"], env="ADMISSION_LIMITED_PATHS")
+    admission_interactive_paths: list[str] = Field(
+        ["/score/lifestyle", "/score/lifestyle/stream"], env="ADMISSION_INTERACTIVE_PATHS"
+    )
+    admission_max_model_calls: int = Field(32, env="ADMISSION_MAX_MODEL_CALLS")
+    admission_interactive_max_wait_seconds: float = Field(
+        5.0, env="ADMISSION_INTERACTIVE_MAX_WAIT_SECONDS"
+    )
+    admission_batch_max_wait_seconds: float = Field(120.0, env="ADMISSION_BATCH_MAX_WAIT_SECONDS")
+
+    # Request IDs, per-stage spans and GET /metrics (see app/telemetry.py);
+    # requests slower than trace_log_slow_ms log their full stage trace
+    telemetry_enabled: bool = Field(True, env="TELEMETRY_ENABLED")
+    trace_log_slow_ms: float = Field(2000, env="TRACE_LOG_SLOW_MS")
+
     # Scoring
     base_score_max: int = 100
 
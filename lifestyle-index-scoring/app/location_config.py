@@ -1,6 +1,6 @@
 # app/location_config.py
 
-from typing import Literal, TypedDict, Dict
+from typing import Literal, TypedDict, Dict, Optional
 
 ClimateZone = Literal["hot_arid", "hot_humid", "temperate", "cold"]
 MetroFlag = Literal["metro", "non_metro"]
@@ -70,10 +70,24 @@ STATE_PROFILES: Dict[str, StateProfile] = {
 }
 
 
-def get_state_profile(state_name: str) -> StateProfile:
+DEFAULT_STATE_PROFILE: StateProfile = {"climate": "temperate", "metro_flag": "non_metro"}
+
+
+def get_state_profile(
+    state_name: str,
+    profiles: Optional[Dict[str, StateProfile]] = None,
+) -> StateProfile:
     """
     Normalize state name and return climate + metro classification.
+    Abbreviations, old names, misspellings and city names are resolved
+    through app.state_resolver ("TN", "Orissa", "Bangalore", "Karnatka").
     If unknown, default to: metro: non_metro, climate: temperate
+    `profiles` overrides STATE_PROFILES (used for what-if rescoring).
     """
+    from .state_resolver import get_state_resolver  # it imports this module
+
+    profiles = profiles or STATE_PROFILES
     key = (state_name or "").strip().upper()
-    return STATE_PROFILES.get(key, {"climate": "temperate", "metro_flag": "non_metro"})
+    if key not in profiles:
+        key = get_state_resolver().resolve(state_name).state
+    return profiles.get(key, DEFAULT_STATE_PROFILE)
@@ -0,0 +1,314 @@
+# app/location_index.py
+
+import csv
+import difflib
+import os
+import sys
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Literal, Optional, Tuple, Union
+
+from .config import get_settings
+from .location_config import ClimateZone, MetroFlag
+from .scoring_tables import CLIMATE_ZONES, METRO_FLAGS, ScoringTable, StateRecord, context_id
+from .state_resolver import StateResolution, resolve_state_record
+
+DEFAULT_PINCODE_INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "pincode_ranges.csv")
+
+# Where a resolved location profile came from, most specific first;
+# "circle" is the rest of a state's postal circle outside listed districts
+LocationSource = Literal["pincode", "city", "circle", "state", "default"]
+
+# (profile, where it came from, how the free-text state was matched)
+ResolvedLocation = Tuple[Union["LocationRecord", StateRecord], LocationSource, StateResolution]
+
+
+class LocationRecord:
+    """
+    Profile of one district / city. Exposes the same context / climate /
+    metro_flag attributes as StateRecord, so scoring treats them alike.
+    """
+
+    __slots__ = ("district", "state", "tier", "context", "climate", "metro_flag")
+
+    def __init__(
+        self,
+        district: Optional[str],
+        state: str,
+        tier: int,
+        climate: ClimateZone,
+        metro_flag: MetroFlag,
+    ):
+        if climate not in CLIMATE_ZONES:
+            raise ValueError(f"unknown climate {climate!r}")
+        if metro_flag not in METRO_FLAGS:
+            raise ValueError(f"unknown metro_flag {metro_flag!r}")
+        self.district = sys.intern(district) if district else None
+        self.state = sys.intern(state)
+        self.tier = tier
+        self.context = context_id(metro_flag, climate)
+        self.climate: ClimateZone = sys.intern(climate)
+        self.metro_flag: MetroFlag = sys.intern(metro_flag)
+
+    def key(self) -> Tuple:
+        return (self.district, self.state, self.tier, self.climate, self.metro_flag)
+
+
+def _normalize_city(name: str) -> str:
+    return " ".join(name.replace("-", " ").replace(".", " ").split()).upper()
+
+
+def _flatten(ranges: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+    """
+    Turn nested (start, end, record) ranges into sorted, non-overlapping
+    segments where the innermost range wins, e.g. a city range carved out
+    of its state's postal-circle range. Partial overlaps are rejected.
+    """
+    segments: List[Tuple[int, int, int]] = []
+    stack: List[Tuple[int, int]] = []  # (end, record) of open ranges
+    cursor = 0
+
+    def close_until(limit: int) -> None:
+        nonlocal cursor
+        while stack and stack[-1][0] < limit:
+            end, rec = stack.pop()
+            if cursor <= end:
+                segments.append((cursor, end, rec))
+                cursor = end + 1
+
+    for start, end, rec in sorted(ranges, key=lambda r: (r[0], -r[1])):
+        close_until(start)
+        if stack:
+            if end > stack[-1][0]:
+                raise ValueError(f"pincode range {start}-{end} partially overlaps another range")
+            if cursor < start:
+                segments.append((cursor, start - 1, stack[-1][1]))
+        cursor = start
+        stack.append((end, rec))
+    close_until(10**9)
+
+    # Merge touching segments that resolve to the same record
+    merged: List[Tuple[int, int, int]] = []
+    for seg in segments:
+        if merged and merged[-1][2] == seg[2] and merged[-1][1] + 1 == seg[0]:
+            merged[-1] = (merged[-1][0], seg[1], seg[2])
+        else:
+            merged.append(seg)
+    return merged
+
+
+class PincodeIndex:
+    """
+    Pincode -> LocationRecord over packed, sorted arrays.
+
+    Rows are single pincodes or inclusive ranges; ranges may nest (a city
+    inside its postal circle), the innermost wins. A row without a district
+    is a state-wide (postal circle) range; its profile covers the rest of the
+    circle, i.e. towns outside the listed districts, which are often
+    non-metro where the state profile is metro.
+
+    At build time ranges are flattened into disjoint segments stored as
+    three parallel sorted columns (segment start, segment end, record id), so
+    a lookup is one bisect plus two reads and ~19k pincodes take about 1 MB.
+    Starts are a plain list, which bisects ~2x faster than array('I') (no int
+    boxing per compare); ends and record ids stay packed. Records are
+    deduplicated, so the record list stays at the number of districts.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, int, LocationRecord, Iterable[str]]],
+    ):
+        records: List[LocationRecord] = []
+        by_key: Dict[Tuple, int] = {}
+        ranges: List[Tuple[int, int, int]] = []
+        cities: Dict[str, List[int]] = {}
+        circle_sizes: Dict[str, int] = {}
+        self.circles: Dict[str, LocationRecord] = {}  # state -> widest state-wide row
+
+        for start, end, record, city_names in rows:
+            rec_id = by_key.setdefault(record.key(), len(records))
+            if rec_id == len(records):
+                records.append(record)
+            ranges.append((start, end, rec_id))
+            if record.district is None and end - start >= circle_sizes.get(record.state, -1):
+                circle_sizes[record.state] = end - start
+                self.circles[record.state] = record
+            for name in city_names:
+                ids = cities.setdefault(_normalize_city(name), [])
+                if rec_id not in ids:
+                    ids.append(rec_id)
+
+        segments = _flatten(ranges)
+        self.records: Tuple[LocationRecord, ...] = tuple(records)
+        self.starts: List[int] = [s for s, _, _ in segments]
+        self.ends = array("I", (e for _, e, _ in segments))
+        self.record_ids = array("H" if len(records) < 2**16 else "I", (r for _, _, r in segments))
+        self.cities: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in cities.items()}
+        self._city_names: List[str] = sorted(self.cities)
+        self._city_names_by_state: Dict[str, List[str]] = {}
+        for name in self._city_names:
+            for rec_id in self.cities[name]:
+                names = self._city_names_by_state.setdefault(self.records[rec_id].state, [])
+                if not names or names[-1] != name:
+                    names.append(name)
+        self._match_city = lru_cache(maxsize=4096)(self._match_city_uncached)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def nbytes(self) -> int:
+        starts = sys.getsizeof(self.starts) + sum(sys.getsizeof(s) for s in self.starts)
+        return starts + sum(a.itemsize * len(a) for a in (self.ends, self.record_ids))
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def lookup_pincode(self, pincode: Optional[str]) -> Optional[LocationRecord]:
+        try:
+            pin = int(pincode)  # tolerates surrounding whitespace
+        except TypeError:
+            return None
+        except ValueError:
+            try:
+                pin = int(pincode.replace(" ", ""))  # "560 034"
+            except ValueError:
+                return None
+        if not 100000 <= pin <= 999999:
+            return None
+        i = bisect_right(self.starts, pin) - 1
+        if i < 0 or pin > self.ends[i]:
+            return None
+        return self.records[self.record_ids[i]]
+
+    def _match_city_uncached(self, city: str, state: Optional[str]) -> Optional[LocationRecord]:
+        key = _normalize_city(city)
+        ids = self.cities.get(key)
+        if ids is None:
+            # Only compare against the given state's cities when it is known
+            names = self._city_names if state is None else self._city_names_by_state.get(state, [])
+            close = difflib.get_close_matches(key, names, n=1, cutoff=0.85)
+            if not close:
+                return None
+            ids = self.cities[close[0]]
+        # Same-name cities in different states: only trust one in the given state
+        for rec_id in ids:
+            record = self.records[rec_id]
+            if state is None or record.state == state:
+                return record
+        return None
+
+    def lookup_city(
+        self, city: Optional[str], state: Optional[str] = None
+    ) -> Optional[LocationRecord]:
+        """Exact, then fuzzy (difflib, cached) city-name match within `state`."""
+        if not city or not city.strip():
+            return None
+        return self._match_city(city, state)
+
+    def resolve(
+        self,
+        table: ScoringTable,
+        state: Optional[str],
+        city: Optional[str] = None,
+        pincode: Optional[str] = None,
+    ) -> ResolvedLocation:
+        """
+        Finest available profile for a location: a district pincode, then the
+        city, then the rest-of-circle profile, then the state profile in
+        `table`, then the table's default. The state is matched through
+        app.state_resolver ("TN", "Orissa", "Bangalore"). A pincode or city
+        in a different state than the one given is ignored (likely a typo);
+        if the state is unresolvable, they are trusted.
+
+        The rest-of-circle profile applies to a pincode in a state-wide range,
+        and to a named city the index does not list (it lies outside every
+        listed district). It is the table's circle profile for the state when
+        the scoring config sets one, else the state-wide row's own.
+        """
+        state_record, resolution = resolve_state_record(table, state)
+        expected_state = resolution.state
+        circle: Optional[Union[LocationRecord, StateRecord]] = None
+
+        record = self.lookup_pincode(pincode)
+        if record is not None and (expected_state is None or record.state == expected_state):
+            if record.district is not None:
+                return record, "pincode", resolution
+            circle = table.circles.get(record.state) or record
+            expected_state = record.state
+
+        record = self.lookup_city(city, expected_state)
+        if record is not None:
+            return record, "city", resolution
+
+        if circle is None and expected_state is not None and city and city.strip():
+            circle = table.circles.get(expected_state) or self.circles.get(expected_state)
+        if circle is not None:
+            return circle, "circle", resolution
+
+        if state_record is not None:
+            return state_record, "state", resolution
+        return table.default_state, "default", resolution
+
+
+def load_pincode_index(path: str) -> PincodeIndex:
+    """
+    Load a CSV with columns start, end, district, state, tier, climate,
+    metro_flag, cities ("|"-separated names and aliases). `end` may be empty
+    for a single pincode, so a full ~19k-row directory loads as-is. Rows
+    with an empty district are state-wide ranges (see PincodeIndex).
+    """
+
+    # Thousands of rows share a district; build each record once
+    records: Dict[Tuple, LocationRecord] = {}
+
+    def rows():
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    start = int(row["start"])
+                    end = int(row["end"]) if row.get("end") else start
+                    if not (100000 <= start <= end <= 999999):
+                        raise ValueError(f"bad pincode range {start}-{end}")
+                    key = (
+                        (row.get("district") or "").strip() or None,
+                        row["state"].strip().upper(),
+                        int(row.get("tier") or 3),
+                        row["climate"].strip(),
+                        row["metro_flag"].strip(),
+                    )
+                    record = records.get(key)
+                    if record is None:
+                        record = records[key] = LocationRecord(*key)
+                except (KeyError, ValueError) as e:
+                    raise ValueError(f"{path}:{line_no}: {e}")
+                cities = [c for c in (row.get("cities") or "").split("|") if c.strip()]
+                yield start, end, record, cities
+
+    return PincodeIndex(rows())
+
+
+@lru_cache
+def get_location_index() -> Optional[PincodeIndex]:
+    """The configured pincode index, or None when PINCODE_INDEX_PATH is empty."""
+    path = get_settings().pincode_index_path
+    if path is None:
+        path = DEFAULT_PINCODE_INDEX_PATH
+    return load_pincode_index(path) if path else None
+
+
+def resolve_location(
+    table: ScoringTable,
+    state: Optional[str],
+    city: Optional[str] = None,
+    pincode: Optional[str] = None,
+) -> ResolvedLocation:
+    """PincodeIndex.resolve on the configured index; state-only when it is disabled."""
+    index = get_location_index()
+    if index is not None:
+        return index.resolve(table, state, city, pincode)
+    record, resolution = resolve_state_record(table, state)
+    if record is not None:
+        return record, "state", resolution
+    return table.default_state, "default", resolution
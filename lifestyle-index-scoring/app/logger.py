@@ -0,0 +1,31 @@
+# app/logger.py
+
+import logging
+import os
+from contextvars import ContextVar
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Set per request by app.telemetry.TelemetryMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp every record with the current request ID ("-" outside requests)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+_handler = logging.StreamHandler()
+_handler.addFilter(RequestIdFilter())
+
+logging.basicConfig(
+    level=LOG_LEVEL,
+    format="%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s",
+    handlers=[_handler],
+)
+
+logger = logging.getLogger("lifestyle_index")
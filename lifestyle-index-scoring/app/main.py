@@ -1,12 +1,40 @@
 # app/main.py
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from .admission import AdmissionMiddleware, admission_stats
 from .config import get_settings
 from .routers.score_router import router as score_router
+from .location_index import get_location_index
+from .request_size import RequestSizeMiddleware
+from .responses import FastJSONResponse
+from .scoring_tables import scoring_table_stats
+from .services import config_reload, job_queue, reasoning_engine, vertex_client
+from .telemetry import TelemetryMiddleware, render_metrics
 
 settings = get_settings()
 
+
+# ---------------------------------------------------------
+# Lifespan: shared Vertex AI model client, scoring config reload
+# ---------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the GenerativeModel once so requests never pay client setup;
+    # VERTEX_INIT_MODE decides whether serving waits for the SDK import
+    vertex_client.startup(reasoning_engine.current_system_instruction())
+    config_reload.startup()
+    get_location_index()  # load the pincode index before the first request
+    job_queue.startup()
+    yield
+    await job_queue.shutdown()
+    await config_reload.shutdown()
+    vertex_client.shutdown()
+
+
 # ---------------------------------------------------------
 # FastAPI Application Configuration
 # ---------------------------------------------------------
@@ -16,12 +44,19 @@ app = FastAPI(
     description=settings.app_description,
     docs_url="/docs" if settings.environment != "production" else None,
     redoc_url="/redoc" if settings.environment != "production" else None,
+    lifespan=lifespan,
+    # orjson when installed; the scoring endpoints serialize their own body
+    default_response_class=FastJSONResponse,
 )
 
 
 # ---------------------------------------------------------
 # CORS Configuration
 # ---------------------------------------------------------
+# Innermost: rejections still pass through CORS and telemetry
+app.add_middleware(RequestSizeMiddleware)
+app.add_middleware(AdmissionMiddleware)
+
 # Allow all origins in development, restricted in production
 allowed_origins = ["*"] if settings.environment != "production" else settings.allowed_origins
 
@@ -31,8 +66,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Added last so it wraps CORS too: every response carries X-Request-ID
+app.add_middleware(TelemetryMiddleware)
+
 
 # ---------------------------------------------------------
 # Routers
@@ -53,4 +92,20 @@ def health_check():
         "service": settings.app_name,
         "version": settings.app_version,
         "environment": settings.environment,
+        "vertex_client": vertex_client.vision_models.stats(),
+        "gemini_resilience": vertex_client.resilience_stats(),
+        "gemini_output_mode": reasoning_engine.current_output_mode(),
+        "jobs": job_queue.get_job_queue().stats(),
+        "admission": admission_stats(),
+        "scoring_version": scoring_table_stats()["version"],
     }
+
+
+# ---------------------------------------------------------
+# Metrics (Prometheus text format, per worker process)
+# ---------------------------------------------------------
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    if not settings.telemetry_enabled:
+        raise HTTPException(status_code=404, detail="Telemetry is disabled.")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,77 @@
+# app/request_size.py
+"""
+Request body size limit, enforced while the body is received.
+
+Starlette parses a multipart form in full (spooling large parts to disk)
+before the endpoint sees any UploadFile, so the per-image UPLOAD_MAX_BYTES
+check in image_ingest only bounds what gets decoded. This middleware bounds
+what gets received: a declared Content-Length over REQUEST_MAX_BYTES is
+rejected with 413 before any of the body is read, and a body that grows past
+the limit anyway (chunked, or a wrong Content-Length) fails with 413 on the
+receive that crosses it, which stops the form parser.
+"""
+
+import json
+
+from fastapi import HTTPException
+
+from .config import get_settings
+
+
+class RequestSizeMiddleware:
+    """Pure ASGI middleware: 413 for request bodies over REQUEST_MAX_BYTES."""
+
+    def __init__(self, app):
+        self.app = app
+        self.max_bytes = get_settings().request_max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > self.max_bytes:
+                    await _reject(send, self.max_bytes)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside the endpoint's body parsing, so FastAPI
+                    # answers with this status like any other HTTPException
+                    raise HTTPException(status_code=413, detail=_detail(self.max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _detail(max_bytes: int) -> str:
+    return f"Request body exceeds the {max_bytes / (1024 * 1024):g} MB limit."
+
+
+async def _reject(send, max_bytes: int) -> None:
+    body = json.dumps({"detail": _detail(max_bytes)}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,54 @@
+# app/rescore.py
+"""
+What-if rescoring of every stored GeminiRawSignals against candidate weights.
+
+    python -m app.rescore --weights candidate.json
+    python -m app.rescore --weights candidate.json --out deltas.jsonl
+
+candidate.json holds {"version": "...", "asset_weights": {...},
+"state_profiles": {...}, "circle_profiles": {...}}; any table may be
+omitted to keep the live one.
+The live baseline is SCORING_CONFIG_PATH when set, else the built-in tables.
+No model calls are made.
+"""
+
+import argparse
+import sys
+
+from .config import get_settings
+from .scoring_tables import reload_scoring_table
+from .services.rescoring import load_candidate, rescore_store
+from .services.signal_store import SignalStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.rescore",
+        description="Re-score stored signals against candidate weights.",
+    )
+    parser.add_argument("--weights", required=True, help="candidate weights JSON file")
+    parser.add_argument("--store", default=get_settings().signal_store_path)
+    parser.add_argument("--out", help="write per-household deltas as JSONL here")
+    args = parser.parse_args()
+
+    if not args.store:
+        raise SystemExit("No signal store configured (SIGNAL_STORE_PATH / --store).")
+
+    settings = get_settings()
+    if settings.scoring_config_path:
+        reload_scoring_table(settings.scoring_config_path)
+
+    candidate = load_candidate(args.weights)
+    store = SignalStore(args.store)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out:
+            summary = rescore_store(store, candidate, deltas_out=out)
+    else:
+        summary = rescore_store(store, candidate)
+
+    sys.stdout.write(summary.json(indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
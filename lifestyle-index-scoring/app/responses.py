@@ -0,0 +1,112 @@
+# app/responses.py
+"""
+JSON encoding for API responses, and the client-selectable shape of the
+scoring response.
+
+dumps() serializes through orjson when it is installed (optional, as in
+services/model_json) and the stdlib otherwise. Pydantic models are encoded
+straight from their field values (`__dict__`) instead of going through
+`.json()` / `.dict()`, which for a full LifestyleScoreResponse is most of
+the serialization time; this matches `.json()` because no schema here uses
+aliases, exclusions or custom encoders.
+
+Views (`?view=` on the scoring endpoints, `?fields=` for an explicit list):
+
+- compact: lifestyle_index and persona_hint - what the mobile clients show;
+- full (default): the whole LifestyleScoreResponse, as before;
+- debug: full plus token_usage, whatever RESPONSE_INCLUDE_TOKEN_USAGE says.
+
+Every view costs the same model call and scoring; a selection only skips
+composing the explanation text (when it is left out) and encoding the
+fields outside it, so its savings are in response size, not latency.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from .schemas import LifestyleScoreResponse
+
+RESPONSE_VIEWS: Dict[str, Optional[Tuple[str, ...]]] = {
+    "compact": ("lifestyle_index", "persona_hint"),
+    "full": None,  # the response as built, token_usage per RESPONSE_INCLUDE_TOKEN_USAGE
+    "debug": tuple(LifestyleScoreResponse.__fields__),
+}
+
+
+def _model_fields(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    return pydantic_encoder(value)
+
+
+@lru_cache(maxsize=1)
+def _dumper() -> Callable[[Any], bytes]:
+    """orjson when installed, else the stdlib (compact separators, same output)."""
+    try:
+        import orjson
+    except ImportError:
+        def stdlib_dumps(content: Any) -> bytes:
+            return json.dumps(
+                content, default=_model_fields, ensure_ascii=False, separators=(",", ":")
+            ).encode()
+
+        return stdlib_dumps
+
+    def orjson_dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_model_fields, option=orjson.OPT_NON_STR_KEYS)
+
+    return orjson_dumps
+
+
+def dumps(content: Any) -> bytes:
+    """UTF-8 JSON for `content`; pydantic models may appear anywhere inside it."""
+    return _dumper()(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps() (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# -----------------------------
+# Scoring response views
+# -----------------------------
+def select_fields(view: str, fields: str = "") -> Optional[FrozenSet[str]]:
+    """
+    Top-level LifestyleScoreResponse fields to build and return, or None for
+    the full default response. An explicit comma-separated `fields` list
+    overrides `view`. Raises ValueError for an unknown view or field.
+    """
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    if not names:
+        if view not in RESPONSE_VIEWS:
+            raise ValueError(f"Unknown view '{view}' (expected one of: {', '.join(RESPONSE_VIEWS)}).")
+        selected = RESPONSE_VIEWS[view]
+        return None if selected is None else frozenset(selected)
+
+    unknown = [n for n in names if n not in LifestyleScoreResponse.__fields__]
+    if unknown:
+        raise ValueError(
+            f"Unknown response field(s): {', '.join(unknown)} "
+            f"(available: {', '.join(LifestyleScoreResponse.__fields__)})."
+        )
+    return frozenset(names)
+
+
+def score_payload(response: LifestyleScoreResponse, fields: Optional[FrozenSet[str]]) -> Any:
+    """The response itself, or a dict of the selected fields in schema order."""
+    if fields is None:
+        return response
+    values = response.__dict__
+    return {name: values[name] for name in LifestyleScoreResponse.__fields__ if name in fields}
+
+
+def render_score(response: LifestyleScoreResponse, fields: Optional[FrozenSet[str]] = None) -> bytes:
+    return dumps(score_payload(response, fields))
@@ -1,32 +1,55 @@
 # app/routers/score_router.py
 
-from typing import List
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+import asyncio
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 
+from ..config import get_settings
+from ..logger import logger
+from ..responses import render_score, select_fields
 from ..schemas import (
+    BatchScoreRequest,
+    JobStatus,
     LifestyleScoreResponse,
     LocationContext,
+    RescoreRequest,
+    RescoreSummary,
+    SkippedImage,
 )
-from ..services.reasoning_engine import extract_lifestyle_signals_from_images
-from ..services.scoring_engine import (
-    score_lifestyle,
-    persona_and_explanation_from_score,
-)
+from ..scoring_tables import scoring_table_stats
+from ..services import config_reload
+from ..services.bulk_runner import run_batch
+from ..services.image_ingest import ingest_upload
+from ..services.job_queue import JobQueueFull, get_job_queue, validate_callback_url
+from ..services.rescoring import make_candidate, rescore_store
+from ..services.resilience import CircuitOpenError
+from ..services.result_cache import get_result_cache
+from ..services.signal_store import get_signal_store
+from ..services.scoring_pipeline import encode_stream_event, score_household, stream_household
+from ..telemetry import span
 
 router = APIRouter(prefix="/score", tags=["lifestyle"])
 
-
-@router.post(
-    "/lifestyle",
-    response_model=LifestyleScoreResponse,
-    summary="Compute lifestyle index from uploaded household images and location info",
+ResponseView = Literal["compact", "full", "debug"]  # responses.RESPONSE_VIEWS
+_VIEW_DESCRIPTION = (
+    "Response shape: compact (lifestyle_index, persona_hint), full, "
+    "or debug (full plus token_usage)"
 )
-async def score_lifestyle_endpoint(
-    images: List[UploadFile] = File(..., description="Upload 1–10 household images"),
-    state: str = Form(..., description="Indian state (e.g., Karnataka, Rajasthan)"),
-    city: str = Form("", description="City / town name"),
-    pincode: str = Form("", description="Pincode"),
-):
+_FIELDS_DESCRIPTION = "Comma-separated top-level response fields; overrides view"
+
+
+def _response_fields(view: str, fields: str):
+    try:
+        return select_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _ingest_images(
+    images: List[UploadFile],
+) -> Tuple[List[bytes], List[Optional[str]], List[int], List[SkippedImage]]:
+    """Validate, read and downscale uploads; empty files are reported as skipped."""
     # -----------------------------
     # Validate uploaded images
     # -----------------------------
@@ -38,17 +61,56 @@ async def score_lifestyle_endpoint(
 
     # -----------------------------
     # Convert uploaded files → bytes
+    # (bounded chunked read, then downscale + re-encode)
     # -----------------------------
     image_bytes_list: List[bytes] = []
-    for img in images:
-        content = await img.read()
+    filenames: List[Optional[str]] = []
+    positions: List[int] = []  # original upload index of each kept image
+    skipped_images: List[SkippedImage] = []
+    for i, img in enumerate(images):
+        content = await ingest_upload(img)
         if not content:
+            skipped_images.append(
+                SkippedImage(index=i, filename=img.filename, reason="empty")
+            )
             continue
         image_bytes_list.append(content)
+        filenames.append(img.filename)
+        positions.append(i)
 
     if not image_bytes_list:
         raise HTTPException(status_code=400, detail="Uploaded images are empty or invalid.")
 
+    return image_bytes_list, filenames, positions, skipped_images
+
+
+@router.post(
+    "/lifestyle",
+    # The body is rendered here and depends on view / fields, so FastAPI
+    # must not validate it against the full model
+    response_model=None,
+    summary="Compute lifestyle index from uploaded household images and location info",
+    responses={
+        200: {
+            "model": LifestyleScoreResponse,
+            "description": (
+                "LifestyleScoreResponse; with view=compact or fields=..., only the "
+                "selected top-level fields are present"
+            ),
+        }
+    },
+)
+async def score_lifestyle_endpoint(
+    images: List[UploadFile] = File(..., description="Upload 1–10 household images"),
+    state: str = Form(..., description="Indian state (e.g., Karnataka, Rajasthan)"),
+    city: str = Form("", description="City / town name"),
+    pincode: str = Form("", description="Pincode"),
+    view: ResponseView = Query("full", description=_VIEW_DESCRIPTION),
+    fields: str = Query("", description=_FIELDS_DESCRIPTION),
+):
+    selected = _response_fields(view, fields)
+    image_bytes_list, filenames, positions, skipped_images = await _ingest_images(images)
+
     # -----------------------------
     # Prepare location context
     # -----------------------------
@@ -59,47 +121,244 @@ async def score_lifestyle_endpoint(
     )
 
     # -----------------------------
-    # STEP 1: Gemini Vision (reasoning_engine)
-    # Extract structured asset signals from images
+    # Dedup → Gemini Vision → scoring → persona + explanation
     # -----------------------------
-    raw_signals = extract_lifestyle_signals_from_images(
-        image_bytes_list=image_bytes_list,
-        location=location,
+    result = await score_household(
+        image_bytes_list,
+        location,
+        filenames=filenames,
+        positions=positions,
+        skipped_images=skipped_images,
+        fields=selected,
     )
 
-    # -----------------------------
-    # STEP 2: Rule-based lifestyle scoring
-    # -----------------------------
-    lifestyle_index, breakdown = score_lifestyle(
-        raw_signals=raw_signals,
-        location=location,
+    # Serialize here (instead of FastAPI re-validating the model) so the
+    # cost shows up as its own stage
+    with span("serialize"):
+        body = render_score(result, selected)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post(
+    "/lifestyle/stream",
+    summary="Like /score/lifestyle, streaming provisional scores as assets are detected",
+    response_class=StreamingResponse,
+    response_model=None,
+    responses={
+        200: {
+            "description": (
+                "NDJSON lines (or SSE messages): accepted, one asset event per detected "
+                "asset with the provisional index, then final with the LifestyleScoreResponse "
+                "(only the selected fields with view=compact or fields=...), or error with "
+                "status and detail"
+            ),
+            "content": {"application/x-ndjson": {}, "text/event-stream": {}},
+        }
+    },
+)
+async def score_lifestyle_stream_endpoint(
+    images: List[UploadFile] = File(..., description="Upload 1–10 household images"),
+    state: str = Form(..., description="Indian state (e.g., Karnataka, Rajasthan)"),
+    city: str = Form("", description="City / town name"),
+    pincode: str = Form("", description="Pincode"),
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="Wire format"),
+    view: ResponseView = Query("full", description=_VIEW_DESCRIPTION + " of the final event"),
+    fields: str = Query("", description=_FIELDS_DESCRIPTION),
+):
+    selected = _response_fields(view, fields)
+    # Upload problems are still plain 4xx responses; only the model part streams
+    image_bytes_list, filenames, positions, skipped_images = await _ingest_images(images)
+    location = LocationContext(
+        state=state,
+        city=city or None,
+        pincode=pincode or None,
     )
 
-    # -----------------------------
-    # STEP 3: Persona + explanation (simple English)
-    # -----------------------------
-    persona, persona_explanation = persona_and_explanation_from_score(lifestyle_index)
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in stream_household(
+                image_bytes_list,
+                location,
+                filenames=filenames,
+                positions=positions,
+                skipped_images=skipped_images,
+                fields=selected,
+            ):
+                yield encode_stream_event(event, format)
+        except HTTPException as e:
+            # Headers are already sent: report the failure in-band
+            logger.warning("Streaming score failed: %s", e.detail)
+            yield encode_stream_event(
+                {"event": "error", "status": e.status_code, "detail": e.detail}, format
+            )
+        except Exception as e:
+            # Anything else would just cut the stream short; close it with an
+            # error event instead
+            logger.exception("Streaming score failed.")
+            unavailable = isinstance(e, (asyncio.TimeoutError, CircuitOpenError))
+            yield encode_stream_event(
+                {
+                    "event": "error",
+                    "status": 503 if unavailable else 500,
+                    "detail": "Scoring is temporarily unavailable; please retry shortly."
+                    if unavailable
+                    else "Scoring failed.",
+                },
+                format,
+            )
 
-    # -----------------------------
-    # Combine final explanation
-    # -----------------------------
-    final_explanation = (
-        f"{persona_explanation} "
-        f"Your lifestyle index is {lifestyle_index:.1f} based on detected assets "
-        f"and your state context ({breakdown.metro_flag}, {breakdown.climate_zone}). "
-        "For example, in hot-arid states like Rajasthan, an air-conditioner is treated "
-        "closer to a necessity, while in temperate metro states like Karnataka "
-        "(e.g., Bengaluru), the same AC contributes more towards lifestyle scoring."
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    # -----------------------------
-    # Return final response
-    # -----------------------------
-    return LifestyleScoreResponse(
-        lifestyle_index=lifestyle_index,
-        persona_hint=persona,
-        breakdown=breakdown,
-        location_context=location,
-        gemini_raw=raw_signals,
-        explanation=final_explanation,
+
+@router.post(
+    "/lifestyle/jobs",
+    response_model=JobStatus,
+    status_code=202,
+    summary="Queue a household for scoring; poll GET /score/lifestyle/jobs/{job_id} for the result",
+    responses={429: {"description": "Job queue is full; retry after Retry-After seconds"}},
+)
+async def submit_lifestyle_job(
+    response: Response,
+    images: List[UploadFile] = File(..., description="Upload 1–10 household images"),
+    state: str = Form(..., description="Indian state (e.g., Karnataka, Rajasthan)"),
+    city: str = Form("", description="City / town name"),
+    pincode: str = Form("", description="Pincode"),
+    callback_url: str = Form("", description="Optional URL the finished job is POSTed to"),
+):
+    if callback_url:
+        try:
+            validate_callback_url(callback_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    image_bytes_list, filenames, positions, skipped_images = await _ingest_images(images)
+    location = LocationContext(
+        state=state,
+        city=city or None,
+        pincode=pincode or None,
     )
+
+    try:
+        job = get_job_queue().submit(
+            image_bytes_list,
+            location,
+            filenames=filenames,
+            positions=positions,
+            skipped_images=skipped_images,
+            callback_url=callback_url or None,
+        )
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Scoring queue is full ({e.depth} jobs waiting); please retry later.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    response.headers["Location"] = f"{router.prefix}/lifestyle/jobs/{job.job_id}"
+    return job
+
+
+@router.get(
+    "/lifestyle/jobs/{job_id}",
+    response_model=JobStatus,
+    summary="Status of a scoring job, with the LifestyleScoreResponse once it has succeeded",
+)
+def get_lifestyle_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return job
+
+
+@router.post(
+    "/lifestyle/batch",
+    summary="Score many households from server-side image paths (NDJSON stream)",
+    response_description="One BatchScoreResult JSON object per line, in completion order",
+)
+async def score_lifestyle_batch_endpoint(request: BatchScoreRequest):
+    settings = get_settings()
+    if not settings.bulk_image_root:
+        raise HTTPException(
+            status_code=403,
+            detail="Batch scoring requires BULK_IMAGE_ROOT to be configured.",
+        )
+    if len(request.households) > settings.batch_max_households:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.batch_max_households} households per batch.",
+        )
+
+    async def ndjson() -> AsyncIterator[str]:
+        async for result in run_batch(
+            request.households,
+            concurrency=request.concurrency,
+            image_root=settings.bulk_image_root,
+        ):
+            yield result.json() + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/rescore",
+    response_model=RescoreSummary,
+    summary="What-if: re-score all stored signals against candidate weights (no model calls)",
+)
+async def rescore_endpoint(request: RescoreRequest):
+    store = get_signal_store()
+    if store is None:
+        raise HTTPException(status_code=403, detail="Signal store is disabled.")
+
+    try:
+        candidate = make_candidate(
+            request.asset_weights,
+            request.state_profiles,
+            request.version,
+            request.circle_profiles,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # CPU-bound over the whole book; keep the event loop free
+    return await asyncio.to_thread(rescore_store, store, candidate)
+
+
+@router.get(
+    "/cache/stats",
+    summary="Hit/miss counters for the Gemini signal result cache",
+)
+def result_cache_stats():
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "backend": type(cache.backend).__name__, **cache.stats()}
+
+
+@router.get(
+    "/config",
+    summary="Live scoring config version and reload counters",
+)
+def scoring_config_info():
+    return scoring_table_stats()
+
+
+@router.post(
+    "/config/reload",
+    summary="Re-read SCORING_CONFIG_PATH and atomically swap the scoring tables",
+)
+async def reload_scoring_config():
+    if not get_settings().scoring_config_path:
+        raise HTTPException(
+            status_code=403,
+            detail="Config reload requires SCORING_CONFIG_PATH to be configured.",
+        )
+    try:
+        return await config_reload.reload()
+    except (OSError, ValueError) as e:
+        # The live version keeps serving
+        raise HTTPException(status_code=400, detail=f"Reload failed: {e}")
@@ -1,23 +1,23 @@
 # app/schemas.py
 
-from typing import List, Optional, Literal, Dict
+from typing import Any, List, Optional, Literal, Dict, Union
 from pydantic import BaseModel, Field
 
 
 # Layman-friendly persona labels
 LifestylePersona = Literal[
-    "HIGH_EARNING_COMFORT_SEEKER",       # Previously "AFFLUENT"
-    "TRENDSETTER_AND_INFLUENCER",        # Previously "OPINION_LEADER"
-    "TECH_SAVVY_MODERN_USER",            # Previously "TECHNOLOGY_MAVERICK"
-    "IMPULSIVE_BUYER",                   # Previously "IMPULSIVE_SPENDER"
-    "DEAL_AND_DISCOUNT_LOVER",           # Previously "OFFER_ENTHUSIAST"
-    "HEALTH_AND_ECO_FRIENDLY_USER",      # Previously "ECO_WELLNESS_DIGITALIST"
-    "FAMILY_FIRST_AND_COMMUNITY_ORIENTED", # Previously "COLLECTIVIST"
-    "SAFE_AND_CAREFUL_PLANNER",          # Previously "CAUTIOUS_PLANNER"
-    "TRADITIONAL_HOME_FOCUSED",          # Previously "MATURE_TRADITIONALIST"
-    "FINANCIALLY_CONSTRAINED_USER",      # Previously "STRUGGLER"
-    "HOME_COMFORT_AND_WARMTH_SEEKER",    # Previously "NESTLER"
-    "LOW_TRUST_MINIMAL_TECH_USER",       # Previously "TECH_TRUST_SKEPTIC"
+    "HIGH_INCOME_LIFESTYLE",     # Previously "HIGH_EARNING_COMFORT_SEEKER"
+    "TREND_FOLLOWER",            # Previously "TRENDSETTER_AND_INFLUENCER"
+    "TECH_FRIENDLY_USER",        # Previously "TECH_SAVVY_MODERN_USER"
+    "SPONTANEOUS_BUYER",         # Previously "IMPULSIVE_BUYER"
+    "DISCOUNT_SEEKER",           # Previously "DEAL_AND_DISCOUNT_LOVER"
+    "HEALTH_AND_ECO_MINDED",     # Previously "HEALTH_AND_ECO_FRIENDLY_USER"
+    "FAMILY_ORIENTED",           # Previously "FAMILY_FIRST_AND_COMMUNITY_ORIENTED"
+    "CAREFUL_PLANNER",           # Previously "SAFE_AND_CAREFUL_PLANNER"
+    "TRADITIONAL_LIFESTYLE",     # Previously "TRADITIONAL_HOME_FOCUSED"
+    "LOW_INCOME_LIFESTYLE",      # Previously "FINANCIALLY_CONSTRAINED_USER"
+    "HOME_COMFORT_LOVER",        # Previously "HOME_COMFORT_AND_WARMTH_SEEKER"
+    "LOW_TECH_USER",             # Previously "LOW_TRUST_MINIMAL_TECH_USER"
 ]
 
 
@@ -44,9 +44,40 @@ class LifestyleScoreBreakdown(BaseModel):
     normalized_score: float
     max_score: float
     asset_contributions: Dict[str, float]
-    location_adjustments: Dict[str, float]
+    location_adjustments: Dict[str, Union[float, str]]
     metro_flag: str
     climate_zone: str
+    scoring_version: Optional[str] = Field(
+        None, description="Version of the weights / state profiles used for this score"
+    )
+    location_source: Optional[str] = Field(
+        None,
+        description="Which input set the profile: pincode | city | circle | state | default",
+    )
+    district: Optional[str] = None
+    city_tier: Optional[int] = None
+    resolved_state: Optional[str] = None
+    state_match: Optional[str] = Field(
+        None, description="How the state input was matched: exact | alias | city | fuzzy | unresolved"
+    )
+    state_match_confidence: Optional[float] = None
+
+
+class SkippedImage(BaseModel):
+    index: int = Field(..., description="Position of the image in the upload list")
+    filename: Optional[str] = None
+    reason: str
+    duplicate_of: Optional[int] = None
+    hash_distance: Optional[int] = None
+
+
+class TokenUsage(BaseModel):
+    model_calls: int = 0
+    prompt_tokens: int = Field(0, description="All input tokens: instruction, prompt and images")
+    image_tokens: int = Field(0, description="Part of prompt_tokens spent on images")
+    cached_tokens: int = Field(0, description="Part of prompt_tokens served from the context cache")
+    output_tokens: int = 0
+    total_tokens: int = 0
 
 
 class LifestyleScoreResponse(BaseModel):
@@ -56,6 +87,73 @@ class LifestyleScoreResponse(BaseModel):
     location_context: LocationContext
     gemini_raw: GeminiRawSignals
     explanation: str
+    skipped_images: List[SkippedImage] = Field(default_factory=list)
+    token_usage: Optional[TokenUsage] = Field(
+        None, description="Gemini tokens spent on this request (RESPONSE_INCLUDE_TOKEN_USAGE)"
+    )
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: float = Field(..., description="Unix time the job was accepted")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_position: Optional[int] = Field(
+        None, description="Jobs ahead of this one while it is queued"
+    )
+    result: Optional[LifestyleScoreResponse] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = Field(
+        None, description="HTTP status the synchronous endpoint would have returned"
+    )
+
+
+class HouseholdManifestEntry(BaseModel):
+    household_id: str
+    images: List[str] = Field(..., description="Image paths, relative to the bulk image root")
+    state: str
+    city: Optional[str] = None
+    pincode: Optional[str] = None
+
+
+class BatchScoreRequest(BaseModel):
+    households: List[HouseholdManifestEntry]
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+
+class BatchScoreResult(BaseModel):
+    household_id: str
+    status: Literal["ok", "error"]
+    result: Optional[LifestyleScoreResponse] = None
+    error: Optional[str] = None
+
+
+class RescoreRequest(BaseModel):
+    version: Optional[str] = Field(None, description="Label for the candidate weights")
+    asset_weights: Optional[Dict[str, Dict[str, Any]]] = Field(
+        None, description="Candidate ASSET_WEIGHTS (defaults to the live weights)"
+    )
+    state_profiles: Optional[Dict[str, Dict[str, str]]] = Field(
+        None, description="Candidate STATE_PROFILES (defaults to the live profiles)"
+    )
+    circle_profiles: Optional[Dict[str, Dict[str, str]]] = Field(
+        None, description="Candidate rest-of-circle profiles (defaults to the live ones)"
+    )
+
+
+class RescoreSummary(BaseModel):
+    candidate_version: Optional[str] = None
+    baseline_version: Optional[str] = None
+    households: int
+    changed: int
+    mean_delta: float
+    mean_abs_delta: float
+    p95_abs_delta: float
+    max_abs_delta: float
+    # old persona -> new persona -> household count (only households that moved)
+    persona_migrations: Dict[str, Dict[str, int]]
+    elapsed_seconds: float
 
 
 class ErrorResponse(BaseModel):
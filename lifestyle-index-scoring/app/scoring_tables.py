@@ -0,0 +1,354 @@
+# app/scoring_tables.py
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .location_config import (
+    DEFAULT_STATE_PROFILE,
+    STATE_PROFILES,
+    ClimateZone,
+    MetroFlag,
+    StateProfile,
+)
+from .scoring_config import ASSET_WEIGHTS, AssetWeight, normalize_asset_name
+
+CLIMATE_ZONES: Tuple[ClimateZone, ...] = ("hot_arid", "hot_humid", "temperate", "cold")
+METRO_FLAGS: Tuple[MetroFlag, ...] = ("metro", "non_metro")
+
+BUILTIN_VERSION = "builtin"
+
+_WEIGHT_KEYS = ("base", "metro_multiplier", "non_metro_multiplier", "climate_adjust")
+_PROFILE_KEYS = ("climate", "metro_flag")
+
+
+def context_id(metro_flag: str, climate_zone: str) -> int:
+    """Flat index of a (metro_flag, climate) pair: 0..7."""
+    return METRO_FLAGS.index(metro_flag) * len(CLIMATE_ZONES) + CLIMATE_ZONES.index(climate_zone)
+
+
+class StateRecord:
+    """Resolved location context for one state, shared by every lookup."""
+
+    __slots__ = ("context", "climate", "metro_flag")
+
+    # State-level records carry no district / tier (see LocationRecord)
+    district = None
+    tier = None
+
+    def __init__(self, metro_flag: MetroFlag, climate: ClimateZone):
+        self.context = context_id(metro_flag, climate)
+        self.climate: ClimateZone = sys.intern(climate)
+        self.metro_flag: MetroFlag = sys.intern(metro_flag)
+
+
+class ScoringTable:
+    """
+    Immutable, precompiled form of ASSET_WEIGHTS + STATE_PROFILES.
+
+    asset_coef[name][context] = base * metro/non-metro multiplier * climate
+    adjust, so scoring an asset is one dict lookup, one tuple index and two
+    multiplies. States map to one of 8 shared StateRecords (one per context).
+
+    `circles` holds configured rest-of-circle profiles: the part of a
+    state's postal circle outside the districts the pincode index lists.
+    States without one use the profile of their state-wide index row.
+
+    `version` identifies the config the table was compiled from and is echoed
+    in every breakdown; `asset_weights` / `state_profiles` / `circle_profiles`
+    keep that source config so rescoring can compare candidates against the
+    live version.
+    """
+
+    __slots__ = (
+        "asset_coef",
+        "states",
+        "circles",
+        "default_state",
+        "version",
+        "content_hash",
+        "asset_weights",
+        "state_profiles",
+        "circle_profiles",
+    )
+
+    def __init__(
+        self,
+        asset_coef: Mapping[str, Tuple[float, ...]],
+        states: Mapping[str, StateRecord],
+        default_state: StateRecord,
+        version: str = BUILTIN_VERSION,
+        content_hash: str = "",
+        asset_weights: Optional[Mapping[str, AssetWeight]] = None,
+        state_profiles: Optional[Mapping[str, StateProfile]] = None,
+        circles: Optional[Mapping[str, StateRecord]] = None,
+        circle_profiles: Optional[Mapping[str, StateProfile]] = None,
+    ):
+        self.asset_coef = asset_coef
+        self.states = states
+        self.circles = circles if circles is not None else MappingProxyType({})
+        self.default_state = default_state
+        self.version = version
+        self.content_hash = content_hash
+        self.asset_weights = asset_weights if asset_weights is not None else ASSET_WEIGHTS
+        self.state_profiles = state_profiles if state_profiles is not None else STATE_PROFILES
+        self.circle_profiles = (
+            circle_profiles if circle_profiles is not None else MappingProxyType({})
+        )
+
+    def lookup_state(self, state_name: Optional[str]) -> StateRecord:
+        return self.states.get((state_name or "").strip().upper(), self.default_state)
+
+    def coefficients(self, asset_name: str) -> Optional[Tuple[float, ...]]:
+        """Per-context coefficients for an asset; names are normalized only on a miss."""
+        row = self.asset_coef.get(asset_name)
+        if row is None:
+            row = self.asset_coef.get(normalize_asset_name(asset_name))
+        return row
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_mapping(value: Any, where: str) -> Mapping[Any, Any]:
+    if not isinstance(value, Mapping):
+        raise ValueError(f"{where} must be a mapping, got {type(value).__name__}")
+    for key in value:
+        if not isinstance(key, str):
+            raise ValueError(f"{where} has a non-string key {key!r}")
+    return value
+
+
+def validate_scoring_config(
+    asset_weights: Optional[Mapping[str, Any]],
+    state_profiles: Optional[Mapping[str, Any]],
+    circle_profiles: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """
+    Raise ValueError on a table that would not compile: wrong shapes, missing
+    keys, non-numeric weights, unknown climate zones or metro flags.
+    """
+    if asset_weights is not None:
+        _check_mapping(asset_weights, "asset_weights")
+    profile_tables = (("state_profiles", state_profiles), ("circle_profiles", circle_profiles))
+    for label, profiles in profile_tables:
+        if profiles is not None:
+            _check_mapping(profiles, label)
+
+    for name, w in (asset_weights or {}).items():
+        where = f"asset_weights[{name!r}]"
+        _check_mapping(w, where)
+        missing = [k for k in _WEIGHT_KEYS if k not in w]
+        if missing:
+            raise ValueError(f"{where} is missing {missing}")
+        for key in ("base", "metro_multiplier", "non_metro_multiplier"):
+            if not _is_number(w[key]):
+                raise ValueError(f"{where}[{key!r}] must be a number, got {w[key]!r}")
+        _check_mapping(w["climate_adjust"], f"{where}['climate_adjust']")
+        unknown = [z for z in w["climate_adjust"] if z not in CLIMATE_ZONES]
+        if unknown:
+            raise ValueError(f"{where} has unknown climate zones {unknown}")
+        for zone, adjust in w["climate_adjust"].items():
+            if not _is_number(adjust):
+                raise ValueError(f"{where}['climate_adjust'][{zone!r}] must be a number, got {adjust!r}")
+    for label, profiles in profile_tables:
+        for name, p in (profiles or {}).items():
+            where = f"{label}[{name!r}]"
+            _check_mapping(p, where)
+            missing = [k for k in _PROFILE_KEYS if k not in p]
+            if missing:
+                raise ValueError(f"{where} is missing {missing}")
+            if p["climate"] not in CLIMATE_ZONES:
+                raise ValueError(f"{where} has unknown climate {p['climate']!r}")
+            if p["metro_flag"] not in METRO_FLAGS:
+                raise ValueError(f"{where} has unknown metro_flag {p['metro_flag']!r}")
+
+
+def config_hash(
+    asset_weights: Mapping[str, Any],
+    state_profiles: Mapping[str, Any],
+    circle_profiles: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """Stable content hash of a weights + profiles config."""
+    doc = {"asset_weights": asset_weights, "state_profiles": state_profiles}
+    if circle_profiles:
+        # Only when set, so configs without circles keep their hash
+        doc["circle_profiles"] = circle_profiles
+    canonical = json.dumps(doc, sort_keys=True, separators=(",", ":"), default=dict)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compile_scoring_table(
+    asset_weights: Optional[Dict[str, AssetWeight]] = None,
+    state_profiles: Optional[Dict[str, StateProfile]] = None,
+    version: Optional[str] = None,
+    circle_profiles: Optional[Dict[str, StateProfile]] = None,
+) -> ScoringTable:
+    asset_weights = asset_weights or ASSET_WEIGHTS
+    state_profiles = state_profiles or STATE_PROFILES
+    circle_profiles = circle_profiles or {}
+    content_hash = config_hash(asset_weights, state_profiles, circle_profiles)
+
+    asset_coef: Dict[str, Tuple[float, ...]] = {}
+    for name, w in asset_weights.items():
+        row = []
+        for mult in (w["metro_multiplier"], w["non_metro_multiplier"]):
+            for zone in CLIMATE_ZONES:
+                row.append(w["base"] * mult * w["climate_adjust"].get(zone, 1.0))
+        asset_coef[sys.intern(name)] = tuple(row)
+
+    # One shared record per context, so states are interned to 8 objects
+    records: Dict[int, StateRecord] = {}
+
+    def record_for(profile: StateProfile) -> StateRecord:
+        rec = StateRecord(profile["metro_flag"], profile["climate"])
+        return records.setdefault(rec.context, rec)
+
+    states = {
+        sys.intern(name.strip().upper()): record_for(profile)
+        for name, profile in state_profiles.items()
+    }
+    circles = {
+        sys.intern(name.strip().upper()): record_for(profile)
+        for name, profile in circle_profiles.items()
+    }
+
+    return ScoringTable(
+        asset_coef=MappingProxyType(asset_coef),
+        states=MappingProxyType(states),
+        default_state=record_for(DEFAULT_STATE_PROFILE),
+        version=version or f"sha256:{content_hash[:12]}",
+        content_hash=content_hash,
+        asset_weights=MappingProxyType(dict(asset_weights)),
+        state_profiles=MappingProxyType(dict(state_profiles)),
+        circles=MappingProxyType(circles),
+        circle_profiles=MappingProxyType(dict(circle_profiles)),
+    )
+
+
+def read_scoring_config(path: str) -> Dict[str, Any]:
+    """
+    Parse a scoring config file: {"version", "asset_weights", "state_profiles",
+    "circle_profiles"}.
+    .yaml / .yml files need PyYAML; anything else is read as JSON.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML scoring configs require the 'PyYAML' package")
+            try:
+                doc = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: invalid YAML: {e}")
+        else:
+            doc = json.load(f)
+
+    if not isinstance(doc, dict):
+        raise ValueError(f"{path}: expected a mapping at the top level")
+    return doc
+
+
+def load_scoring_table(path: str) -> ScoringTable:
+    """
+    Read, validate and compile a config file. Any table may be omitted to
+    keep the built-in one (no circle overrides). Without a "version" key the
+    table is versioned by its content hash.
+    """
+    doc = read_scoring_config(path)
+    asset_weights = doc.get("asset_weights")
+    state_profiles = doc.get("state_profiles")
+    circle_profiles = doc.get("circle_profiles")
+    validate_scoring_config(asset_weights, state_profiles, circle_profiles)
+    if state_profiles:
+        state_profiles = {k.strip().upper(): v for k, v in state_profiles.items()}
+    if circle_profiles:
+        circle_profiles = {k.strip().upper(): v for k, v in circle_profiles.items()}
+
+    version = doc.get("version")
+    return compile_scoring_table(
+        asset_weights or None,
+        state_profiles or None,
+        version=str(version) if version is not None else None,
+        circle_profiles=circle_profiles or None,
+    )
+
+
+# ---------------------------------------------------------
+# Live table: readers take one reference, reloads swap it
+# ---------------------------------------------------------
+_TABLE = compile_scoring_table(version=BUILTIN_VERSION)
+_SWAP_LOCK = threading.Lock()
+_RELOAD_STATS: Dict[str, Any] = {
+    "source": None,
+    "loaded_at": time.time(),
+    "reloads": 0,
+    "reload_failures": 0,
+    "last_error": None,
+    "last_load_ms": None,
+    "last_swap_us": None,
+}
+
+
+def get_scoring_table() -> ScoringTable:
+    """
+    The live table. Callers should fetch it once per request and keep the
+    reference, so a concurrent reload never mixes two versions in one score.
+    """
+    return _TABLE
+
+
+def swap_scoring_table(table: ScoringTable, source: Optional[str] = None) -> ScoringTable:
+    """Atomically publish `table`; returns the table it replaced."""
+    global _TABLE
+    with _SWAP_LOCK:
+        start = time.perf_counter()
+        previous, _TABLE = _TABLE, table
+        _RELOAD_STATS["last_swap_us"] = round((time.perf_counter() - start) * 1e6, 3)
+        _RELOAD_STATS["source"] = source
+        _RELOAD_STATS["loaded_at"] = time.time()
+    return previous
+
+
+def reload_scoring_table(path: str) -> Tuple[ScoringTable, bool]:
+    """
+    Load `path` and swap it in. Returns (live table, whether it changed);
+    an unchanged file (same content hash and version) is not swapped.
+    On a bad file the live table is kept and the error re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        table = load_scoring_table(path)
+    except (OSError, ValueError) as e:
+        _RELOAD_STATS["reload_failures"] += 1
+        _RELOAD_STATS["last_error"] = f"{type(e).__name__}: {e}"
+        raise
+    _RELOAD_STATS["last_load_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    _RELOAD_STATS["last_error"] = None
+
+    live = _TABLE
+    if table.content_hash == live.content_hash and table.version == live.version:
+        return live, False
+
+    swap_scoring_table(table, source=path)
+    _RELOAD_STATS["reloads"] += 1
+    return table, True
+
+
+def scoring_table_stats() -> Dict[str, Any]:
+    table = _TABLE
+    return {
+        "version": table.version,
+        "content_hash": table.content_hash,
+        "assets": len(table.asset_coef),
+        "states": len(table.states),
+        "circles": len(table.circles),
+        **_RELOAD_STATS,
+    }
@@ -0,0 +1,91 @@
+# app/services/asset_stream.py
+
+from typing import Any, Dict, List, Optional
+
+from .model_json import try_loads
+
+
+class IncrementalAssetParser:
+    """
+    Pull complete asset objects out of a Gemini JSON answer while it is
+    still streaming in.
+
+    Text is fed chunk by chunk; feed() returns the entries of the top-level
+    "assets" array that became complete with this chunk, as dicts. The
+    scanner tracks strings / escapes and brace depth, so each character is
+    looked at once, and it tolerates fences or prose around the JSON (it
+    only starts at the first `"assets"` key followed by `[`). The final,
+    authoritative parse still happens on the full text once the stream ends.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0  # next character to scan
+        self._array_started = False
+        self._done = False
+        self._depth = 0  # inside the assets array: 0 between entries
+        self._in_string = False
+        self._escape = False
+        self._obj_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._text
+
+    def _find_array(self) -> bool:
+        while True:
+            key = self._text.find('"assets"', self._pos)
+            if key == -1:
+                # The key may be split across chunks
+                self._pos = max(self._pos, len(self._text) - len('"assets"') + 1)
+                return False
+            i = key + len('"assets"')
+            while i < len(self._text) and self._text[i] in " \t\r\n:":
+                i += 1
+            if i >= len(self._text):
+                self._pos = key  # wait for more text after the key
+                return False
+            if self._text[i] == "[":
+                self._pos = i + 1
+                self._array_started = True
+                return True
+            self._pos = key + 1  # "assets": null or similar; try the next key
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._text += chunk
+        if self._done or (not self._array_started and not self._find_array()):
+            return []
+
+        found: List[Dict[str, Any]] = []
+        text = self._text
+        i = self._pos
+        while i < len(text):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                if self._depth == 0:
+                    self._obj_start = i
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._obj_start is not None:
+                    entry = try_loads(text[self._obj_start : i + 1])
+                    if isinstance(entry, dict):
+                        found.append(entry)
+                    self._obj_start = None
+            elif c == "]" and self._depth == 0:
+                self._done = True
+                i += 1
+                break
+            i += 1
+        self._pos = i
+        return found
@@ -0,0 +1,157 @@
+# app/services/bulk_runner.py
+
+import asyncio
+import os
+from typing import AsyncIterator, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from ..config import get_settings
+from ..logger import logger
+from ..schemas import (
+    BatchScoreResult,
+    HouseholdManifestEntry,
+    LocationContext,
+    SkippedImage,
+)
+from .image_ingest import ImageTooLarge, downscale_image
+from .scoring_pipeline import score_household
+
+MAX_IMAGES_PER_HOUSEHOLD = 10
+
+
+def _resolve_image_path(path: str, image_root: Optional[str]) -> str:
+    """Resolve a manifest path, refusing anything that escapes image_root."""
+    if image_root is None:
+        return os.path.abspath(path)
+
+    root = os.path.realpath(image_root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Image path escapes the bulk image root: {path}")
+    return resolved
+
+
+def load_household_image(path: str, image_root: Optional[str] = None) -> bytes:
+    """
+    Read one image from disk and apply the same size cap and downscaling as
+    online uploads, so bulk and online scores match for the same photos.
+    """
+    settings = get_settings()
+    resolved = _resolve_image_path(path, image_root)
+
+    if os.path.getsize(resolved) > settings.upload_max_bytes:
+        raise ValueError(f"Image exceeds the upload size limit: {path}")
+
+    with open(resolved, "rb") as f:
+        data = f.read()
+    if not data:
+        return data
+    try:
+        return downscale_image(data, settings.image_max_side, settings.image_jpeg_quality)
+    except ImageTooLarge as e:
+        raise ImageTooLarge(e.reason, path) from None
+
+
+async def score_manifest_entry(
+    entry: HouseholdManifestEntry,
+    image_root: Optional[str] = None,
+) -> BatchScoreResult:
+    """Score one household; failures are returned as status="error", never raised."""
+    try:
+        if not entry.images:
+            raise ValueError("At least one image is required.")
+        if len(entry.images) > MAX_IMAGES_PER_HOUSEHOLD:
+            raise ValueError(f"Maximum {MAX_IMAGES_PER_HOUSEHOLD} images allowed.")
+
+        image_bytes_list: List[bytes] = []
+        filenames: List[Optional[str]] = []
+        positions: List[int] = []
+        skipped_images: List[SkippedImage] = []
+        for i, path in enumerate(entry.images):
+            data = await asyncio.to_thread(load_household_image, path, image_root)
+            if not data:
+                skipped_images.append(SkippedImage(index=i, filename=path, reason="empty"))
+                continue
+            image_bytes_list.append(data)
+            filenames.append(path)
+            positions.append(i)
+
+        if not image_bytes_list:
+            raise ValueError("All images are empty.")
+
+        location = LocationContext(
+            state=entry.state,
+            city=entry.city or None,
+            pincode=entry.pincode or None,
+        )
+        result = await score_household(
+            image_bytes_list,
+            location,
+            filenames=filenames,
+            positions=positions,
+            skipped_images=skipped_images,
+            household_id=entry.household_id,
+        )
+        return BatchScoreResult(household_id=entry.household_id, status="ok", result=result)
+
+    except HTTPException as e:
+        error = str(e.detail)
+    except (OSError, ValueError) as e:
+        error = str(e)
+    except Exception as e:
+        # Model failures (open circuit, API and parse errors) land here; a
+        # raise would end the worker and silently drop the household
+        logger.exception("Bulk scoring failed for household %s.", entry.household_id)
+        return BatchScoreResult(
+            household_id=entry.household_id,
+            status="error",
+            error=f"{type(e).__name__}: {e}",
+        )
+
+    logger.warning("Bulk scoring failed for household %s: %s", entry.household_id, error)
+    return BatchScoreResult(household_id=entry.household_id, status="error", error=error)
+
+
+async def run_batch(
+    entries: Iterable[HouseholdManifestEntry],
+    concurrency: Optional[int] = None,
+    image_root: Optional[str] = None,
+) -> AsyncIterator[BatchScoreResult]:
+    """
+    Score households with at most `concurrency` in flight and yield results
+    as they complete. `entries` is consumed lazily, so a manifest with
+    millions of rows is never fully materialized. Per-household failures
+    are yielded as status="error"; anything else that stops a worker (e.g.
+    reading the manifest) is re-raised once the other workers finish.
+    """
+    concurrency = max(1, concurrency or get_settings().bulk_concurrency)
+    source = iter(entries)
+    results: "asyncio.Queue[Optional[BatchScoreResult]]" = asyncio.Queue(concurrency * 2)
+    failures: List[Exception] = []
+
+    async def worker() -> None:
+        try:
+            # Single event loop: next() on the shared iterator is never concurrent
+            for entry in source:
+                await results.put(await score_manifest_entry(entry, image_root))
+        except Exception as e:
+            failures.append(e)
+        finally:
+            await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = await results.get()
+            if item is None:
+                remaining -= 1
+                continue
+            yield item
+        if failures:
+            raise failures[0]
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
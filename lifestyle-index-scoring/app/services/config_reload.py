@@ -0,0 +1,114 @@
+# app/services/config_reload.py
+
+import asyncio
+import os
+import signal
+from typing import Any, Dict, Optional
+
+from ..config import get_settings
+from ..logger import logger
+from ..scoring_tables import reload_scoring_table, scoring_table_stats
+
+_poll_task: Optional[asyncio.Task] = None
+_reload_lock: Optional[asyncio.Lock] = None
+_sighup_installed = False
+
+
+def _get_reload_lock() -> asyncio.Lock:
+    global _reload_lock
+    if _reload_lock is None:
+        _reload_lock = asyncio.Lock()
+    return _reload_lock
+
+
+async def reload(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Re-read the scoring config and swap the compiled table in.
+
+    Parsing and compiling run on a worker thread; the swap itself is a single
+    reference assignment, so requests already holding the old table finish
+    on it. Raises OSError / ValueError (live table kept) on a bad file.
+    """
+    path = path or get_settings().scoring_config_path
+    if not path:
+        raise ValueError("No scoring config configured (SCORING_CONFIG_PATH).")
+
+    async with _get_reload_lock():
+        table, changed = await asyncio.to_thread(reload_scoring_table, path)
+
+    stats = scoring_table_stats()
+    if changed:
+        logger.info(
+            "Scoring config %s loaded: version=%s load=%sms swap=%sus",
+            path,
+            table.version,
+            stats["last_load_ms"],
+            stats["last_swap_us"],
+        )
+    return {"changed": changed, **stats}
+
+
+async def _reload_logged(reason: str) -> None:
+    try:
+        await reload()
+    except Exception:
+        # Whatever a bad save raises, the poller and SIGHUP handler live on
+        logger.exception("Scoring config reload (%s) failed; keeping the live version.", reason)
+
+
+async def _poll(path: str, interval: float) -> None:
+    """Reload whenever the config file's mtime changes."""
+    last_mtime: Optional[float] = None
+    while True:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        if last_mtime is not None and mtime is not None and mtime != last_mtime:
+            await _reload_logged("file changed")
+        last_mtime = mtime
+        await asyncio.sleep(interval)
+
+
+def startup() -> None:
+    """
+    FastAPI lifespan hook: load the configured file (a bad file fails startup
+    rather than silently serving the built-in weights), then arm SIGHUP and
+    the optional mtime poller.
+    """
+    global _poll_task, _sighup_installed
+    settings = get_settings()
+    path = settings.scoring_config_path
+    if not path:
+        return
+
+    table, _ = reload_scoring_table(path)
+    logger.info("Scoring config %s loaded: version=%s", path, table.version)
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(
+            signal.SIGHUP,
+            lambda: asyncio.ensure_future(_reload_logged("SIGHUP")),
+        )
+        _sighup_installed = True
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        # No SIGHUP on Windows / not on the main thread; the endpoint still works
+        logger.info("SIGHUP reload unavailable; use POST /score/config/reload.")
+
+    if settings.scoring_config_poll_seconds > 0:
+        _poll_task = asyncio.ensure_future(_poll(path, settings.scoring_config_poll_seconds))
+
+
+async def shutdown() -> None:
+    global _poll_task, _sighup_installed
+    if _poll_task is not None:
+        _poll_task.cancel()
+        try:
+            await _poll_task
+        except asyncio.CancelledError:
+            pass
+        _poll_task = None
+    if _sighup_installed:
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        _sighup_installed = False
@@ -0,0 +1,172 @@
+# app/services/image_dedup.py
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIL import Image, UnidentifiedImageError
+
+from ..config import get_settings
+from ..schemas import SkippedImage
+from .image_ingest import open_image
+
+# dHash on a 9x8 grayscale thumbnail -> 64-bit fingerprint
+_HASH_W, _HASH_H = 9, 8
+_BANDS = 8  # 8 x 8-bit bands; any two hashes within distance 7 share a band
+
+
+def dhash(image_bytes: bytes) -> Optional[int]:
+    """
+    64-bit difference hash of an image, or None if it cannot be decoded.
+    Robust to re-encoding, resizing and small exposure changes, so repeated
+    shots of the same room land within a few bits of each other. Raises
+    ImageTooLarge (413) over IMAGE_MAX_PIXELS.
+    """
+    try:
+        with open_image(image_bytes) as img:
+            # JPEG draft mode decodes at 1/2..1/8 scale, which is all we need
+            img.draft("L", (_HASH_W * 8, _HASH_H * 8))
+            small = img.convert("L").resize((_HASH_W, _HASH_H), Image.BILINEAR)
+            pixels = small.tobytes()  # one byte per pixel, row-major
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+
+    value = 0
+    for row in range(_HASH_H):
+        offset = row * _HASH_W
+        for col in range(_HASH_W - 1):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class PerceptualHashIndex:
+    """
+    Bounded, process-wide index of hashes seen in earlier requests. It is
+    shared by every client, so matches feed logs and metrics only and are
+    never returned in a response.
+
+    Near lookups use multi-index hashing: the 64-bit hash is split into 8
+    bytes and each byte is indexed separately, so only hashes sharing at
+    least one exact byte are compared (exact for distances up to 7).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._hashes: "OrderedDict[int, int]" = OrderedDict()  # hash -> times seen
+        self._bands: List[Dict[int, Set[int]]] = [dict() for _ in range(_BANDS)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _band_keys(h: int) -> List[int]:
+        return [(h >> (8 * i)) & 0xFF for i in range(_BANDS)]
+
+    def find(self, h: int, max_distance: int) -> Optional[int]:
+        """Return a stored hash within max_distance of h, if any."""
+        with self._lock:
+            if h in self._hashes:
+                return h
+            for band, key in zip(self._bands, self._band_keys(h)):
+                for candidate in band.get(key, ()):
+                    if hamming(h, candidate) <= max_distance:
+                        return candidate
+        return None
+
+    def add(self, h: int) -> None:
+        with self._lock:
+            if h in self._hashes:
+                self._hashes[h] += 1
+                self._hashes.move_to_end(h)
+                return
+            self._hashes[h] = 1
+            for band, key in zip(self._bands, self._band_keys(h)):
+                band.setdefault(key, set()).add(h)
+            while len(self._hashes) > self.max_entries:
+                old, _ = self._hashes.popitem(last=False)
+                for band, key in zip(self._bands, self._band_keys(old)):
+                    bucket = band.get(key)
+                    if bucket is not None:
+                        bucket.discard(old)
+                        if not bucket:
+                            del band[key]
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+@dataclass
+class DedupResult:
+    kept: List[bytes]
+    kept_indices: List[int]
+    skipped: List[SkippedImage] = field(default_factory=list)
+    # indices (into the original upload list) of kept images seen in earlier
+    # requests; counted in lifestyle_images_previously_seen_total, never returned
+    previously_seen: List[int] = field(default_factory=list)
+
+
+@lru_cache
+def get_hash_index() -> PerceptualHashIndex:
+    return PerceptualHashIndex(get_settings().image_hash_index_size)
+
+
+def dedup_images(
+    image_bytes_list: List[bytes],
+    filenames: Optional[List[Optional[str]]] = None,
+    max_distance: Optional[int] = None,
+    index: Optional[PerceptualHashIndex] = None,
+) -> DedupResult:
+    """
+    Drop uploads that are near-duplicates of an earlier upload in the same
+    request. The first image of each near-duplicate group is kept. Images
+    that cannot be decoded are passed through untouched for the model to judge.
+    """
+    if max_distance is None:
+        max_distance = get_settings().image_dedup_max_distance
+    if index is None:
+        index = get_hash_index()
+    filenames = filenames or [None] * len(image_bytes_list)
+
+    result = DedupResult(kept=[], kept_indices=[])
+    kept_hashes: List[Tuple[int, int]] = []  # (hash, original index)
+
+    for i, data in enumerate(image_bytes_list):
+        h = dhash(data)
+        if h is None:
+            result.kept.append(data)
+            result.kept_indices.append(i)
+            continue
+
+        duplicate_of = None
+        distance = None
+        for other_hash, other_index in kept_hashes:
+            d = hamming(h, other_hash)
+            if d <= max_distance:
+                duplicate_of, distance = other_index, d
+                break
+
+        if duplicate_of is not None:
+            result.skipped.append(
+                SkippedImage(
+                    index=i,
+                    filename=filenames[i],
+                    reason="near_duplicate",
+                    duplicate_of=duplicate_of,
+                    hash_distance=distance,
+                )
+            )
+            continue
+
+        if index.find(h, max_distance) is not None:
+            result.previously_seen.append(i)
+        index.add(h)
+
+        kept_hashes.append((h, i))
+        result.kept.append(data)
+        result.kept_indices.append(i)
+
+    return result
@@ -0,0 +1,138 @@
+# app/services/image_ingest.py
+
+import asyncio
+import io
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..config import get_settings
+from ..logger import logger
+from ..telemetry import IMAGE_BYTES, span
+
+
+class ImageTooLarge(HTTPException):
+    """An image over IMAGE_MAX_PIXELS or Pillow's decompression-bomb limit (413)."""
+
+    def __init__(self, reason: str, filename: Optional[str] = None):
+        name = f"Image '{filename}'" if filename else "Image"
+        super().__init__(status_code=413, detail=f"{name} {reason}.")
+        self.reason = reason
+
+
+def open_image(data: bytes, max_pixels: Optional[int] = None) -> Image.Image:
+    """
+    Image.open with the pixel count checked from the header, before anything
+    is decoded. Raises ImageTooLarge; undecodable data raises as Image.open does.
+    """
+    limit = max_pixels or get_settings().image_max_pixels
+    try:
+        img = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError:
+        raise ImageTooLarge("is too large to decode safely (decompression bomb check)") from None
+    w, h = img.size
+    if w * h > limit:
+        img.close()
+        raise ImageTooLarge(f"is {w}x{h} pixels, over the {limit / 1e6:g} megapixel limit")
+    return img
+
+
+async def read_upload_capped(
+    upload: UploadFile,
+    max_bytes: int,
+    chunk_size: int = 64 * 1024,
+) -> bytes:
+    """
+    Read a parsed upload in chunks, failing with 413 as soon as it exceeds
+    max_bytes. By now Starlette has already received the whole form, so this
+    only keeps oversized images out of memory and the decoder;
+    RequestSizeMiddleware is what bounds the body as it arrives.
+    """
+    buf = bytearray()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"Image '{upload.filename}' exceeds the "
+                    f"{max_bytes // (1024 * 1024)} MB upload limit."
+                ),
+            )
+    return bytes(buf)
+
+
+def downscale_image(data: bytes, max_side: int, quality: int) -> bytes:
+    """
+    Shrink an image so its longest side is at most max_side and re-encode it
+    as JPEG. JPEGs are decoded in draft mode at the smallest scale that still
+    covers max_side, so a 12 MP photo never exists at full size in memory.
+
+    Images that are already small JPEGs are returned unchanged. Anything
+    Pillow cannot decode is also returned unchanged for the model to judge;
+    images over IMAGE_MAX_PIXELS raise ImageTooLarge.
+    """
+    try:
+        with open_image(data) as img:
+            if img.format == "JPEG" and max(img.size) <= max_side:
+                return data
+
+            # draft() keeps both sides >= the requested box, so ask for the
+            # aspect-correct target size rather than a max_side square
+            w, h = img.size
+            scale = max_side / max(w, h)
+            img.draft("RGB", (max(1, int(w * scale)), max(1, int(h * scale))))
+            img = ImageOps.exif_transpose(img)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=quality)
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning("Could not decode image for downscaling: %s", e)
+        return data
+
+    encoded = out.getvalue()
+    # Re-encoding a tiny, highly compressed PNG can make it bigger
+    return encoded if len(encoded) < len(data) else data
+
+
+async def ingest_upload(
+    upload: UploadFile,
+    max_bytes: Optional[int] = None,
+    max_side: Optional[int] = None,
+    quality: Optional[int] = None,
+) -> bytes:
+    """
+    Bounded read + downscale of one upload. The original bytes are released
+    as soon as the re-encoded copy exists, so only compact images are held
+    for the rest of the request.
+    """
+    settings = get_settings()
+    with span("upload_read"):
+        raw = await read_upload_capped(
+            upload,
+            max_bytes=max_bytes or settings.upload_max_bytes,
+            chunk_size=settings.upload_chunk_bytes,
+        )
+    if not raw:
+        return raw
+    IMAGE_BYTES.inc("upload", amount=len(raw))
+
+    with span("downscale"):
+        try:
+            data = await asyncio.to_thread(
+                downscale_image,
+                raw,
+                max_side or settings.image_max_side,
+                quality or settings.image_jpeg_quality,
+            )
+        except ImageTooLarge as e:
+            raise ImageTooLarge(e.reason, upload.filename) from None
+    IMAGE_BYTES.inc("model", amount=len(data))
+    return data
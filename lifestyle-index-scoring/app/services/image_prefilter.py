@@ -0,0 +1,215 @@
+# app/services/image_prefilter.py
+"""
+CPU-only pre-filter that keeps images without household content away from
+the remote model.
+
+Tier 1, image statistics on a 64x64 thumbnail (JPEGs are decoded in draft
+mode at 1/8 scale, so this costs a few milliseconds per image):
+
+- blank: a near-uniform, black or blown-out frame (lens cap, pocket shot,
+  flash into a wall);
+- document: bright, mostly white and colourless - paper, receipts, ID
+  copies (a room photo always carries some colour cast);
+- screenshot: large flat areas in very few distinct colours, which a
+  camera sensor never produces.
+
+Tier 2 (optional): a small ONNX image classifier (PREFILTER_ONNX_MODEL_PATH,
+needs the 'onnxruntime' package) run on the images tier 1 kept. An image is
+dropped only when a label outside PREFILTER_ONNX_KEEP_LABELS wins with at
+least PREFILTER_ONNX_MIN_CONFIDENCE, so an unsure model sends the image on.
+
+Thresholds are deliberately conservative: a dropped household photo loses
+signal, a kept screenshot only costs a model call. Images Pillow cannot
+decode are kept for the model to judge, as in image_dedup.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from ..config import get_settings
+from ..schemas import SkippedImage
+from .image_ingest import open_image
+
+_THUMB = 64
+_CLASSIFIER_SIDE = 224
+_IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+# Tier 1 thresholds (luma 0-255 on the thumbnail)
+_BLANK_MAX_STD = 6.0
+_DARK_MAX_MEAN = 16.0
+_BRIGHT_MIN_MEAN = 245.0
+_BRIGHT_MAX_STD = 12.0
+_DOC_MIN_MEAN = 160.0
+_DOC_MIN_WHITE = 0.3
+_DOC_MAX_SATURATION = 6.0
+_SCREEN_MIN_FLAT = 0.5
+_SCREEN_MAX_COLOURS = 0.015
+
+
+@dataclass
+class ImageStats:
+    mean: float
+    std: float
+    flat: float  # share of neighbouring pixel pairs differing by <= 1 luma level
+    white: float  # share of pixels with luma >= 225
+    saturation: float  # mean max(R,G,B) - min(R,G,B)
+    colours: float  # distinct 15-bit colours / pixels
+
+
+def _thumbnail(image_bytes: bytes, side: int) -> Optional[np.ndarray]:
+    """
+    RGB array of the image shrunk to side x side, or None if it cannot be
+    decoded. Raises ImageTooLarge (413) over IMAGE_MAX_PIXELS.
+    """
+    try:
+        with open_image(image_bytes) as img:
+            img.draft("RGB", (side * 2, side * 2))
+            small = img.convert("RGB").resize((side, side), Image.BILINEAR)
+            return np.asarray(small, dtype=np.uint8)
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+
+
+def image_stats(rgb: np.ndarray) -> ImageStats:
+    pixels = rgb.astype(np.int32)
+    luma = (pixels[..., 0] * 299 + pixels[..., 1] * 587 + pixels[..., 2] * 114) // 1000
+    flat_h = np.abs(np.diff(luma, axis=1)) <= 1
+    flat_v = np.abs(np.diff(luma, axis=0)) <= 1
+    packed = (pixels[..., 0] >> 3) << 10 | (pixels[..., 1] >> 3) << 5 | (pixels[..., 2] >> 3)
+    return ImageStats(
+        mean=float(luma.mean()),
+        std=float(luma.std()),
+        flat=float((flat_h.sum() + flat_v.sum()) / (flat_h.size + flat_v.size)),
+        white=float((luma >= 225).mean()),
+        saturation=float((pixels.max(axis=2) - pixels.min(axis=2)).mean()),
+        colours=len(np.unique(packed)) / luma.size,
+    )
+
+
+def classify_stats(stats: ImageStats) -> Optional[str]:
+    """Tier 1 verdict: "blank" / "document" / "screenshot", or None to keep."""
+    if stats.std < _BLANK_MAX_STD or stats.mean < _DARK_MAX_MEAN:
+        return "blank"
+    if stats.mean > _BRIGHT_MIN_MEAN and stats.std < _BRIGHT_MAX_STD:
+        return "blank"
+    if (
+        stats.mean >= _DOC_MIN_MEAN
+        and stats.white >= _DOC_MIN_WHITE
+        and stats.saturation < _DOC_MAX_SATURATION
+    ):
+        return "document"
+    if stats.flat >= _SCREEN_MIN_FLAT and stats.colours < _SCREEN_MAX_COLOURS:
+        return "screenshot"
+    return None
+
+
+# ---------------------------------------------------------
+# Tier 2: optional ONNX classifier
+# ---------------------------------------------------------
+class OnnxImageClassifier:
+    """
+    Wraps an ONNX image classifier taking NCHW float32 224x224 RGB
+    (ImageNet-normalized) and returning one score per label.
+    """
+
+    def __init__(self, path: str, labels: List[str]):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise RuntimeError(
+                "PREFILTER_ONNX_MODEL_PATH requires the 'onnxruntime' package"
+            ) from e
+        options = onnxruntime.SessionOptions()
+        # One request's handful of images: threads cost more than they save
+        options.intra_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input = self._session.get_inputs()[0].name
+        self.labels = labels
+
+    def predict(self, image_bytes_list: List[bytes]) -> List[Optional[Tuple[str, float]]]:
+        """(label, probability) of the top class per image; None if undecodable."""
+        arrays = [_thumbnail(data, _CLASSIFIER_SIDE) for data in image_bytes_list]
+        decoded = [i for i, a in enumerate(arrays) if a is not None]
+        results: List[Optional[Tuple[str, float]]] = [None] * len(arrays)
+        if not decoded:
+            return results
+
+        batch = np.stack([arrays[i] for i in decoded]).astype(np.float32) / 255.0
+        batch = ((batch - _IMAGENET_MEAN) / _IMAGENET_STD).transpose(0, 3, 1, 2)
+        (logits,) = self._session.run(None, {self._input: np.ascontiguousarray(batch)})
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        for row, i in zip(probs, decoded):
+            top = int(row.argmax())
+            results[i] = (self.labels[top], float(row[top]))
+        return results
+
+
+@lru_cache
+def get_classifier() -> Optional[OnnxImageClassifier]:
+    settings = get_settings()
+    if not settings.prefilter_onnx_model_path:
+        return None
+    return OnnxImageClassifier(settings.prefilter_onnx_model_path, settings.prefilter_onnx_labels)
+
+
+# ---------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------
+@dataclass
+class PrefilterResult:
+    kept_indices: List[int] = field(default_factory=list)
+    skipped: List[SkippedImage] = field(default_factory=list)
+
+
+def prefilter_images(
+    image_bytes_list: List[bytes],
+    filenames: Optional[List[Optional[str]]] = None,
+    classifier: Optional[OnnxImageClassifier] = None,
+) -> PrefilterResult:
+    """
+    Split images into those worth a model call and those skipped (reason =
+    the verdict: blank, document, screenshot or the classifier's label).
+    Blocking (CPU): run it in a worker thread.
+    """
+    if classifier is None:
+        classifier = get_classifier()
+    filenames = filenames or [None] * len(image_bytes_list)
+    result = PrefilterResult()
+
+    candidates: List[int] = []
+    for i, data in enumerate(image_bytes_list):
+        rgb = _thumbnail(data, _THUMB)
+        verdict = None if rgb is None else classify_stats(image_stats(rgb))
+        if verdict is None:
+            candidates.append(i)
+        else:
+            result.skipped.append(SkippedImage(index=i, filename=filenames[i], reason=verdict))
+
+    if classifier is not None and candidates:
+        settings = get_settings()
+        keep = set(settings.prefilter_onnx_keep_labels)
+        predictions = classifier.predict([image_bytes_list[i] for i in candidates])
+        kept = []
+        for i, prediction in zip(candidates, predictions):
+            if (
+                prediction is not None
+                and prediction[0] not in keep
+                and prediction[1] >= settings.prefilter_onnx_min_confidence
+            ):
+                result.skipped.append(
+                    SkippedImage(index=i, filename=filenames[i], reason=prediction[0])
+                )
+            else:
+                kept.append(i)
+        candidates = kept
+
+    result.kept_indices = candidates
+    return result
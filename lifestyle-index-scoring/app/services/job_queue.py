@@ -0,0 +1,356 @@
+# app/services/job_queue.py
+"""
+Asynchronous scoring jobs: a bounded in-process queue and a fixed pool of
+worker tasks running score_household.
+
+POST /score/lifestyle/jobs answers 202 with a job ID as soon as the images
+are ingested; the Gemini call happens on a worker. The queue holds at most
+JOB_QUEUE_MAX_DEPTH waiting jobs and submit() raises JobQueueFull beyond
+that (HTTP 429 with a Retry-After estimated from recent service times), so
+a burst is turned away up front instead of piling up as open connections
+that time out. Finished jobs are kept for JOB_RESULT_TTL_SECONDS and can
+optionally be POSTed to a callback URL; callbacks run as their own tasks,
+so a slow receiver never holds up a worker.
+
+Jobs live in this process only: with several uvicorn workers, polling has
+to reach the worker that accepted the job (sticky routing), and queued
+jobs are lost on restart.
+"""
+
+import asyncio
+import math
+import time
+import urllib.request
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException
+
+from ..config import get_settings
+from ..logger import logger, request_id_var
+from ..schemas import JobStatus, LocationContext, SkippedImage
+from ..telemetry import JOB_QUEUE_DEPTH, JOB_SECONDS, JOBS
+from .scoring_pipeline import score_household
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by submit() when JOB_QUEUE_MAX_DEPTH jobs are already waiting."""
+
+    def __init__(self, depth: int, retry_after: int):
+        super().__init__(f"{depth} scoring jobs are already queued")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = (
+        "seq",
+        "status",
+        "image_bytes_list",
+        "location",
+        "filenames",
+        "positions",
+        "skipped_images",
+        "household_id",
+        "callback_url",
+    )
+
+    def __init__(
+        self,
+        status: JobStatus,
+        image_bytes_list: List[bytes],
+        location: LocationContext,
+        filenames: Optional[List[Optional[str]]],
+        positions: Optional[List[int]],
+        skipped_images: Optional[List[SkippedImage]],
+        household_id: Optional[str],
+        callback_url: Optional[str],
+        seq: int,
+    ):
+        self.seq = seq
+        self.status = status
+        self.image_bytes_list = image_bytes_list
+        self.location = location
+        self.filenames = filenames
+        self.positions = positions
+        self.skipped_images = skipped_images
+        self.household_id = household_id
+        self.callback_url = callback_url
+
+
+class JobQueue:
+    """
+    Bounded FIFO of scoring jobs drained by `workers` tasks.
+
+    Job states: queued -> running -> succeeded | failed. Everything runs on
+    the event loop, so the job table needs no lock.
+    """
+
+    def __init__(self, workers: int, max_depth: int, result_ttl_seconds: float, max_jobs: int):
+        self.workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_jobs = max(self.max_depth + self.workers, max_jobs)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._callbacks: Set[asyncio.Task] = set()  # webhook POSTs in flight
+        self._jobs: Dict[str, _Job] = {}
+        self._finished: Deque[str] = deque()  # job IDs in completion order
+        # Jobs get consecutive sequence numbers; FIFO order makes a queued
+        # job's position its number minus the next one to start
+        self._next_seq = 0
+        self._next_start = 0
+        self._running = 0
+        # Smoothed service time, for Retry-After on 429
+        self._service_seconds = 0.0
+        self.accepted = 0
+        self.rejected = 0
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(self.max_depth)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"scoring-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Give pending callbacks their timeout to finish, then drop them
+        if self._callbacks:
+            _, pending = await asyncio.wait(
+                self._callbacks, timeout=get_settings().job_callback_timeout_seconds
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # -----------------------------
+    # Submit / poll
+    # -----------------------------
+    def submit(
+        self,
+        image_bytes_list: List[bytes],
+        location: LocationContext,
+        filenames: Optional[List[Optional[str]]] = None,
+        positions: Optional[List[int]] = None,
+        skipped_images: Optional[List[SkippedImage]] = None,
+        household_id: Optional[str] = None,
+        callback_url: Optional[str] = None,
+    ) -> JobStatus:
+        """Queue one household; raises JobQueueFull when the queue is at capacity."""
+        self.start()
+        if self._queue.full():
+            self.rejected += 1
+            JOBS.inc("rejected")
+            raise JobQueueFull(self._queue.qsize(), self.retry_after())
+
+        self._evict(time.time())
+        status = JobStatus(job_id=uuid.uuid4().hex, status="queued", created_at=time.time())
+        job = _Job(
+            status,
+            image_bytes_list,
+            location,
+            filenames,
+            positions,
+            skipped_images,
+            household_id,
+            callback_url,
+            self._next_seq,
+        )
+        self._next_seq += 1
+        status.queue_position = job.seq - self._next_start
+        self._jobs[status.job_id] = job
+        self._queue.put_nowait(job)
+        self.accepted += 1
+        JOBS.inc("accepted")
+        JOB_QUEUE_DEPTH.set(self._queue.qsize())
+        return status
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        self._evict(time.time())
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.status.status == "queued":
+            job.status.queue_position = job.seq - self._next_start
+        return job.status
+
+    def retry_after(self) -> int:
+        """Seconds until a worker is likely to take the next job off the queue."""
+        return max(1, math.ceil((self._service_seconds or 1.0) / self.workers))
+
+    def _evict(self, now: float) -> None:
+        """Drop finished jobs past their TTL, oldest first, and beyond max_jobs."""
+        while self._finished:
+            job = self._jobs[self._finished[0]]
+            expired = now - job.status.finished_at > self.result_ttl_seconds
+            if not expired and len(self._jobs) <= self.max_jobs:
+                break
+            del self._jobs[self._finished.popleft()]
+
+    # -----------------------------
+    # Workers
+    # -----------------------------
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            JOB_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: _Job) -> None:
+        status = job.status
+        self._next_start = job.seq + 1
+        status.status = "running"
+        status.queue_position = None
+        status.started_at = time.time()
+        JOB_SECONDS.observe(status.started_at - status.created_at, "queue_wait")
+        self._running += 1
+        token = request_id_var.set(status.job_id)
+        start = time.perf_counter()
+        try:
+            status.result = await score_household(
+                job.image_bytes_list,
+                job.location,
+                filenames=job.filenames,
+                positions=job.positions,
+                skipped_images=job.skipped_images,
+                household_id=job.household_id,
+            )
+            status.status = "succeeded"
+        except HTTPException as e:
+            status.status = "failed"
+            status.error_status = e.status_code
+            status.error = str(e.detail)
+            logger.warning("Scoring job failed: %s", e.detail)
+        except Exception as e:
+            status.status = "failed"
+            status.error_status = 500
+            status.error = f"Internal error: {type(e).__name__}"
+            logger.exception("Scoring job crashed.")
+        finally:
+            elapsed = time.perf_counter() - start
+            self._running -= 1
+            self._service_seconds = (
+                elapsed if not self._service_seconds else 0.8 * self._service_seconds + 0.2 * elapsed
+            )
+            status.finished_at = time.time()
+            self._finished.append(status.job_id)
+            JOB_SECONDS.observe(elapsed, "service")
+            JOBS.inc(status.status)
+            # The images are not needed any more; only the status is kept
+            job.image_bytes_list = []
+            request_id_var.reset(token)
+
+        if job.callback_url:
+            task = asyncio.create_task(
+                _notify(job.callback_url, status), name=f"scoring-job-callback-{status.job_id}"
+            )
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "callbacks_pending": len(self._callbacks),
+            "jobs_retained": len(self._jobs),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "service_seconds_avg": round(self._service_seconds, 3),
+        }
+
+
+# -----------------------------
+# Webhook callbacks
+# -----------------------------
+def validate_callback_url(url: str) -> str:
+    """
+    Accept `url` only if it is http(s) and its host is in
+    JOB_CALLBACK_ALLOWED_HOSTS (no list = callbacks disabled), so the
+    service cannot be pointed at arbitrary internal addresses.
+    """
+    allowed = get_settings().job_callback_allowed_hosts
+    parts = urlsplit(url)
+    if not allowed:
+        raise ValueError("Job callbacks are disabled (JOB_CALLBACK_ALLOWED_HOSTS).")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL.")
+    if parts.hostname.lower() not in {h.lower() for h in allowed}:
+        raise ValueError(f"callback_url host {parts.hostname} is not allowed.")
+    return url
+
+
+class _NoRedirects(urllib.request.HTTPRedirectHandler):
+    """
+    Refuse to follow redirects: the allow-list only covers the host we
+    were given, so a 3xx from it fails the delivery (as an HTTPError).
+    """
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirects)
+
+
+def _post_json(url: str, body: bytes, timeout: float) -> int:
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with _opener.open(request, timeout=timeout) as response:
+        return response.status
+
+
+async def _notify(url: str, status: JobStatus) -> None:
+    """POST the finished job to its callback URL (best effort, one attempt)."""
+    body = status.json().encode()
+    try:
+        await asyncio.to_thread(_post_json, url, body, get_settings().job_callback_timeout_seconds)
+        JOBS.inc("callback_ok")
+    except Exception as e:
+        JOBS.inc("callback_error")
+        logger.warning("Job callback to %s failed: %s", urlsplit(url).hostname, e)
+
+
+# -----------------------------
+# Process-wide queue
+# -----------------------------
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        settings = get_settings()
+        _job_queue = JobQueue(
+            workers=settings.job_workers,
+            max_depth=settings.job_queue_max_depth,
+            result_ttl_seconds=settings.job_result_ttl_seconds,
+            max_jobs=settings.job_max_retained,
+        )
+    return _job_queue
+
+
+def startup() -> None:
+    """FastAPI lifespan hook: start the worker tasks."""
+    get_job_queue().start()
+
+
+async def shutdown() -> None:
+    if _job_queue is not None:
+        await _job_queue.stop()
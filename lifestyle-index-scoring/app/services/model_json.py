@@ -0,0 +1,152 @@
+# app/services/model_json.py
+"""
+Tolerant JSON extraction for model answers.
+
+Gemini is asked for strict JSON but answers come back wrapped in ```json
+fences, surrounded by prose, with trailing commas, or cut off mid-array
+when the output token limit hits. parse_model_json() finds the first JSON
+object in the text and:
+
+- fast path: slices from the first `{` to the last `}` (two C-level
+  scans, no copies of the whole text) and parses it;
+- otherwise: one tokenizing pass from that `{` that skips over string
+  literals in C (regex), drops trailing commas and, when the text ends
+  before the object closes, cuts back to the last complete value and
+  closes the open containers - so the assets read so far survive a
+  truncated answer.
+
+orjson is used for the actual parsing when installed (optional).
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A string literal (group "end" is empty when the text ends inside it) or
+# one structural character
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(?P<end>"?)|[{}\[\],]', re.S)
+_CLOSER = {"{": "}", "[": "]"}
+
+# How many `{` positions to try before giving up (prose may contain braces)
+_MAX_STARTS = 8
+
+
+@lru_cache(maxsize=1)
+def _loader() -> Tuple[Callable[[str], Any], Tuple[type, ...]]:
+    """(loads, decode errors): orjson when installed, else the stdlib."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads, (json.JSONDecodeError,)
+    return orjson.loads, (orjson.JSONDecodeError,)
+
+
+def loads(text: str) -> Any:
+    """json.loads, through orjson when it is installed."""
+    return _loader()[0](text)
+
+
+def try_loads(text: str) -> Any:
+    """loads(), returning None instead of raising on invalid JSON."""
+    load, errors = _loader()
+    try:
+        return load(text)
+    except errors:
+        return None
+
+
+def _scan_object(text: str, start: int) -> Tuple[str, str, int]:
+    """
+    Tokenize the object opening at text[start]. Returns (candidate JSON,
+    outcome, end): the object with trailing commas removed ("repaired") or,
+    if the text ends first, cut back to the last complete value and closed
+    ("truncated"). `end` is where scanning stopped.
+
+    Cuts only happen directly inside an array or the top-level object, so
+    a half-written entry of an array (an asset missing its confidence) is
+    dropped rather than closed early.
+    """
+    stack: List[str] = []
+    drop: List[int] = []  # positions of trailing commas
+    last_comma: Optional[int] = None  # comma not yet followed by a value
+    # Last point the object can be cut and closed: (index, open containers)
+    safe: Tuple[int, Tuple[str, ...]] = (start, ())
+
+    for m in _TOKEN.finditer(text, start):
+        tok = m.group()
+        if tok[0] == '"':
+            if not m.group("end"):
+                break  # the text ends inside a string
+            last_comma = None
+            continue
+        if tok in "{[":
+            stack.append(_CLOSER[tok])
+            last_comma = None
+            if tok == "[" or len(stack) == 1:
+                safe = (m.end(), tuple(stack))
+        elif tok in "}]":
+            if not stack or stack[-1] != tok:
+                break  # mismatched close: keep what was balanced so far
+            if last_comma is not None:
+                drop.append(last_comma)
+                last_comma = None
+            stack.pop()
+            if not stack:
+                outcome = "repaired" if drop else "clean"
+                return _without(text, start, m.end(), drop), outcome, m.end()
+            if stack[-1] == "]" or len(stack) == 1:
+                safe = (m.end(), tuple(stack))
+        else:  # ","
+            if last_comma is not None:
+                drop.append(last_comma)  # ",," : keep one
+            last_comma = m.start()
+            if stack[-1] == "]" or len(stack) == 1:
+                safe = (m.start(), tuple(stack))
+
+    cut, open_containers = safe
+    body = _without(text, start, cut, [d for d in drop if d < cut])
+    return body + "".join(reversed(open_containers)), "truncated", len(text)
+
+
+def _without(text: str, start: int, end: int, drop: List[int]) -> str:
+    if not drop:
+        return text[start:end]
+    pieces = []
+    pos = start
+    for d in drop:
+        pieces.append(text[pos:d])
+        pos = d + 1
+    pieces.append(text[pos:end])
+    return "".join(pieces)
+
+
+def parse_model_json(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Parse the first JSON object in a model answer.
+
+    Returns (object, outcome) with outcome "clean", "repaired" (trailing
+    commas dropped) or "truncated" (the text ended early; the object holds
+    only the values that were complete). (None, "invalid") when no object
+    can be recovered.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None, "invalid"
+
+    end = text.rfind("}")
+    if end > start:
+        raw = try_loads(text[start : end + 1])
+        if isinstance(raw, dict):
+            return raw, "clean"
+
+    for _ in range(_MAX_STARTS):
+        candidate, outcome, stop = _scan_object(text, start)
+        raw = try_loads(candidate)
+        if isinstance(raw, dict):
+            return raw, outcome
+        # Prose braces ("{sic}") before the answer: look past them
+        start = text.find("{", stop)
+        if start == -1:
+            break
+    return None, "invalid"
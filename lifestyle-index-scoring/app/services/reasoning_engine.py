@@ -1,16 +1,43 @@
 # app/services/reasoning_engine.py
 
-import json
-from typing import List
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 
 from fastapi import HTTPException
+from PIL import UnidentifiedImageError
 
-from ..services.vertex_client import call_gemini_vision
-from ..schemas import GeminiRawSignals, DetectedAsset, LocationContext
+from ..admission import Overloaded, model_slot
+from ..config import get_settings
+from ..services.asset_stream import IncrementalAssetParser
+from ..services.image_ingest import open_image
+from ..services.model_json import parse_model_json
+from ..services.response_schema import schema_fingerprint, signals_response_schema
+from ..services.resilience import CircuitOpenError
+from ..services.vertex_client import call_gemini_vision_async, stream_gemini_vision_async
+from ..services.result_cache import ResultCache, get_result_cache
+from ..schemas import GeminiRawSignals, DetectedAsset, LocationContext, TokenUsage
 from ..scoring_config import normalize_asset_name
 from ..logger import logger
+from ..telemetry import (
+    MODEL_CALLS,
+    MODEL_OUTPUT,
+    STAGE_SECONDS,
+    modality_tokens,
+    record_token_usage,
+    span,
+)
 
-BASE_EXTRA_INSTRUCTION = """
+# Bump whenever BASE_EXTRA_INSTRUCTION or the user prompt changes meaning,
+# so cached signals produced by an older prompt are not reused.
+# v2: the instruction moved from the first content part to the system
+# instruction.
+PROMPT_VERSION = "2024-06-v2"
+
+_ROLE_INSTRUCTION = """
 You are an underwriting assistant scoring household lifestyle from photos.
 
 You MUST:
@@ -18,7 +45,9 @@ You MUST:
 - Identify only lifestyle-related assets that you see (NOT people).
 - Be conservative: if unsure, give lower confidence.
 - Consider typical Indian context.
+"""
 
+_JSON_FORMAT_INSTRUCTION = """
 You MUST respond ONLY in JSON with this structure:
 
 {
@@ -35,7 +64,9 @@ You MUST respond ONLY in JSON with this structure:
   ],
   "notes": "free-text reasoning and assumptions here"
 }
+"""
 
+_FIELD_INSTRUCTION = """
 Where:
 - name: short UPPER_SNAKE_CASE identifier (e.g., AIR_CONDITIONER, REFRIGERATOR, SMART_TV, CAR, TWO_WHEELER, GATED_COMMUNITY, MODULAR_KITCHEN, LUXURY_INTERIORS)
 - confidence is between 0 and 1.
@@ -43,131 +74,523 @@ Where:
 - Do not invent assets you cannot see clearly.
 """
 
+# Free-form mode: the JSON shape is spelled out in the prompt
+BASE_EXTRA_INSTRUCTION = _ROLE_INSTRUCTION + _JSON_FORMAT_INSTRUCTION + _FIELD_INSTRUCTION
+
+# Schema mode: the response schema carries the shape (and the allowed names)
+SCHEMA_EXTRA_INSTRUCTION = _ROLE_INSTRUCTION + """
+Report each asset with a confidence between 0 and 1 and a quantity of at
+least 1, plus brand / room_type when visible, and put free-text reasoning
+and assumptions in notes. Do not invent assets you cannot see clearly.
+"""
+
+
+def _build_user_prompt(location: LocationContext) -> str:
+    return f"""
+The household is located in the Indian state: {location.state}.
+City (may be empty or small town): {location.city or "unknown"}.
+
+Identify visual lifestyle assets and output STRICT JSON as specified.
+Remember to be conservative; if the image is blurry or ambiguous, 
+use a confidence <= 0.5.
+"""
+
+
+# ---------------------------------------------------------
+# Output mode: JSON constrained by a response schema, or described in the prompt
+# ---------------------------------------------------------
+OUTPUT_MODES = ("schema", "freeform")
+
+# Models that rejected a response schema get free-form prompts from then on
+_schema_unsupported: Set[str] = set()
+
 
-def _extract_json_block(text: str) -> str:
+def current_output_mode() -> str:
+    """GEMINI_OUTPUT_MODE, unless the configured model turned out not to support it."""
+    settings = get_settings()
+    mode = settings.gemini_output_mode.strip().lower()
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown GEMINI_OUTPUT_MODE: {settings.gemini_output_mode}")
+    if mode == "schema" and settings.gemini_vision_model in _schema_unsupported:
+        return "freeform"
+    return mode
+
+
+def current_system_instruction() -> str:
+    """The system instruction calls are sent with right now (for warm-up)."""
+    return _system_instruction(current_output_mode())
+
+
+def _system_instruction(mode: str) -> str:
+    return SCHEMA_EXTRA_INSTRUCTION if mode == "schema" else BASE_EXTRA_INSTRUCTION
+
+
+def _model_request(location: LocationContext, mode: str) -> Dict[str, Any]:
+    """Prompt, system instruction and (schema mode) response schema for one call."""
+    request: Dict[str, Any] = {
+        "prompt": _build_user_prompt(location),
+        "extra_system_instruction": _system_instruction(mode),
+    }
+    if mode == "schema":
+        request["response_schema"] = signals_response_schema()
+    return request
+
+
+def _schema_rejected(error: BaseException, mode: str) -> bool:
     """
-    Try to robustly extract a JSON object from the model output.
-    Handles cases like:
-      ```json
-      { ... }
-      ```
-    or extra text before/after.
+    Whether `error` is the model refusing the response schema / JSON mime
+    type (400 Invalid Argument); if so, schema mode is off for that model.
     """
-    txt = text.strip()
+    if mode != "schema" or getattr(error, "code", None) != 400:
+        return False
+    message = str(error).lower()
+    if "schema" not in message and "mime" not in message:
+        return False
+    model_name = get_settings().gemini_vision_model
+    _schema_unsupported.add(model_name)
+    logger.warning("%s rejected the response schema; falling back to free-form JSON: %s", model_name, error)
+    return True
 
-    # Handle fenced code blocks ```json ... ```
-    if txt.startswith("```"):
-        # Remove leading and trailing fences
-        # e.g., ```json\n{...}\n```
-        lines = txt.splitlines()
-        # drop first and last fence lines if they start with ```
-        if lines and lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].startswith("```"):
-            lines = lines[:-1]
-        txt = "\n".join(lines).strip()
-        # remove optional 'json' at very start
-        if txt.lower().startswith("json"):
-            txt = txt[4:].strip()
 
-    # Fallback: find first '{' and last '}' to extract raw JSON object
-    if "{" in txt and "}" in txt:
-        start = txt.find("{")
-        end = txt.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            txt = txt[start : end + 1].strip()
+def _cache_key(image_bytes_list: List[bytes], mode: str) -> str:
+    # Schema answers only use the enum's asset names: key them by the enum too
+    prompt_version = PROMPT_VERSION
+    if mode == "schema":
+        prompt_version = f"{PROMPT_VERSION}+schema-{schema_fingerprint()}"
+    return ResultCache.make_key(
+        image_bytes_list,
+        prompt_version=prompt_version,
+        model_name=get_settings().gemini_vision_model,
+    )
+
 
-    return txt
+# ---------------------------------------------------------
+# Extraction strategy: one call, or image groups fanned out concurrently
+# ---------------------------------------------------------
+# Gemini 2.x bills an image as 258 tokens per 768x768 tile (both sides
+# <= 384 px: one tile); 1.5 bills a flat 258, so this is an upper bound
+_IMAGE_TILE_TOKENS = 258
+_IMAGE_TILE_SIDE = 768
+_IMAGE_SMALL_SIDE = 384
 
 
-def extract_lifestyle_signals_from_images(
+def estimate_image_tokens(data: bytes) -> int:
+    """
+    Prompt tokens one image costs, from its header only (no decode). Raises
+    ImageTooLarge (413) over IMAGE_MAX_PIXELS, like every other decode path.
+    """
+    try:
+        with open_image(data) as img:
+            w, h = img.size
+    except (UnidentifiedImageError, OSError, ValueError):
+        return _IMAGE_TILE_TOKENS
+    if w <= _IMAGE_SMALL_SIDE and h <= _IMAGE_SMALL_SIDE:
+        return _IMAGE_TILE_TOKENS
+    return _IMAGE_TILE_TOKENS * math.ceil(w / _IMAGE_TILE_SIDE) * math.ceil(h / _IMAGE_TILE_SIDE)
+
+
+def add_token_usage(usage: TokenUsage, response: Any, image_bytes_list: List[bytes]) -> None:
+    """
+    Add one model call's usage_metadata to `usage`. Image tokens come from
+    the per-modality breakdown, or are estimated when the model omits it.
+    """
+    usage.model_calls += 1
+    meta = getattr(response, "usage_metadata", None)
+    if meta is None:
+        return
+    prompt = int(getattr(meta, "prompt_token_count", 0) or 0)
+    image = modality_tokens(meta, "IMAGE")
+    if not image and prompt:
+        image = min(prompt, sum(estimate_image_tokens(data) for data in image_bytes_list))
+    usage.prompt_tokens += prompt
+    usage.image_tokens += image
+    usage.cached_tokens += int(getattr(meta, "cached_content_token_count", 0) or 0)
+    usage.output_tokens += int(getattr(meta, "candidates_token_count", 0) or 0)
+    usage.total_tokens += int(getattr(meta, "total_token_count", 0) or 0)
+
+
+def plan_image_groups(image_bytes_list: List[bytes], max_group_tokens: int) -> List[List[int]]:
+    """
+    Pack images, in order, into groups whose estimated image tokens stay
+    within max_group_tokens (an image larger than the budget gets its own
+    group). Returns image indices per group.
+    """
+    groups: List[List[int]] = []
+    group_tokens = 0
+    for i, data in enumerate(image_bytes_list):
+        tokens = estimate_image_tokens(data)
+        if groups and group_tokens + tokens <= max_group_tokens:
+            groups[-1].append(i)
+            group_tokens += tokens
+        else:
+            groups.append([i])
+            group_tokens = tokens
+    return groups
+
+
+def merge_signals(parts: List[GeminiRawSignals]) -> GeminiRawSignals:
+    """
+    Combine per-group extractions of one household. Assets are deduplicated
+    by name: the same AC seen in two photos is one AC, so confidence and
+    quantity take the max across groups (never the sum), and `extra` comes
+    from the most confident sighting, filled in from the others.
+    """
+    if len(parts) == 1:
+        return parts[0]
+
+    merged: Dict[str, DetectedAsset] = {}
+    for part in parts:
+        for asset in part.assets:
+            seen = merged.get(asset.name)
+            if seen is None:
+                merged[asset.name] = asset.copy(deep=True)
+                continue
+            best, other = (asset, seen) if asset.confidence > seen.confidence else (seen, asset)
+            merged[asset.name] = DetectedAsset(
+                name=asset.name,
+                confidence=best.confidence,
+                quantity=max(asset.quantity, seen.quantity),
+                extra={**other.extra, **best.extra},
+            )
+
+    notes = [p.notes for p in parts if p.notes]
+    return GeminiRawSignals(
+        assets=list(merged.values()),
+        notes="\n".join(dict.fromkeys(notes)) or None,
+    )
+
+
+async def extract_lifestyle_signals_from_images(
     image_bytes_list: List[bytes],
     location: LocationContext,
+    usage: Optional[TokenUsage] = None,
 ) -> GeminiRawSignals:
     """
     Calls Gemini Vision, asks for structured JSON, and parses into GeminiRawSignals.
+    The model call is awaited, so the event loop keeps serving other requests.
+
+    EXTRACTION_MODE picks the strategy:
+    - single: all images in one call (one prompt, lowest token cost);
+    - fanout: images packed into groups of at most
+      EXTRACTION_GROUP_MAX_TOKENS estimated image tokens, extracted
+      concurrently and combined with merge_signals. Latency follows the
+      slowest group instead of the whole household, and one image that
+      breaks the model's JSON only loses its own group.
+
+    Results are cached per group by image content, prompt version and model
+    name, so a resubmission of the same photos skips the model call entirely
+    (and in fanout mode, adding a photo only extracts the new group).
+
+    When `usage` is given, the tokens of every model call made are added to it.
     """
-    user_prompt = f"""
-The household is located in the Indian state: {location.state}.
-City (may be empty or small town): {location.city or "unknown"}.
+    settings = get_settings()
+    mode = settings.extraction_mode.strip().lower()
+    if mode == "single":
+        return await _extract_group(image_bytes_list, location, usage)
+    if mode != "fanout":
+        raise ValueError(f"Unknown EXTRACTION_MODE: {settings.extraction_mode}")
 
-Identify visual lifestyle assets and output STRICT JSON as specified.
-Remember to be conservative; if the image is blurry or ambiguous, 
-use a confidence <= 0.5.
-"""
+    groups = plan_image_groups(image_bytes_list, settings.extraction_group_max_tokens)
+    if len(groups) == 1:
+        return await _extract_group(image_bytes_list, location, usage)
 
-    # ---- Call Gemini Vision ----
+    sem = asyncio.Semaphore(max(1, settings.extraction_fanout_concurrency))
+
+    async def run(group: List[int]) -> GeminiRawSignals:
+        async with sem:
+            return await _extract_group([image_bytes_list[i] for i in group], location, usage)
+
+    results = await asyncio.gather(*(run(g) for g in groups), return_exceptions=True)
+
+    parts: List[GeminiRawSignals] = []
+    failed: List[BaseException] = []
+    for group, result in zip(groups, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, HTTPException):
+                raise result
+            logger.warning("Extraction failed for images %s: %s", group, result.detail)
+            failed.append(result)
+        else:
+            parts.append(result)
+
+    if failed and (not parts or not settings.extraction_fanout_allow_partial):
+        raise failed[0]
+    if failed:
+        logger.warning(
+            "Scoring from %d of %d image groups; the rest failed.", len(parts), len(groups)
+        )
+    return merge_signals(parts)
+
+
+@contextmanager
+def _gemini_errors() -> Iterator[None]:
+    """Map Gemini call failures to HTTP errors (and count them)."""
     try:
-        response = call_gemini_vision(
-            prompt=user_prompt,
-            image_bytes_list=image_bytes_list,
-            extra_system_instruction=BASE_EXTRA_INSTRUCTION,
+        yield
+    except Overloaded as e:
+        MODEL_CALLS.inc("shed")
+        raise HTTPException(
+            status_code=503,
+            detail="Scoring is overloaded; please retry shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
+    except CircuitOpenError as e:
+        MODEL_CALLS.inc("rejected")
+        raise HTTPException(
+            status_code=503,
+            detail="Gemini Vision is temporarily unavailable; please retry shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
         )
+    except asyncio.TimeoutError:
+        MODEL_CALLS.inc("timeout")
+        logger.error("Gemini Vision call timed out after retries.")
+        raise HTTPException(status_code=504, detail="Gemini Vision timed out.")
     except Exception as e:
+        MODEL_CALLS.inc("error")
         logger.exception("Gemini Vision call failed.")
         raise HTTPException(status_code=500, detail=f"Gemini Vision error: {e}")
 
+
+async def stream_lifestyle_signals(
+    image_bytes_list: List[bytes],
+    location: LocationContext,
+    usage: Optional[TokenUsage] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming extraction for one household, always as a single call.
+
+    Yields ("asset", DetectedAsset) for each asset as soon as its JSON
+    object is complete in the model's output, then exactly one
+    ("signals", GeminiRawSignals) parsed from the full text exactly like
+    extract_lifestyle_signals_from_images would. Streamed assets are
+    provisional: the final signals are authoritative. A result cache hit
+    replays the cached assets at once.
+    """
+    mode = current_output_mode()
+    cache = get_result_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = _cache_key(image_bytes_list, mode)
+        with span("cache_lookup"):
+            cached = await cache.get(cache_key)
+        if cached is not None:
+            for asset in cached.assets:
+                yield "asset", asset
+            yield "signals", cached
+            return
+
+    parser = IncrementalAssetParser()
+    last_chunk = None
+    start = time.perf_counter()
+    first_asset = True
+    with _gemini_errors():
+        async with model_slot():
+            while True:
+                try:
+                    async for chunk in stream_gemini_vision_async(
+                        image_bytes_list=image_bytes_list,
+                        **_model_request(location, mode),
+                    ):
+                        last_chunk = chunk
+                        try:
+                            text = chunk.text
+                        except (AttributeError, ValueError):  # chunk without text parts
+                            continue
+                        for asset in _parse_assets(parser.feed(text or "")):
+                            if first_asset:
+                                STAGE_SECONDS.observe(time.perf_counter() - start, "stream_first_asset")
+                                first_asset = False
+                            yield "asset", asset
+                    break
+                except Exception as e:
+                    # Only a call that streamed nothing yet can be redone
+                    if last_chunk is not None or not _schema_rejected(e, mode):
+                        raise
+                    mode = "freeform"
+    MODEL_CALLS.inc("ok")
+    record_token_usage(last_chunk, output_mode=mode)
+    if usage is not None:
+        # The last chunk carries the usage of the whole call
+        add_token_usage(usage, last_chunk, image_bytes_list)
+
+    signals, outcome = parse_gemini_output(
+        SimpleNamespace(text=parser.text), location, output_mode=mode
+    )
+    if cache is not None and outcome != "truncated":
+        await cache.set(_cache_key(image_bytes_list, mode), signals)
+    yield "signals", signals
+
+
+async def _extract_group(
+    image_bytes_list: List[bytes],
+    location: LocationContext,
+    usage: Optional[TokenUsage] = None,
+) -> GeminiRawSignals:
+    """One cached Gemini call for a set of images."""
+    mode = current_output_mode()
+    cache = get_result_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = _cache_key(image_bytes_list, mode)
+        with span("cache_lookup"):
+            cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.info("Result cache hit for %d images.", len(image_bytes_list))
+            return cached
+
+    # ---- Call Gemini Vision ----
+    with _gemini_errors():
+        async with model_slot():
+            try:
+                response = await call_gemini_vision_async(
+                    image_bytes_list=image_bytes_list,
+                    **_model_request(location, mode),
+                )
+            except Exception as e:
+                if not _schema_rejected(e, mode):
+                    raise
+                mode = "freeform"
+                cache_key = None
+                response = await call_gemini_vision_async(
+                    image_bytes_list=image_bytes_list,
+                    **_model_request(location, mode),
+                )
+    MODEL_CALLS.inc("ok")
+    record_token_usage(response, output_mode=mode)
+    if usage is not None:
+        add_token_usage(usage, response, image_bytes_list)
+
+    signals, outcome = parse_gemini_output(response, location, output_mode=mode)
+
+    # A cut-off answer is partial: the next submission should ask the model
+    # again rather than replay it for the cache TTL
+    if cache is not None and outcome != "truncated":
+        await cache.set(cache_key or _cache_key(image_bytes_list, mode), signals)
+
+    return signals
+
+
+def _parse_assets(raw_assets: List[Any]) -> List[DetectedAsset]:
+    """
+    Normalize and clamp raw asset dicts, skipping malformed entries.
+
+    Every field is checked and coerced here (what DetectedAsset validation
+    would do), so the models are built with construct() and skip pydantic
+    validation per entry.
+    """
+    assets: List[DetectedAsset] = []
+    for a in raw_assets:
+        if not isinstance(a, dict) or not isinstance(a.get("name"), str):
+            logger.warning("Skipping malformed asset entry: %s", a)
+            continue
+        name = normalize_asset_name(a["name"])
+        if not name:
+            continue
+
+        # confidence: clamp to [0, 1]
+        try:
+            confidence = float(a.get("confidence", 0.0))
+        except (TypeError, ValueError):
+            confidence = 0.0
+        if confidence != confidence:  # NaN
+            confidence = 0.0
+        confidence = max(0.0, min(1.0, confidence))
+
+        # quantity: at least 1
+        try:
+            quantity = int(a.get("quantity", 1))
+        except (TypeError, ValueError, OverflowError):
+            quantity = 1
+        if quantity < 1:
+            quantity = 1
+
+        # extra: string values only; nested values are dropped
+        extra = a.get("extra")
+        if isinstance(extra, dict):
+            extra = {
+                str(k): v if isinstance(v, str) else str(v)
+                for k, v in extra.items()
+                if isinstance(v, (str, int, float))
+            }
+        else:
+            extra = {}
+
+        assets.append(
+            DetectedAsset.construct(
+                name=name,
+                confidence=confidence,
+                quantity=quantity,
+                extra=extra,
+            )
+        )
+    return assets
+
+
+def parse_gemini_response(
+    response: Any,
+    location: LocationContext,
+    output_mode: str = "freeform",
+) -> GeminiRawSignals:
+    """
+    Turn a raw Gemini response into GeminiRawSignals (output_mode only
+    labels the parse outcome metric).
+    Raises HTTPException(500) if the response is empty, holds no JSON object,
+    or was truncated before any asset was complete.
+    """
+    return parse_gemini_output(response, location, output_mode)[0]
+
+
+def parse_gemini_output(
+    response: Any,
+    location: LocationContext,
+    output_mode: str = "freeform",
+) -> Tuple[GeminiRawSignals, str]:
+    """
+    parse_gemini_response, also returning the parse outcome ("clean",
+    "repaired" or "truncated"; see model_json.parse_model_json). Repaired
+    answers are complete (only trailing commas were dropped); truncated
+    ones hold just the assets finished before the cut.
+    """
     text = getattr(response, "text", None)
     if not text:
+        MODEL_OUTPUT.inc(output_mode, "empty")
         logger.error("Empty response from Gemini Vision.")
         raise HTTPException(
             status_code=500,
             detail="Empty response from Gemini Vision",
         )
 
-    # ---- Extract JSON part ----
-    json_str = _extract_json_block(text)
-
-    try:
-        raw = json.loads(json_str)
-    except json.JSONDecodeError as e:
+    # ---- Extract and parse the JSON part (fences, prose, truncation) ----
+    with span("json_parse"):
+        raw, outcome = parse_model_json(text)
+    MODEL_OUTPUT.inc(output_mode, outcome)
+    if raw is None:
         logger.error(
-            "Failed to parse JSON from Gemini Vision: %s | Raw text (truncated): %s",
-            e,
+            "Failed to parse JSON from Gemini Vision | Raw text (truncated): %s",
             text[:500],
         )
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to parse JSON from Gemini Vision: {e}. Response text (truncated): {text[:500]}",
+            detail=f"Failed to parse JSON from Gemini Vision. Response text (truncated): {text[:500]}",
         )
 
     # ---- Parse assets safely ----
-    assets: List[DetectedAsset] = []
-    raw_assets = raw.get("assets", []) or []
+    raw_assets = raw.get("assets")
+    with span("asset_parse"):
+        assets = _parse_assets(raw_assets if isinstance(raw_assets, list) else [])
 
-    for a in raw_assets:
-        try:
-            name = normalize_asset_name(a.get("name", ""))
-            if not name:
-                continue
-
-            # confidence: clamp to [0, 1]
-            try:
-                confidence = float(a.get("confidence", 0.0))
-            except (TypeError, ValueError):
-                confidence = 0.0
-            confidence = max(0.0, min(1.0, confidence))
-
-            # quantity: at least 1
-            try:
-                quantity = int(a.get("quantity", 1))
-            except (TypeError, ValueError):
-                quantity = 1
-            if quantity < 1:
-                quantity = 1
-
-            extra = a.get("extra", {}) or {}
-
-            asset = DetectedAsset(
-                name=name,
-                confidence=confidence,
-                quantity=quantity,
-                extra=extra,
+    if outcome == "truncated":
+        # A cut-off answer with no complete asset says nothing about the
+        # household; scoring it as "no assets" would be wrong
+        if not assets:
+            logger.error("Gemini Vision response truncated before any asset: %s", text[:500])
+            raise HTTPException(
+                status_code=500,
+                detail="Gemini Vision response was truncated before any asset was complete.",
             )
-            assets.append(asset)
-        except Exception as ex:
-            logger.warning("Skipping malformed asset entry: %s | Error: %s", a, ex)
-            continue
+        logger.warning(
+            "Gemini Vision response was truncated; scoring the %d complete assets.", len(assets)
+        )
 
     # ---- Build and return structured signals ----
     notes = raw.get("notes")
@@ -186,4 +609,4 @@ use a confidence <= 0.5.
         location.city or "N/A",
     )
 
-    return gemini_signals
+    return gemini_signals, outcome
@@ -0,0 +1,232 @@
+# app/services/rescoring.py
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, List, Optional
+
+import numpy as np
+
+from ..location_config import StateProfile
+from ..location_index import resolve_location
+from ..schemas import RescoreSummary
+from ..scoring_config import AssetWeight
+from ..scoring_tables import (
+    ScoringTable,
+    compile_scoring_table,
+    get_scoring_table,
+    read_scoring_config,
+    validate_scoring_config,
+)
+from .scoring_kernel import (
+    PERSONAS,
+    CompiledWeights,
+    compile_weights,
+    persona_codes,
+    score_batch,
+)
+from .signal_store import SignalStore
+
+@dataclass
+class ScoringCandidate:
+    """A candidate weights / state-profiles version to compare against live config."""
+
+    asset_weights: Dict[str, AssetWeight]
+    state_profiles: Dict[str, StateProfile]
+    version: Optional[str] = None
+    circle_profiles: Dict[str, StateProfile] = field(default_factory=dict)
+
+
+def make_candidate(
+    asset_weights: Optional[Dict[str, Any]] = None,
+    state_profiles: Optional[Dict[str, Any]] = None,
+    version: Optional[str] = None,
+    circle_profiles: Optional[Dict[str, Any]] = None,
+) -> ScoringCandidate:
+    """Validate candidate tables; anything omitted falls back to the live config."""
+    validate_scoring_config(asset_weights, state_profiles, circle_profiles)
+    live = get_scoring_table()
+
+    return ScoringCandidate(
+        asset_weights=asset_weights or dict(live.asset_weights),
+        state_profiles={k.strip().upper(): v for k, v in state_profiles.items()}
+        if state_profiles
+        else dict(live.state_profiles),
+        version=version,
+        circle_profiles={k.strip().upper(): v for k, v in circle_profiles.items()}
+        if circle_profiles
+        else dict(live.circle_profiles),
+    )
+
+
+def load_candidate(path: str) -> ScoringCandidate:
+    """Load a candidate in the SCORING_CONFIG_PATH file format (JSON or YAML)."""
+    doc = read_scoring_config(path)
+    return make_candidate(
+        doc.get("asset_weights"),
+        doc.get("state_profiles"),
+        doc.get("version"),
+        doc.get("circle_profiles"),
+    )
+
+
+@dataclass
+class SignalColumns:
+    """Columnar view of the whole signal store."""
+
+    signal_ids: np.ndarray  # (n_households,)
+    states: List[str]  # (n_households,)
+    cities: List[Optional[str]]  # (n_households,)
+    pincodes: List[Optional[str]]  # (n_households,)
+    household: np.ndarray  # (n_assets,) position into signal_ids
+    names: List[str]  # (n_assets,)
+    quantity: np.ndarray  # (n_assets,)
+    confidence: np.ndarray  # (n_assets,)
+
+
+def load_columns(store: SignalStore) -> SignalColumns:
+    signal_rows = list(store.iter_signal_ids())
+    asset_rows = list(store.iter_asset_rows())
+
+    signal_ids = np.fromiter((r[0] for r in signal_rows), dtype=np.int64, count=len(signal_rows))
+    asset_signal = np.fromiter((r[0] for r in asset_rows), dtype=np.int64, count=len(asset_rows))
+
+    return SignalColumns(
+        signal_ids=signal_ids,
+        states=[r[1] for r in signal_rows],
+        cities=[r[2] for r in signal_rows],
+        pincodes=[r[3] for r in signal_rows],
+        household=np.searchsorted(signal_ids, asset_signal),
+        names=[r[1] for r in asset_rows],
+        quantity=np.fromiter((r[2] for r in asset_rows), dtype=np.float64, count=len(asset_rows)),
+        confidence=np.fromiter((r[3] for r in asset_rows), dtype=np.float64, count=len(asset_rows)),
+    )
+
+
+def location_contexts(cols: SignalColumns, table: ScoringTable) -> np.ndarray:
+    """
+    Per-household context id from the pincode / city index (and `table`'s
+    rest-of-circle profiles), -1 where only the state is known. It does not
+    depend on weights or state profiles, so runs that share circle profiles
+    share it; the state fallback uses each run's own profiles.
+    """
+    cache: Dict[tuple, int] = {}
+    out = np.full(len(cols.states), -1, dtype=np.int8)
+    for i, key in enumerate(zip(cols.states, cols.cities, cols.pincodes)):
+        context = cache.get(key)
+        if context is None:
+            profile, source, _ = resolve_location(table, *key)
+            context = profile.context if source in ("pincode", "city", "circle") else -1
+            cache[key] = context
+        out[i] = context
+    return out
+
+
+def score_columns(
+    cols: SignalColumns,
+    compiled: CompiledWeights,
+    household_context: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    normalized, _ = score_batch(
+        compiled,
+        household=cols.household,
+        asset_idx=compiled.encode_assets(cols.names),
+        quantity=cols.quantity,
+        confidence=cols.confidence,
+        household_state=compiled.encode_states(cols.states),
+        household_context=household_context,
+    )
+    return normalized
+
+
+def summarize(
+    old: np.ndarray,
+    new: np.ndarray,
+    version: Optional[str],
+    started: float,
+    baseline_version: Optional[str] = None,
+) -> RescoreSummary:
+    delta = new - old
+    abs_delta = np.abs(delta)
+    n = len(delta)
+
+    old_persona = persona_codes(old)
+    new_persona = persona_codes(new)
+    moved = old_persona != new_persona
+    pairs, counts = np.unique(
+        old_persona[moved] * len(PERSONAS) + new_persona[moved], return_counts=True
+    )
+    migrations: Dict[str, Dict[str, int]] = {}
+    for pair, count in zip(pairs.tolist(), counts.tolist()):
+        src, dst = PERSONAS[pair // len(PERSONAS)], PERSONAS[pair % len(PERSONAS)]
+        migrations.setdefault(src, {})[dst] = count
+
+    return RescoreSummary(
+        candidate_version=version,
+        baseline_version=baseline_version,
+        households=n,
+        changed=int(np.count_nonzero(abs_delta > 1e-9)),
+        mean_delta=round(float(delta.mean()), 4) if n else 0.0,
+        mean_abs_delta=round(float(abs_delta.mean()), 4) if n else 0.0,
+        p95_abs_delta=round(float(np.quantile(abs_delta, 0.95, method="lower")), 4) if n else 0.0,
+        max_abs_delta=round(float(abs_delta.max()), 4) if n else 0.0,
+        persona_migrations=migrations,
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+def rescore_store(
+    store: SignalStore,
+    candidate: ScoringCandidate,
+    deltas_out: Optional[IO[str]] = None,
+) -> RescoreSummary:
+    """
+    Re-score every stored signal against the live (possibly hot-reloaded)
+    config and the candidate, without calling the model. Optionally writes
+    one JSON line per household
+    ({signal_id, state, old, new, delta, old_persona, new_persona}).
+    """
+    started = time.perf_counter()
+    cols = load_columns(store)
+    live = get_scoring_table()
+    contexts = location_contexts(cols, live)
+    candidate_contexts = contexts
+    if candidate.circle_profiles != dict(live.circle_profiles):
+        candidate_table = compile_scoring_table(
+            candidate.asset_weights,
+            candidate.state_profiles,
+            circle_profiles=candidate.circle_profiles,
+        )
+        candidate_contexts = location_contexts(cols, candidate_table)
+
+    old = score_columns(
+        cols,
+        compile_weights(dict(live.asset_weights), dict(live.state_profiles)),
+        contexts,
+    )
+    new = score_columns(
+        cols,
+        compile_weights(candidate.asset_weights, candidate.state_profiles),
+        candidate_contexts,
+    )
+
+    if deltas_out is not None:
+        old_persona = persona_codes(old)
+        new_persona = persona_codes(new)
+        for i, signal_id in enumerate(cols.signal_ids.tolist()):
+            deltas_out.write(
+                json.dumps(
+                    {
+                        "signal_id": signal_id,
+                        "state": cols.states[i],
+                        "old": round(float(old[i]), 4),
+                        "new": round(float(new[i]), 4),
+                        "delta": round(float(new[i] - old[i]), 4),
+                        "old_persona": PERSONAS[old_persona[i]],
+                        "new_persona": PERSONAS[new_persona[i]],
+                    }
+                )
+                + "\n"
+            )
+
+    return summarize(old, new, candidate.version, started, baseline_version=live.version)
@@ -0,0 +1,169 @@
+# app/services/resilience.py
+"""
+Building blocks for calling a flaky remote model: a circuit breaker, a
+sliding latency window (for hedge delays) and full-jitter backoff.
+
+They are independent of Vertex AI; vertex_client wires them together.
+All state is per process and is only touched from the event loop.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit breaker is open; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker.
+
+    closed -> open after `failure_threshold` failures in a row; open rejects
+    calls for `reset_seconds`, then half_open lets one probe through: its
+    success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_seconds: float,
+        on_transition: Optional[Callable[[str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._on_transition = on_transition
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        if state == self.OPEN:
+            self._opened_at = self._clock()
+        self._probe_started_at = None
+        if self._on_transition is not None:
+            self._on_transition(state)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go out now."""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        # One probe at a time; a probe that never reported back (cancelled
+        # request) stops blocking others after reset_seconds
+        now = self._clock()
+        if state == self.HALF_OPEN and (
+            self._probe_started_at is None or now - self._probe_started_at >= self.reset_seconds
+        ):
+            self._probe_started_at = now
+            return
+        self.rejected += 1
+        retry_after = max(0.0, self.reset_seconds - (now - self._opened_at))
+        raise CircuitOpenError(self.name, retry_after if state == self.OPEN else 1.0)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or (
+            self._state == self.CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyWindow:
+    """The last `size` successful call latencies, for quantile-based hedge delays."""
+
+    def __init__(self, size: int = 256):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def backoff_delay(retry: int, base: float, cap: float, rng: random.Random = random) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**retry))."""
+    return rng.uniform(0.0, min(cap, base * (2 ** retry)))
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    hedge_delay: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> Tuple[T, bool]:
+    """
+    Await call(); if it has not finished after `hedge_delay` seconds, start a
+    second call() and return whichever succeeds first (the loser is
+    cancelled). Returns (result, hedge_won). If both fail, the last error is
+    raised. hedge_delay=None disables hedging.
+    """
+    if hedge_delay is None:
+        return await call(), False
+
+    first = asyncio.ensure_future(call())
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if done:
+            return first.result(), False
+
+        if on_hedge is not None:
+            on_hedge()
+        second = asyncio.ensure_future(call())
+        tasks.add(second)
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is second
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
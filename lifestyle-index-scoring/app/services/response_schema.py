@@ -0,0 +1,97 @@
+# app/services/response_schema.py
+"""
+Gemini response schemas generated from the pydantic models.
+
+With a response schema (and response_mime_type application/json) Gemini
+decodes under the schema's constraints, so every answer is one JSON object
+of the right shape: no fences, prose or invented asset names.
+
+Gemini accepts an OpenAPI subset: no $ref / definitions, no titles or
+defaults, and OBJECT types need explicit properties (a Dict[str, str]
+field has none), so pydantic's JSON schema is inlined and trimmed here.
+"""
+
+import copy
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple, Type
+
+from pydantic import BaseModel
+
+from ..schemas import GeminiRawSignals
+from ..scoring_tables import get_scoring_table
+
+# JSON-schema keys Gemini's Schema understands
+_SUPPORTED_KEYS = {
+    "type",
+    "format",
+    "description",
+    "nullable",
+    "enum",
+    "properties",
+    "required",
+    "items",
+    "minItems",
+    "maxItems",
+    "minimum",
+    "maximum",
+}
+
+# DetectedAsset.extra is a free-form map; the schema offers the keys the
+# prompt asks for
+_EXTRA_PROPERTIES = {
+    "brand": {"type": "string"},
+    "room_type": {"type": "string"},
+}
+
+
+def gemini_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """A pydantic model's JSON schema with refs inlined and unsupported keys dropped."""
+    schema = model.schema()
+    definitions = schema.get("definitions", {})
+
+    def convert(node: Dict[str, Any]) -> Dict[str, Any]:
+        ref = node.get("$ref")
+        if ref is not None:
+            node = definitions[ref.rsplit("/", 1)[-1]]
+        out = {k: v for k, v in node.items() if k in _SUPPORTED_KEYS}
+        if "properties" in out:
+            out["properties"] = {name: convert(sub) for name, sub in out["properties"].items()}
+        if "items" in out:
+            out["items"] = convert(out["items"])
+        return out
+
+    return convert(schema)
+
+
+@lru_cache(maxsize=8)
+def _signals_schema(asset_names: Tuple[str, ...]) -> Dict[str, Any]:
+    schema = gemini_schema(GeminiRawSignals)
+    asset = schema["properties"]["assets"]["items"]
+    asset["properties"]["name"] = {"type": "string", "format": "enum", "enum": list(asset_names)}
+    asset["properties"]["quantity"]["minimum"] = 1
+    asset["properties"]["extra"] = {"type": "object", "properties": copy.deepcopy(_EXTRA_PROPERTIES)}
+    return schema
+
+
+def signals_response_schema(asset_names: Iterable[str] | None = None) -> Dict[str, Any]:
+    """
+    Response schema for GeminiRawSignals with asset names limited to
+    `asset_names` (default: the live scoring table's assets, so a config
+    reload changes the enum too). The result is shared: do not mutate it.
+    """
+    if asset_names is None:
+        asset_names = get_scoring_table().asset_weights
+    return _signals_schema(tuple(sorted(asset_names)))
+
+
+def schema_fingerprint(asset_names: Iterable[str] | None = None) -> str:
+    """Short hash of the asset-name enum, for cache keys."""
+    if asset_names is None:
+        asset_names = get_scoring_table().asset_weights
+    return _fingerprint(tuple(sorted(asset_names)))
+
+
+@lru_cache(maxsize=8)
+def _fingerprint(asset_names: Tuple[str, ...]) -> str:
+    return hashlib.sha256("\0".join(asset_names).encode()).hexdigest()[:12]
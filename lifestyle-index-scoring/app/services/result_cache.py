@@ -0,0 +1,268 @@
+# app/services/result_cache.py
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from ..config import get_settings
+from ..logger import logger
+from ..schemas import GeminiRawSignals
+from ..telemetry import RESULT_CACHE
+
+
+class CacheBackend(Protocol):
+    """Minimal key/value store for serialized GeminiRawSignals."""
+
+    # True if get/set do I/O and should run off the event loop
+    blocking: bool
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryLRUBackend:
+    """In-process LRU with per-entry expiry. Shared by all requests in a worker."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteBackend:
+    """
+    On-disk cache that survives restarts and is shared by workers on one host.
+
+    Every write also deletes expired rows and, past max_entries, the rows
+    closest to expiry (the oldest writes, since the TTL is fixed), so the
+    file stays bounded like the in-memory LRU.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS signals_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS signals_cache_by_expiry ON signals_cache (expires_at)"
+        )
+        self._prune(conn)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM signals_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO signals_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl_seconds),
+        )
+        self._prune(conn)
+        conn.commit()
+
+    def delete(self, key: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM signals_cache WHERE key = ?", (key,))
+        conn.commit()
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM signals_cache WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM signals_cache WHERE key IN ("
+            " SELECT key FROM signals_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+class RedisBackend:
+    """Redis (or any Redis-protocol server) backend, shared across hosts."""
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "lifestyle:signals:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RESULT_CACHE_BACKEND=redis requires the 'redis' package"
+            ) from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self.prefix + key)
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._client.setex(self.prefix + key, ttl_seconds, value)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+
+class ResultCache:
+    """
+    Content-addressed cache of parsed Gemini signals.
+
+    Keys are derived from the image bytes, the prompt version and the model
+    name only. Location is deliberately left out: scoring is applied after
+    extraction, so a resubmission with a corrected state reuses the cached
+    signals and is simply re-scored.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(
+        image_bytes_list: List[bytes],
+        prompt_version: str,
+        model_name: str,
+    ) -> str:
+        h = hashlib.sha256()
+        h.update(f"{model_name}\0{prompt_version}\0{len(image_bytes_list)}\0".encode())
+        for b in image_bytes_list:
+            h.update(len(b).to_bytes(8, "big"))
+            h.update(b)
+        return h.hexdigest()
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get(self, key: str) -> Optional[GeminiRawSignals]:
+        try:
+            value = await self._call(self.backend.get, key)
+        except Exception:
+            self.errors += 1
+            RESULT_CACHE.inc("error")
+            logger.warning("Result cache lookup failed.", exc_info=True)
+            return None
+
+        if value is None:
+            self.misses += 1
+            RESULT_CACHE.inc("miss")
+            return None
+
+        try:
+            signals = GeminiRawSignals.parse_raw(value)
+        except ValueError:
+            # Corrupt or written by an older schema: drop it and let the
+            # caller go to the model, which rewrites the entry.
+            self.misses += 1
+            self.errors += 1
+            RESULT_CACHE.inc("corrupt")
+            logger.warning("Dropping unreadable result cache entry %s.", key[:12], exc_info=True)
+            try:
+                await self._call(self.backend.delete, key)
+            except Exception:
+                logger.warning("Result cache delete failed.", exc_info=True)
+            return None
+
+        self.hits += 1
+        RESULT_CACHE.inc("hit")
+        return signals
+
+    async def set(self, key: str, signals: GeminiRawSignals) -> None:
+        value = signals.json()
+        try:
+            await self._call(self.backend.set, key, value, self.ttl_seconds)
+        except Exception:
+            self.errors += 1
+            logger.warning("Result cache write failed.", exc_info=True)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+@lru_cache
+def get_result_cache() -> Optional[ResultCache]:
+    """Build the cache configured in Settings, or None if caching is disabled."""
+    settings = get_settings()
+    kind = settings.result_cache_backend.strip().lower()
+
+    if kind == "none":
+        return None
+    if kind == "memory":
+        backend: CacheBackend = MemoryLRUBackend(settings.result_cache_max_entries)
+    elif kind == "sqlite":
+        backend = SQLiteBackend(
+            settings.result_cache_sqlite_path, settings.result_cache_max_entries
+        )
+    elif kind == "redis":
+        backend = RedisBackend(settings.result_cache_redis_url)
+    else:
+        raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {settings.result_cache_backend}")
+
+    return ResultCache(backend, settings.result_cache_ttl_seconds)
@@ -1,6 +1,6 @@
 # app/services/scoring_engine.py
 
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 from ..schemas import (
     GeminiRawSignals,
@@ -8,8 +8,10 @@ from ..schemas import (
     LifestyleScoreBreakdown,
     LifestylePersona,
 )
-from ..location_config import get_state_profile, ClimateZone, MetroFlag
-from ..scoring_config import ASSET_WEIGHTS, normalize_asset_name
+from ..location_config import ClimateZone, MetroFlag, StateProfile
+from ..location_index import resolve_location
+from ..scoring_config import ASSET_WEIGHTS, AssetWeight, normalize_asset_name
+from ..scoring_tables import ScoringTable, compile_scoring_table, get_scoring_table
 from .persona_explanations import PERSONA_EXPLANATIONS
 
 
@@ -19,14 +21,17 @@ def _compute_asset_score_for_state(
     confidence: float,
     metro_flag: MetroFlag,
     climate_zone: ClimateZone,
+    asset_weights: Optional[Dict[str, AssetWeight]] = None,
 ) -> float:
     """
     Compute contribution of a single asset given state context.
     Uses base weight, metro/non-metro multiplier, climate adjustment,
     quantity and model confidence.
+
+    Reference formula; the online path uses the precompiled ScoringTable.
     """
     key = normalize_asset_name(asset_name)
-    config = ASSET_WEIGHTS.get(key)
+    config = (asset_weights or ASSET_WEIGHTS).get(key)
     if not config:
         # Unknown asset → no contribution
         return 0.0
@@ -43,26 +48,28 @@ def _compute_asset_score_for_state(
     return raw
 
 
+# (minimum normalized score, persona), highest bucket first.
+# Buckets can be tuned as needed.
+PERSONA_BUCKETS: Tuple[Tuple[float, LifestylePersona], ...] = (
+    (80, "HIGH_INCOME_LIFESTYLE"),
+    (65, "TREND_FOLLOWER"),
+    (55, "TECH_FRIENDLY_USER"),
+    (45, "HOME_COMFORT_LOVER"),
+    (35, "CAREFUL_PLANNER"),
+    (25, "TRADITIONAL_LIFESTYLE"),
+    (15, "DISCOUNT_SEEKER"),
+)
+LOWEST_PERSONA: LifestylePersona = "LOW_INCOME_LIFESTYLE"
+
+
 def infer_persona_from_score(normalized_score: float) -> LifestylePersona:
     """
     Map a normalized lifestyle score (0–100) to a simple, common-English persona.
-    Buckets can be tuned as needed.
     """
-    if normalized_score >= 80:
-        return "HIGH_INCOME_LIFESTYLE"
-    if normalized_score >= 65:
-        return "TREND_FOLLOWER"
-    if normalized_score >= 55:
-        return "TECH_FRIENDLY_USER"
-    if normalized_score >= 45:
-        return "HOME_COMFORT_LOVER"
-    if normalized_score >= 35:
-        return "CAREFUL_PLANNER"
-    if normalized_score >= 25:
-        return "TRADITIONAL_LIFESTYLE"
-    if normalized_score >= 15:
-        return "DISCOUNT_SEEKER"
-    return "LOW_INCOME_LIFESTYLE"
+    for threshold, persona in PERSONA_BUCKETS:
+        if normalized_score >= threshold:
+            return persona
+    return LOWEST_PERSONA
 
 
 def persona_and_explanation_from_score(
@@ -81,46 +88,85 @@ def persona_and_explanation_from_score(
     return persona, explanation
 
 
+# Convert "raw" score to 0–100 band with a simple linear saturation curve.
+# Assumption: raw_score ~ 80 corresponds to lifestyle_index ~ 100.
+RAW_SCORE_FOR_100 = 80.0
+
+
+def normalize_raw_score(total_raw_score: float) -> float:
+    normalized = (total_raw_score / RAW_SCORE_FOR_100) * 100.0 if RAW_SCORE_FOR_100 > 0 else 0.0
+    return max(0.0, min(100.0, normalized))  # clamp 0–100
+
+
+def compute_raw_score(
+    assets: Iterable[Tuple[str, int, float]],
+    context: int,
+    table: ScoringTable,
+) -> Tuple[float, Dict[str, float]]:
+    """
+    Sum asset contributions for (name, quantity, confidence) tuples in one
+    (metro_flag, climate) context of a precompiled ScoringTable.
+    Returns the raw total and the per-asset contributions.
+    """
+    asset_contributions: Dict[str, float] = {}
+    total_raw_score = 0.0
+    lookup = table.asset_coef.get
+
+    for name, quantity, confidence in assets:
+        row = lookup(name)
+        if row is None:
+            row = table.coefficients(name)  # retry with the normalized name
+            if row is None:
+                # Unknown asset → no contribution
+                continue
+        contrib = row[context] * quantity * confidence
+        if contrib <= 0:
+            continue
+
+        total_raw_score += contrib
+        asset_contributions[name] = asset_contributions.get(name, 0.0) + contrib
+
+    return total_raw_score, asset_contributions
+
+
 def score_lifestyle(
     raw_signals: GeminiRawSignals,
     location: LocationContext,
+    asset_weights: Optional[Dict[str, AssetWeight]] = None,
+    state_profiles: Optional[Dict[str, StateProfile]] = None,
+    table: Optional[ScoringTable] = None,
 ) -> Tuple[float, LifestyleScoreBreakdown]:
     """
     Core scoring function.
+    `asset_weights` / `state_profiles` override the module defaults
+    (used for what-if rescoring against candidate weights).
+    `table` pins a specific compiled version (the one a request started on);
+    by default the live table is used.
     Returns:
       - normalized lifestyle index (0–100)
       - detailed breakdown object
     """
-    profile = get_state_profile(location.state)
-    climate_zone: ClimateZone = profile["climate"]
-    metro_flag: MetroFlag = profile["metro_flag"]
-
-    asset_contributions: Dict[str, float] = {}
-    total_raw_score = 0.0
-
-    for asset in raw_signals.assets:
-        contrib = _compute_asset_score_for_state(
-            asset_name=asset.name,
-            quantity=asset.quantity,
-            confidence=asset.confidence,
-            metro_flag=metro_flag,
-            climate_zone=climate_zone,
-        )
-        if contrib <= 0:
-            continue
-
-        total_raw_score += contrib
-        asset_contributions[asset.name] = (
-            asset_contributions.get(asset.name, 0.0) + contrib
-        )
+    if asset_weights is not None or state_profiles is not None:
+        table = compile_scoring_table(asset_weights, state_profiles)
+    elif table is None:
+        table = get_scoring_table()
+
+    # Pincode -> city -> state profile, finest available
+    profile, location_source, state_match = resolve_location(
+        table, location.state, location.city, location.pincode
+    )
+    climate_zone: ClimateZone = profile.climate
+    metro_flag: MetroFlag = profile.metro_flag
 
-    # Convert "raw" score to 0–100 band with a simple linear saturation curve.
-    # Assumption: raw_score ~ 80 corresponds to lifestyle_index ~ 100.
-    raw_for_100 = 80.0
-    normalized = (total_raw_score / raw_for_100) * 100.0 if raw_for_100 > 0 else 0.0
-    normalized = max(0.0, min(100.0, normalized))  # clamp 0–100
+    total_raw_score, asset_contributions = compute_raw_score(
+        ((a.name, a.quantity, a.confidence) for a in raw_signals.assets),
+        context=profile.context,
+        table=table,
+    )
+    normalized = normalize_raw_score(total_raw_score)
 
-    breakdown = LifestyleScoreBreakdown(
+    # Every field is computed here, so skip pydantic re-validation (~30 µs/call)
+    breakdown = LifestyleScoreBreakdown.construct(
         total_score=round(total_raw_score, 2),
         normalized_score=round(normalized, 2),
         max_score=100.0,
@@ -134,6 +180,13 @@ def score_lifestyle(
         },
         metro_flag=metro_flag,
         climate_zone=climate_zone,
+        scoring_version=table.version,
+        location_source=location_source,
+        district=profile.district,
+        city_tier=profile.tier,
+        resolved_state=state_match.state,
+        state_match=state_match.method,
+        state_match_confidence=state_match.confidence,
     )
 
     return normalized, breakdown
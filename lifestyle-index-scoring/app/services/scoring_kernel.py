@@ -0,0 +1,161 @@
+# app/services/scoring_kernel.py
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..location_config import (
+    DEFAULT_STATE_PROFILE,
+    STATE_PROFILES,
+    StateProfile,
+)
+from ..scoring_config import ASSET_WEIGHTS, AssetWeight, normalize_asset_name
+from ..scoring_tables import CLIMATE_ZONES
+from ..state_resolver import get_state_resolver
+from .scoring_engine import LOWEST_PERSONA, PERSONA_BUCKETS, RAW_SCORE_FOR_100
+
+CLIMATE_INDEX: Dict[str, int] = {z: i for i, z in enumerate(CLIMATE_ZONES)}
+METRO, NON_METRO = 0, 1
+
+# Ascending thresholds; PERSONAS[i] is the persona for i thresholds passed
+_PERSONA_THRESHOLDS = np.array([t for t, _ in reversed(PERSONA_BUCKETS)], dtype=np.float64)
+PERSONAS: Tuple[str, ...] = (LOWEST_PERSONA,) + tuple(p for _, p in reversed(PERSONA_BUCKETS))
+
+
+@dataclass(frozen=True)
+class CompiledWeights:
+    """
+    Array form of ASSET_WEIGHTS + STATE_PROFILES for batched scoring.
+
+    coef[a, m, z] = base * metro_or_non_metro_multiplier * climate_adjust
+    for asset index a, metro index m (0 = metro) and climate index z. The
+    last asset row is all zeros and stands in for unknown asset names.
+    The last state entry is DEFAULT_STATE_PROFILE for unknown states.
+    """
+
+    asset_index: Dict[str, int]
+    coef: np.ndarray  # (n_assets + 1, 2, 4) float64
+    state_index: Dict[str, int]
+    state_metro: np.ndarray  # (n_states + 1,) int8
+    state_climate: np.ndarray  # (n_states + 1,) int8
+
+    @property
+    def unknown_asset(self) -> int:
+        return len(self.asset_index)
+
+    @property
+    def unknown_state(self) -> int:
+        return len(self.state_index)
+
+    def encode_assets(self, names: Iterable[str]) -> np.ndarray:
+        """Asset names -> indices. Names are normalized only on a miss."""
+        index = self.asset_index
+        unknown = self.unknown_asset
+        cache: Dict[str, int] = {}
+        out: List[int] = []
+        for name in names:
+            idx = cache.get(name)
+            if idx is None:
+                idx = index.get(name)
+                if idx is None:
+                    idx = index.get(normalize_asset_name(name), unknown)
+                cache[name] = idx
+            out.append(idx)
+        return np.asarray(out, dtype=np.int32)
+
+    def encode_states(self, states: Iterable[str]) -> np.ndarray:
+        """State names -> indices, resolving free text like get_state_profile."""
+        index = self.state_index
+        unknown = self.unknown_state
+        resolve = get_state_resolver().resolve
+        cache: Dict[str, int] = {}
+        out: List[int] = []
+        for state in states:
+            idx = cache.get(state)
+            if idx is None:
+                idx = index.get((state or "").strip().upper())
+                if idx is None:
+                    idx = index.get(resolve(state).state, unknown)
+                cache[state] = idx
+            out.append(idx)
+        return np.asarray(out, dtype=np.int32)
+
+
+def compile_weights(
+    asset_weights: Optional[Dict[str, AssetWeight]] = None,
+    state_profiles: Optional[Dict[str, StateProfile]] = None,
+) -> CompiledWeights:
+    asset_weights = asset_weights or ASSET_WEIGHTS
+    state_profiles = state_profiles or STATE_PROFILES
+
+    names = list(asset_weights)
+    coef = np.zeros((len(names) + 1, 2, len(CLIMATE_ZONES)), dtype=np.float64)
+    for a, name in enumerate(names):
+        w = asset_weights[name]
+        for m, mult in ((METRO, w["metro_multiplier"]), (NON_METRO, w["non_metro_multiplier"])):
+            for z, zone in enumerate(CLIMATE_ZONES):
+                coef[a, m, z] = w["base"] * mult * w["climate_adjust"].get(zone, 1.0)
+
+    states = list(state_profiles)
+    profiles = [state_profiles[s] for s in states] + [DEFAULT_STATE_PROFILE]
+    state_metro = np.array(
+        [METRO if p["metro_flag"] == "metro" else NON_METRO for p in profiles], dtype=np.int8
+    )
+    state_climate = np.array([CLIMATE_INDEX[p["climate"]] for p in profiles], dtype=np.int8)
+
+    return CompiledWeights(
+        asset_index={n: i for i, n in enumerate(names)},
+        coef=coef,
+        state_index={s: i for i, s in enumerate(states)},
+        state_metro=state_metro,
+        state_climate=state_climate,
+    )
+
+
+def score_batch(
+    compiled: CompiledWeights,
+    household: np.ndarray,
+    asset_idx: np.ndarray,
+    quantity: np.ndarray,
+    confidence: np.ndarray,
+    household_state: np.ndarray,
+    household_context: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score many households in one vectorized pass.
+
+    Columnar inputs, one entry per detected asset:
+      household  - household position (0..n_households-1) of each asset
+      asset_idx  - from compiled.encode_assets
+      quantity, confidence
+    and one entry per household:
+      household_state - from compiled.encode_states
+      household_context - optional pincode/city context ids (see
+                          scoring_tables.context_id), -1 = use the state
+
+    Returns (normalized lifestyle index per household, contribution per
+    asset). Matches score_lifestyle to floating-point tolerance; as there,
+    non-positive contributions are dropped.
+    """
+    household_state = np.asarray(household_state)
+    state = household_state[household]
+    metro = compiled.state_metro[state]
+    climate = compiled.state_climate[state]
+    if household_context is not None:
+        context = np.asarray(household_context)[household]
+        finer = context >= 0
+        metro = np.where(finer, context // len(CLIMATE_ZONES), metro)
+        climate = np.where(finer, context % len(CLIMATE_ZONES), climate)
+
+    contrib = compiled.coef[asset_idx, metro, climate] * quantity * confidence
+    contrib = np.where(contrib > 0, contrib, 0.0)
+
+    total = np.bincount(household, weights=contrib, minlength=len(household_state))
+    normalized = np.clip(total / RAW_SCORE_FOR_100 * 100.0, 0.0, 100.0)
+    return normalized, contrib
+
+
+def persona_codes(normalized: np.ndarray) -> np.ndarray:
+    """Vectorized infer_persona_from_score: indices into PERSONAS."""
+    return np.searchsorted(_PERSONA_THRESHOLDS, normalized, side="right")
@@ -0,0 +1,324 @@
+# app/services/scoring_pipeline.py
+
+import asyncio
+from typing import AbstractSet, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..config import get_settings
+from ..logger import logger
+from ..responses import dumps, score_payload
+from ..scoring_tables import ScoringTable, get_scoring_table
+from ..telemetry import (
+    IMAGES_PREVIOUSLY_SEEN,
+    IMAGES_SKIPPED,
+    PREFILTER,
+    REQUEST_IMAGES,
+    REQUEST_TOKENS,
+    span,
+)
+from ..schemas import (
+    GeminiRawSignals,
+    LifestyleScoreResponse,
+    LocationContext,
+    SkippedImage,
+    TokenUsage,
+)
+from .image_dedup import dedup_images
+from .image_prefilter import prefilter_images
+from .reasoning_engine import extract_lifestyle_signals_from_images, stream_lifestyle_signals
+from .signal_store import get_signal_store
+from .scoring_engine import (
+    score_lifestyle,
+    infer_persona_from_score,
+    persona_and_explanation_from_score,
+)
+
+
+def build_score_response(
+    raw_signals: GeminiRawSignals,
+    location: LocationContext,
+    skipped_images: Optional[List[SkippedImage]] = None,
+    table: Optional[ScoringTable] = None,
+    fields: Optional[AbstractSet[str]] = None,
+) -> LifestyleScoreResponse:
+    """
+    Score already-extracted signals and assemble the API response.
+    Pure and cheap: no model call, no I/O.
+
+    `fields` (see responses.select_fields) limits what the client will see;
+    the explanation text is only composed when it is among them.
+    """
+    # -----------------------------
+    # Rule-based lifestyle scoring
+    # -----------------------------
+    lifestyle_index, breakdown = score_lifestyle(
+        raw_signals=raw_signals,
+        location=location,
+        table=table,
+    )
+
+    # -----------------------------
+    # Persona + explanation (simple English)
+    # -----------------------------
+    persona, persona_explanation = persona_and_explanation_from_score(lifestyle_index)
+
+    final_explanation = ""
+    if fields is None or "explanation" in fields:
+        final_explanation = (
+            f"{persona_explanation} "
+            f"Your lifestyle index is {lifestyle_index:.1f} based on detected assets "
+            f"and your location context ({breakdown.metro_flag}, {breakdown.climate_zone}). "
+            "For example, in hot-arid states like Rajasthan, an air-conditioner is treated "
+            "closer to a necessity, while in temperate metro states like Karnataka "
+            "(e.g., Bengaluru), the same AC contributes more towards lifestyle scoring."
+        )
+
+    return LifestyleScoreResponse(
+        lifestyle_index=lifestyle_index,
+        persona_hint=persona,
+        breakdown=breakdown,
+        location_context=location,
+        gemini_raw=raw_signals,
+        explanation=final_explanation,
+        skipped_images=sorted(skipped_images or [], key=lambda s: s.index),
+    )
+
+
+async def score_household(
+    image_bytes_list: List[bytes],
+    location: LocationContext,
+    filenames: Optional[List[Optional[str]]] = None,
+    positions: Optional[List[int]] = None,
+    skipped_images: Optional[List[SkippedImage]] = None,
+    household_id: Optional[str] = None,
+    fields: Optional[AbstractSet[str]] = None,
+) -> LifestyleScoreResponse:
+    """
+    Full scoring pipeline for one household's (already ingested) images:
+    near-duplicate suppression -> local pre-filter -> Gemini extraction ->
+    scoring -> response.
+
+    Shared by the online endpoint, the batch endpoint and the bulk CLI so all
+    three produce identical scores for identical inputs.
+
+    `positions` maps each image to its index in the caller's original list,
+    so skipped indices are reported in the caller's terms.
+    `fields` is the response view the caller will serialize (None = full).
+
+    The scoring table is pinned when the request starts, so a config reload
+    during the (slow) Gemini call does not change which version scores it.
+    """
+    table = get_scoring_table()
+    image_bytes_list, skipped_images = await _select_images(
+        image_bytes_list, filenames, positions, skipped_images
+    )
+
+    # -----------------------------
+    # Gemini Vision (reasoning_engine)
+    # Extract structured asset signals from images
+    # -----------------------------
+    usage = TokenUsage()
+    raw_signals = await extract_lifestyle_signals_from_images(
+        image_bytes_list=image_bytes_list,
+        location=location,
+        usage=usage,
+    )
+
+    with span("score"):
+        response = build_score_response(
+            raw_signals,
+            location,
+            skipped_images=skipped_images,
+            table=table,
+            fields=fields,
+        )
+    _attach_token_usage(response, usage, fields)
+
+    await _record_signals(raw_signals, location, response, household_id, image_bytes_list)
+    return response
+
+
+async def _select_images(
+    image_bytes_list: List[bytes],
+    filenames: Optional[List[Optional[str]]],
+    positions: Optional[List[int]],
+    skipped_images: Optional[List[SkippedImage]],
+) -> Tuple[List[bytes], List[SkippedImage]]:
+    """
+    Near-duplicate suppression (perceptual hash), then the local pre-filter
+    for non-household images. Returns the images to send (never none) and
+    all skipped images, with indices in the caller's terms. When the
+    pre-filter would skip every image, raises 422 if PREFILTER_ALL_SKIPPED
+    is "reject"; if it is "model", nothing is skipped and every image left
+    after dedup goes to the model.
+    """
+    settings = get_settings()
+    positions = positions or list(range(len(image_bytes_list)))
+    filenames = filenames or [None] * len(image_bytes_list)
+    skipped_images = list(skipped_images or [])
+    REQUEST_IMAGES.observe(len(image_bytes_list) + len(skipped_images), "received")
+
+    if settings.image_dedup_enabled:
+        with span("dedup"):
+            dedup = await asyncio.to_thread(dedup_images, image_bytes_list, filenames)
+        for skipped in dedup.skipped:
+            skipped.index = positions[skipped.index]
+            skipped.duplicate_of = positions[skipped.duplicate_of]
+        skipped_images.extend(dedup.skipped)
+        # The hash index is shared by every client, so repeats are only
+        # counted and logged, never reported back to the caller
+        if dedup.previously_seen:
+            IMAGES_PREVIOUSLY_SEEN.inc(amount=len(dedup.previously_seen))
+            logger.info(
+                "%d of %d images near an image from an earlier request (positions %s).",
+                len(dedup.previously_seen),
+                len(image_bytes_list),
+                [positions[i] for i in dedup.previously_seen],
+            )
+        image_bytes_list = dedup.kept
+        filenames = [filenames[i] for i in dedup.kept_indices]
+        positions = [positions[i] for i in dedup.kept_indices]
+
+    mode = settings.prefilter_mode.strip().lower()
+    if mode not in ("off", "shadow", "enforce"):
+        raise ValueError(f"Unknown PREFILTER_MODE: {settings.prefilter_mode}")
+    if mode != "off":
+        with span("prefilter"):
+            verdicts = await asyncio.to_thread(prefilter_images, image_bytes_list, filenames)
+        # Scoring no evidence would yield the lowest persona, which says
+        # nothing about the household: refuse, or let the model judge
+        all_skipped = mode == "enforce" and not verdicts.kept_indices
+        if all_skipped and settings.prefilter_all_skipped.strip().lower() == "model":
+            mode = "fallback"
+        for skipped in verdicts.skipped:
+            PREFILTER.inc(skipped.reason, mode)
+        if mode == "enforce" and all_skipped:
+            reasons = ", ".join(sorted({s.reason for s in verdicts.skipped}))
+            raise HTTPException(
+                status_code=422,
+                detail=f"None of the uploaded images show household content (skipped: {reasons}).",
+            )
+        if mode == "enforce" and verdicts.skipped:
+            for skipped in verdicts.skipped:
+                skipped.index = positions[skipped.index]
+            skipped_images.extend(verdicts.skipped)
+            image_bytes_list = [image_bytes_list[i] for i in verdicts.kept_indices]
+
+    for skipped in skipped_images:
+        IMAGES_SKIPPED.inc(skipped.reason)
+    REQUEST_IMAGES.observe(len(image_bytes_list), "sent")
+    return image_bytes_list, skipped_images
+
+
+def _attach_token_usage(
+    response: LifestyleScoreResponse, usage: TokenUsage, fields: Optional[AbstractSet[str]]
+) -> None:
+    """
+    Per-household token histograms; the usage itself goes on the response if
+    configured (full view) or selected (debug view, explicit fields).
+    """
+    for kind in ("prompt", "image", "cached", "output"):
+        REQUEST_TOKENS.observe(getattr(usage, f"{kind}_tokens"), kind)
+    if fields is None:
+        if get_settings().response_include_token_usage:
+            response.token_usage = usage
+    elif "token_usage" in fields:
+        response.token_usage = usage
+
+
+async def _record_signals(
+    raw_signals: GeminiRawSignals,
+    location: LocationContext,
+    response: LifestyleScoreResponse,
+    household_id: Optional[str],
+    image_bytes_list: List[bytes],
+) -> None:
+    """
+    Persist signals for later what-if rescoring (when SIGNAL_STORE_PATH is
+    set), replacing what an earlier request stored for the same household.
+    """
+    store = get_signal_store()
+    if store is not None:
+        with span("signal_store"):
+            await store.record_async(
+                raw_signals,
+                location,
+                lifestyle_index=response.lifestyle_index,
+                persona_hint=response.persona_hint,
+                household_id=household_id,
+                images=image_bytes_list,
+            )
+
+
+async def stream_household(
+    image_bytes_list: List[bytes],
+    location: LocationContext,
+    filenames: Optional[List[Optional[str]]] = None,
+    positions: Optional[List[int]] = None,
+    skipped_images: Optional[List[SkippedImage]] = None,
+    household_id: Optional[str] = None,
+    fields: Optional[AbstractSet[str]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    score_household, as events for an interactive client:
+
+    - {"event": "accepted", ...}: images going to the model, skipped ones;
+    - {"event": "asset", ...}: one per asset as the model streams it, with
+      the provisional index and persona over the assets seen so far;
+    - {"event": "final", "result": LifestyleScoreResponse}: identical to
+      what POST /score/lifestyle returns for the same input and `fields`.
+
+    Errors raise HTTPException as in score_household; the caller decides
+    how to put them on the wire.
+    """
+    table = get_scoring_table()
+    image_bytes_list, skipped_images = await _select_images(
+        image_bytes_list, filenames, positions, skipped_images
+    )
+    yield {
+        "event": "accepted",
+        "images": len(image_bytes_list),
+        "skipped_images": [s.dict() for s in sorted(skipped_images, key=lambda s: s.index)],
+    }
+
+    assets = []
+    raw_signals: Optional[GeminiRawSignals] = None
+    usage = TokenUsage()
+    async for kind, payload in stream_lifestyle_signals(image_bytes_list, location, usage):
+        if kind == "signals":
+            raw_signals = payload
+            break
+        assets.append(payload)
+        # No explanation text here: just the numbers the UI shows
+        provisional_index, _ = score_lifestyle(
+            GeminiRawSignals.construct(assets=assets, notes=None), location, table=table
+        )
+        persona = infer_persona_from_score(provisional_index)
+        yield {
+            "event": "asset",
+            "asset": payload.dict(),
+            "assets_seen": len(assets),
+            "provisional_index": provisional_index,
+            "persona_hint": persona,
+        }
+
+    with span("score"):
+        response = build_score_response(
+            raw_signals,
+            location,
+            skipped_images=skipped_images,
+            table=table,
+            fields=fields,
+        )
+    _attach_token_usage(response, usage, fields)
+    await _record_signals(raw_signals, location, response, household_id, image_bytes_list)
+    yield {"event": "final", "result": score_payload(response, fields)}
+
+
+def encode_stream_event(event: Dict[str, Any], fmt: str) -> str:
+    """One event as an NDJSON line or an SSE message."""
+    data = dumps(event).decode()
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
@@ -0,0 +1,167 @@
+# app/services/signal_store.py
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Iterator, Optional, Sequence, Tuple
+
+from ..config import get_settings
+from ..logger import logger
+from ..schemas import GeminiRawSignals, LocationContext
+
+# (signal_id, asset_name, quantity, confidence), in insertion order
+AssetRow = Tuple[int, str, int, float]
+
+
+class SignalStore:
+    """
+    SQLite store of the GeminiRawSignals the service produces, one row per
+    household: a household is keyed by its household_id, or by the content
+    of its images when it has none, and scoring it again (a resubmission, a
+    result-cache hit) replaces its row instead of adding another.
+
+    Assets are also written to a narrow `signal_assets` table (one row per
+    asset) so rescoring can stream plain tuples instead of re-parsing JSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signals (
+                signal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                household_id TEXT,
+                created_at REAL NOT NULL,
+                state TEXT NOT NULL,
+                city TEXT,
+                pincode TEXT,
+                lifestyle_index REAL,
+                persona_hint TEXT,
+                signals_json TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS signal_assets (
+                signal_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                confidence REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS signal_assets_by_signal
+                ON signal_assets (signal_id);
+            """
+        )
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(signals)")]
+        if "record_key" not in columns:  # stores written before rows were keyed
+            conn.execute("ALTER TABLE signals ADD COLUMN record_key TEXT")
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS signals_by_record_key ON signals (record_key)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(
+        self,
+        signals: GeminiRawSignals,
+        location: LocationContext,
+        lifestyle_index: Optional[float] = None,
+        persona_hint: Optional[str] = None,
+        household_id: Optional[str] = None,
+        images: Sequence[bytes] = (),
+    ) -> int:
+        """
+        Store `signals`, replacing the household's previous row if any. The
+        replacement gets a new signal_id, so rows stay in signal_id order of
+        their assets (see iter_asset_rows).
+        """
+        key = record_key(household_id, images)
+        conn = self._conn()
+        with conn:
+            if key is not None:
+                conn.execute(
+                    "DELETE FROM signal_assets WHERE signal_id IN"
+                    " (SELECT signal_id FROM signals WHERE record_key = ?)",
+                    (key,),
+                )
+                conn.execute("DELETE FROM signals WHERE record_key = ?", (key,))
+            cur = conn.execute(
+                "INSERT INTO signals (record_key, household_id, created_at, state, city, pincode,"
+                " lifestyle_index, persona_hint, signals_json)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    household_id,
+                    time.time(),
+                    location.state,
+                    location.city,
+                    location.pincode,
+                    lifestyle_index,
+                    persona_hint,
+                    signals.json(),
+                ),
+            )
+            signal_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO signal_assets (signal_id, name, quantity, confidence)"
+                " VALUES (?, ?, ?, ?)",
+                [(signal_id, a.name, a.quantity, a.confidence) for a in signals.assets],
+            )
+        return signal_id
+
+    async def record_async(self, *args, **kwargs) -> Optional[int]:
+        """Write off the event loop; a failed write is logged, never raised."""
+        try:
+            return await asyncio.to_thread(self.record, *args, **kwargs)
+        except sqlite3.Error:
+            logger.warning("Failed to persist Gemini signals.", exc_info=True)
+            return None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+
+    def iter_signal_ids(self) -> Iterator[Tuple[int, str, Optional[str], Optional[str]]]:
+        """(signal_id, state, city, pincode) for every stored signal, in id order."""
+        return iter(
+            self._conn().execute(
+                "SELECT signal_id, state, city, pincode FROM signals ORDER BY signal_id"
+            )
+        )
+
+    def iter_asset_rows(self) -> Iterator[AssetRow]:
+        """Every stored asset, in insertion (and therefore signal_id) order."""
+        return iter(
+            self._conn().execute(
+                "SELECT signal_id, name, quantity, confidence FROM signal_assets ORDER BY rowid"
+            )
+        )
+
+
+def record_key(household_id: Optional[str], images: Sequence[bytes]) -> Optional[str]:
+    """The household_id, else a digest of the images; None when neither is given."""
+    if household_id:
+        return f"household:{household_id}"
+    if not images:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    for data in images:
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return f"images:{digest.hexdigest()}"
+
+
+@lru_cache
+def get_signal_store() -> Optional[SignalStore]:
+    """The configured store, or None when SIGNAL_STORE_PATH is empty."""
+    path = get_settings().signal_store_path
+    return SignalStore(path) if path else None
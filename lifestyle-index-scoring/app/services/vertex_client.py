@@ -1,59 +1,649 @@
 # app/services/vertex_client.py
 
-import vertexai
-from vertexai.generative_models import GenerativeModel, Image
-from typing import List, Any
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Set, Tuple, Type
 from ..config import get_settings
+from ..logger import logger
+from ..telemetry import MODEL_BREAKER_STATE, MODEL_HEDGES, MODEL_RETRIES, span
+from .resilience import CircuitBreaker, LatencyWindow, backoff_delay, hedged
 
-settings = get_settings()
+# The Vertex AI SDK takes seconds to import, so nothing here imports it at
+# module level: scoring-only code never loads it, and the API loads it per
+# VERTEX_INIT_MODE (see startup()).
+if TYPE_CHECKING:
+    from vertexai.generative_models import GenerationConfig, GenerativeModel, Image
 
-# Initialize Vertex AI once per server startup
-vertexai.init(
-    project=settings.gcp_project_id,
-    location=settings.gcp_region
+# Bounds how many blocking SDK calls may run on worker threads at once.
+# Created lazily so it binds to the running event loop.
+_blocking_call_semaphore: asyncio.Semaphore | None = None
+
+_sdk_lock = threading.Lock()
+_sdk_loaded = False
+_sdk_init_seconds = 0.0
+
+
+def init_vertexai() -> None:
+    """Import the Vertex AI SDK and run vertexai.init once per process."""
+    global _sdk_loaded, _sdk_init_seconds
+    if _sdk_loaded:
+        return
+    with _sdk_lock:
+        if _sdk_loaded:
+            return
+        settings = get_settings()
+        if not settings.gcp_project_id:
+            raise RuntimeError("GCP_PROJECT_ID must be set to call Vertex AI Gemini.")
+        start = time.perf_counter()
+        try:
+            import vertexai
+        except ImportError as e:
+            raise RuntimeError(
+                "Gemini calls require the 'google-cloud-aiplatform' package"
+            ) from e
+        vertexai.init(project=settings.gcp_project_id, location=settings.gcp_region)
+        _sdk_init_seconds = time.perf_counter() - start
+        _sdk_loaded = True
+        logger.info("Loaded Vertex AI SDK in %.0f ms", _sdk_init_seconds * 1000)
+
+
+@lru_cache
+def _credential_errors() -> Tuple[Type[BaseException], ...]:
+    """Errors after which the cached model (and its auth/channel) is rebuilt once."""
+    from google.api_core import exceptions as api_exceptions
+    from google.auth import exceptions as auth_exceptions
+
+    return (
+        auth_exceptions.RefreshError,
+        auth_exceptions.TransportError,
+        api_exceptions.Unauthenticated,
+    )
+
+
+def build_vision_model(
+    model_name: str | None = None,
+    system_instruction: str | None = None,
+) -> "GenerativeModel":
+    """Return a new Gemini Vision model (defaults to the configured one)."""
+    init_vertexai()
+    from vertexai.generative_models import GenerativeModel
+
+    return GenerativeModel(
+        model_name or get_settings().gemini_vision_model,
+        system_instruction=system_instruction,
+    )
+
+
+def build_cached_vision_model(
+    model_name: str,
+    system_instruction: str,
+    ttl_seconds: float,
+) -> "GenerativeModel":
+    """
+    Create a Vertex AI context cache holding `system_instruction` and return
+    a model that uses it as the prefix of every request (network call).
+    """
+    init_vertexai()
+    from vertexai.caching import CachedContent
+    from vertexai.generative_models import GenerativeModel
+
+    cached = CachedContent.create(
+        model_name=model_name,
+        system_instruction=system_instruction,
+        ttl=timedelta(seconds=ttl_seconds),
+        display_name="lifestyle-index-instruction",
+    )
+    return GenerativeModel.from_cached_content(cached)
+
+
+class _ModelEntry:
+    __slots__ = ("model", "built_at", "expires_at", "context_cached")
+
+    def __init__(self, model: "GenerativeModel", expires_at: float | None, context_cached: bool):
+        self.model = model
+        self.built_at = time.monotonic()
+        self.expires_at = expires_at
+        self.context_cached = context_cached
+
+
+class VisionModelHolder:
+    """
+    Process-wide GenerativeModels shared by all requests, one per system
+    instruction.
+
+    The SDK caches its prediction clients (auth + gRPC channel) on the model
+    instance, so keeping one instance keeps one pooled transport. Models are
+    rebuilt when the model name changes, when they are older than
+    `vertex_client_max_age_seconds`, or after a credential error.
+
+    With GEMINI_CONTEXT_CACHE_ENABLED, an instruction of at least
+    GEMINI_CONTEXT_CACHE_MIN_TOKENS (estimated) is put in a Vertex context
+    cache, billed at the cached-token rate on every call; the model is
+    rebuilt with a fresh cache shortly before the TTL runs out. If creating
+    the cache fails, that instruction is sent uncached from then on.
+    """
+
+    def __init__(self, model_name: str, max_age_seconds: int):
+        self.model_name = model_name
+        self.max_age_seconds = max_age_seconds
+        self._entries: Dict[str | None, _ModelEntry] = {}
+        self._built_for: str | None = None
+        self._uncacheable: Set[str] = set()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.context_caches = 0
+        self.last_build_seconds = 0.0
+
+    def _is_fresh(self, system_instruction: str | None) -> bool:
+        entry = self._entries.get(system_instruction)
+        if entry is None or self._built_for != self.model_name:
+            return False
+        now = time.monotonic()
+        if entry.expires_at is not None and now >= entry.expires_at:
+            return False
+        if self.max_age_seconds > 0:
+            return now - entry.built_at < self.max_age_seconds
+        return True
+
+    def is_ready(self, system_instruction: str | None = None) -> bool:
+        return self._is_fresh(system_instruction)
+
+    def get(self, system_instruction: str | None = None) -> "GenerativeModel":
+        if self._is_fresh(system_instruction):
+            return self._entries[system_instruction].model  # fast path, no lock
+
+        with self._lock:
+            if self._built_for != self.model_name:
+                self._entries.clear()
+                self._uncacheable.clear()
+                self._built_for = self.model_name
+            if not self._is_fresh(system_instruction):
+                start = time.perf_counter()
+                self._entries[system_instruction] = self._build(system_instruction)
+                self.last_build_seconds = time.perf_counter() - start
+                self.builds += 1
+                logger.info(
+                    "Built Gemini model %s in %.1f ms",
+                    self.model_name,
+                    self.last_build_seconds * 1000,
+                )
+            return self._entries[system_instruction].model
+
+    def _build(self, system_instruction: str | None) -> _ModelEntry:
+        settings = get_settings()
+        if (
+            system_instruction
+            and settings.gemini_context_cache_enabled
+            and system_instruction not in self._uncacheable
+        ):
+            tokens = estimate_text_tokens(system_instruction)
+            if tokens < settings.gemini_context_cache_min_tokens:
+                logger.info(
+                    "System instruction is ~%d tokens, below GEMINI_CONTEXT_CACHE_MIN_TOKENS=%d; not cached.",
+                    tokens,
+                    settings.gemini_context_cache_min_tokens,
+                )
+                self._uncacheable.add(system_instruction)
+            else:
+                ttl = settings.gemini_context_cache_ttl_seconds
+                try:
+                    model = build_cached_vision_model(self.model_name, system_instruction, ttl)
+                except Exception:
+                    logger.warning(
+                        "Creating a context cache failed; sending the instruction uncached.",
+                        exc_info=True,
+                    )
+                    self._uncacheable.add(system_instruction)
+                else:
+                    self.context_caches += 1
+                    # Renew before expiry so no request hits an expired cache
+                    return _ModelEntry(model, time.monotonic() + ttl * 0.9, context_cached=True)
+        return _ModelEntry(
+            build_vision_model(self.model_name, system_instruction=system_instruction),
+            None,
+            context_cached=False,
+        )
+
+    def set_model_name(self, model_name: str) -> None:
+        """Switch models; the next get() builds the new one."""
+        with self._lock:
+            self.model_name = model_name
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._built_for = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "builds": self.builds,
+            "models": len(self._entries),
+            "context_caches_created": self.context_caches,
+            "context_cached_models": sum(e.context_cached for e in list(self._entries.values())),
+            "last_build_ms": round(self.last_build_seconds * 1000, 3),
+            "sdk_loaded": _sdk_loaded,
+            "sdk_init_ms": round(_sdk_init_seconds * 1000, 1),
+        }
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token count of English-ish text (~4 characters per token)."""
+    return len(text) // 4
+
+
+vision_models = VisionModelHolder(
+    get_settings().gemini_vision_model,
+    get_settings().vertex_client_max_age_seconds,
 )
 
 
-def build_vision_model() -> GenerativeModel:
-    """Return the configured Gemini Vision model."""
-    return GenerativeModel(settings.gemini_vision_model)
+def ensure_ready(system_instruction: str | None = None) -> None:
+    """Load the SDK and build the shared model if not done yet (blocking)."""
+    init_vertexai()
+    vision_models.get(system_instruction)
+
+
+def _is_ready(system_instruction: str | None = None) -> bool:
+    return _sdk_loaded and vision_models.is_ready(system_instruction)
+
+
+def _warm_up(system_instruction: str | None) -> None:
+    try:
+        ensure_ready(system_instruction)
+    except Exception:
+        logger.exception("Background Vertex AI warm-up failed; retrying on first request.")
 
 
-def make_image_parts(image_bytes_list: List[bytes]) -> List[Image]:
+def startup(system_instruction: str | None = None) -> None:
+    """
+    FastAPI lifespan hook, per VERTEX_INIT_MODE (the model is built for
+    `system_instruction`, the one requests will send):
+    - eager: load the SDK and build the model before serving (fails startup
+      if that is impossible);
+    - background: start serving at once and build on a thread; a request
+      arriving first waits for it;
+    - lazy: build on the first Gemini call.
+    """
+    mode = get_settings().vertex_init_mode.strip().lower()
+    if mode == "eager":
+        ensure_ready(system_instruction)
+    elif mode == "background":
+        threading.Thread(
+            target=_warm_up, args=(system_instruction,), name="vertex-warm-up", daemon=True
+        ).start()
+    elif mode != "lazy":
+        raise ValueError(f"Unknown VERTEX_INIT_MODE: {mode}")
+
+
+def shutdown() -> None:
+    vision_models.invalidate()
+
+
+def make_image_parts(image_bytes_list: List[bytes]) -> List["Image"]:
     """Convert raw bytes to Gemini Image objects."""
+    init_vertexai()
+    from vertexai.generative_models import Image
+
     return [Image.from_bytes(b) for b in image_bytes_list]
 
 
+@lru_cache(maxsize=8)
+def _generation_config(schema_json: str) -> "GenerationConfig":
+    # Building one converts the schema to protobuf (~0.5 ms): reuse them
+    init_vertexai()
+    from vertexai.generative_models import GenerationConfig
+
+    return GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=json.loads(schema_json),
+    )
+
+
+def make_generation_config(response_schema: Dict[str, Any] | None) -> "GenerationConfig | None":
+    """JSON-mode generation config constrained to `response_schema` (None: free-form text)."""
+    if response_schema is None:
+        return None
+    return _generation_config(json.dumps(response_schema, sort_keys=True))
+
+
+def _validate_images(image_bytes_list: List[bytes]) -> None:
+    if not image_bytes_list:
+        raise ValueError("At least one image is required.")
+
+    if len(image_bytes_list) > 10:
+        raise ValueError("Maximum 10 images are allowed.")
+
+
+def _build_contents(prompt: str, image_bytes_list: List[bytes]) -> List[Any]:
+    # The instruction is not part of the contents: it goes to the model's
+    # system-instruction channel (see VisionModelHolder)
+    contents: List[Any] = [prompt]
+    with span("image_parts"):
+        contents.extend(make_image_parts(image_bytes_list))
+    return contents
+
+
+@lru_cache
+def get_circuit_breaker() -> CircuitBreaker:
+    """Process-wide breaker in front of every Gemini call."""
+    settings = get_settings()
+    return CircuitBreaker(
+        "gemini",
+        failure_threshold=settings.gemini_breaker_failure_threshold,
+        reset_seconds=settings.gemini_breaker_reset_seconds,
+        on_transition=_on_breaker_transition,
+    )
+
+
+def _on_breaker_transition(state: str) -> None:
+    MODEL_BREAKER_STATE.set(_BREAKER_STATE_VALUES[state])
+    log = logger.warning if state == CircuitBreaker.OPEN else logger.info
+    log("Gemini circuit breaker is now %s.", state)
+
+
+_BREAKER_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+# Latencies of successful attempts; their quantile is the hedge delay
+_latencies = LatencyWindow()
+
+
+def _retry_reason(error: BaseException) -> str | None:
+    """Metric label if `error` is worth retrying, else None."""
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, ConnectionError):
+        return "connection"
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in get_settings().gemini_retry_status_codes:
+        return str(code)
+    return None
+
+
+def _hedge_delay() -> float | None:
+    settings = get_settings()
+    if not settings.gemini_hedge_enabled or len(_latencies) < settings.gemini_hedge_min_samples:
+        return None
+    observed = _latencies.quantile(settings.gemini_hedge_quantile) or 0.0
+    return max(settings.gemini_hedge_min_delay_seconds, observed)
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return {
+        "breaker": get_circuit_breaker().stats(),
+        "hedge_delay_ms": round(delay * 1000, 1) if (delay := _hedge_delay()) else None,
+    }
+
+
+def _get_blocking_semaphore() -> asyncio.Semaphore:
+    global _blocking_call_semaphore
+    if _blocking_call_semaphore is None:
+        _blocking_call_semaphore = asyncio.Semaphore(
+            max(1, get_settings().vertex_blocking_call_limit)
+        )
+    return _blocking_call_semaphore
+
+
+async def _start_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+    """
+    Wait for a blocking-call slot, then run fn on a worker thread (like
+    asyncio.to_thread) and return a future for its result.
+
+    The worker thread releases the slot when fn returns, not the caller:
+    a call abandoned on timeout or cancelled as a losing hedge keeps its
+    thread busy, so it keeps counting against VERTEX_BLOCKING_CALL_LIMIT
+    until it really ends. The returned future is shielded, so cancelling
+    it never drops a queued call without its release.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _get_blocking_semaphore()
+    await semaphore.acquire()
+
+    def run() -> Any:
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:  # event loop already closed
+                pass
+
+    try:
+        future = loop.run_in_executor(None, partial(contextvars.copy_context().run, run))
+    except BaseException:
+        semaphore.release()
+        raise
+    return asyncio.shield(future)
+
+
+def _config_kwargs(response_schema: Dict[str, Any] | None) -> Dict[str, Any]:
+    # Free-form calls pass no generation_config at all, as before
+    config = make_generation_config(response_schema)
+    return {} if config is None else {"generation_config": config}
+
+
 def call_gemini_vision(
     prompt: str,
     image_bytes_list: List[bytes],
     extra_system_instruction: str | None = None,
+    response_schema: Dict[str, Any] | None = None,
 ) -> Any:
     """
     Generic call to Gemini Vision supporting up to 10 images.
     Returns raw model response (caller will handle .text parsing).
+    `extra_system_instruction` is sent as the model's system instruction;
+    with `response_schema`, the model answers JSON constrained to it.
     """
 
     # ----- Validation -----
-    if not image_bytes_list:
-        raise ValueError("At least one image is required.")
+    _validate_images(image_bytes_list)
 
-    if len(image_bytes_list) > 10:
-        raise ValueError("Maximum 10 images are allowed.")
+    # ----- Build content list -----
+    contents = _build_contents(prompt, image_bytes_list)
+    kwargs = _config_kwargs(response_schema)
 
-    # ----- Build model -----
-    model = build_vision_model()
+    # ----- Gemini call (shared model) -----
+    try:
+        return vision_models.get(extra_system_instruction).generate_content(contents, **kwargs)
+    except _credential_errors():
+        logger.warning("Credential error from Vertex AI; rebuilding model client.")
+        vision_models.invalidate()
+        return vision_models.get(extra_system_instruction).generate_content(contents, **kwargs)
+
+
+async def call_gemini_vision_async(
+    prompt: str,
+    image_bytes_list: List[bytes],
+    extra_system_instruction: str | None = None,
+    response_schema: Dict[str, Any] | None = None,
+) -> Any:
+    """
+    Async variant of call_gemini_vision that never blocks the event loop.
+
+    Uses the SDK's native `generate_content_async` when the model provides it.
+    Otherwise the blocking `generate_content` runs on a worker thread, with at
+    most `vertex_blocking_call_limit` such calls in flight per process.
+
+    Each call goes through the resilience layer (_generate_resilient):
+    circuit breaker, per-attempt timeout, retries and optional hedging.
+    Raises CircuitOpenError when the breaker is open and
+    asyncio.TimeoutError when the deadline runs out.
+    """
+
+    # ----- Validation -----
+    _validate_images(image_bytes_list)
+
+    # ----- First call: SDK import / model build (or wait for the
+    # background warm-up, or a context cache renewal) happens off the
+    # event loop -----
+    if not _is_ready(extra_system_instruction):
+        await asyncio.to_thread(ensure_ready, extra_system_instruction)
 
     # ----- Build content list -----
-    contents: List[Any] = []
+    contents = _build_contents(prompt, image_bytes_list)
+    kwargs = _config_kwargs(response_schema)
+
+    # ----- Gemini call (shared model) -----
+    try:
+        return await _generate_resilient(contents, kwargs, extra_system_instruction)
+    except _credential_errors():
+        logger.warning("Credential error from Vertex AI; rebuilding model client.")
+        vision_models.invalidate()
+        await asyncio.to_thread(vision_models.get, extra_system_instruction)
+        return await _generate_resilient(contents, kwargs, extra_system_instruction)
+
+
+async def _generate_resilient(
+    contents: List[Any],
+    kwargs: Dict[str, Any],
+    system_instruction: str | None = None,
+) -> Any:
+    """
+    One logical Gemini call: up to gemini_max_retries retries with
+    full-jitter backoff on timeouts and retryable status codes, all within
+    gemini_deadline_seconds. Every attempt is bounded by
+    gemini_timeout_seconds and may be hedged; each failed attempt counts
+    towards the circuit breaker.
+    """
+    settings = get_settings()
+    breaker = get_circuit_breaker()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.gemini_deadline_seconds
+
+    retry = 0
+    while True:
+        breaker.before_call()
+        timeout = min(settings.gemini_timeout_seconds, deadline - loop.time())
+        model = vision_models.get(system_instruction)
+        start = loop.time()
+        try:
+            response, hedge_won = await asyncio.wait_for(
+                hedged(
+                    lambda: _generate_async(model, contents, kwargs),
+                    _hedge_delay(),
+                    on_hedge=lambda: MODEL_HEDGES.inc("launched"),
+                ),
+                timeout,
+            )
+        except Exception as e:
+            reason = _retry_reason(e)
+            if reason is None:
+                # The backend answered (bad request, auth...): not an outage
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(retry, settings.gemini_retry_base_seconds, settings.gemini_retry_max_seconds)
+            if retry >= settings.gemini_max_retries or loop.time() + delay >= deadline:
+                raise
+            retry += 1
+            MODEL_RETRIES.inc(reason)
+            logger.warning("Gemini call failed (%s); retry %d in %.2fs.", reason, retry, delay)
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        _latencies.observe(loop.time() - start)
+        if hedge_won:
+            MODEL_HEDGES.inc("won")
+        return response
+
+
+async def _generate_async(model: "GenerativeModel", contents: List[Any], kwargs: Dict[str, Any]) -> Any:
+    with span("generate_content"):
+        return await _generate_async_untimed(model, contents, kwargs)
+
+
+async def _generate_async_untimed(model: "GenerativeModel", contents: List[Any], kwargs: Dict[str, Any]) -> Any:
+    generate_async = getattr(model, "generate_content_async", None)
+    if generate_async is not None:
+        return await generate_async(contents, **kwargs)
+
+    return await (await _start_blocking(model.generate_content, contents, **kwargs))
+
+
+async def stream_gemini_vision_async(
+    prompt: str,
+    image_bytes_list: List[bytes],
+    extra_system_instruction: str | None = None,
+    response_schema: Dict[str, Any] | None = None,
+) -> AsyncIterator[Any]:
+    """
+    Streaming variant of call_gemini_vision_async: yields response chunks
+    (each with .text; the last one usually carries usage_metadata) as the
+    model generates them.
+
+    The circuit breaker applies as usual. Retries and hedging do not: once
+    a chunk has been passed on it cannot be taken back. Each chunk must
+    arrive within gemini_timeout_seconds, and the whole stream within
+    gemini_deadline_seconds (asyncio.TimeoutError otherwise).
+    """
+    _validate_images(image_bytes_list)
+    if not _is_ready(extra_system_instruction):
+        await asyncio.to_thread(ensure_ready, extra_system_instruction)
+    contents = _build_contents(prompt, image_bytes_list)
+    kwargs = _config_kwargs(response_schema)
+
+    settings = get_settings()
+    breaker = get_circuit_breaker()
+    breaker.before_call()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.gemini_deadline_seconds
+
+    chunks = _stream_chunks(vision_models.get(extra_system_instruction), contents, kwargs)
+    try:
+        with span("generate_content"):
+            while True:
+                timeout = min(settings.gemini_timeout_seconds, deadline - loop.time())
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+    except Exception as e:
+        if _retry_reason(e) is None:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        raise
+    finally:
+        await chunks.aclose()
+    breaker.record_success()
+
 
-    if extra_system_instruction:
-        contents.append(extra_system_instruction)
+async def _stream_chunks(model: "GenerativeModel", contents: List[Any], kwargs: Dict[str, Any]) -> AsyncIterator[Any]:
+    generate_async = getattr(model, "generate_content_async", None)
+    if generate_async is not None:
+        async for chunk in await generate_async(contents, stream=True, **kwargs):
+            yield chunk
+        return
 
-    contents.append(prompt)
-    contents.extend(make_image_parts(image_bytes_list))
+    # Blocking SDK: iterate the stream on a worker thread, hand chunks over
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
 
-    # ----- Gemini call -----
-    response = model.generate_content(contents)
+    def pump() -> None:
+        try:
+            for chunk in model.generate_content(contents, stream=True, **kwargs):
+                loop.call_soon_threadsafe(queue.put_nowait, chunk)
+        except BaseException as e:  # handed to the event loop side
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
 
-    return response
+    # pump() never raises, so the worker's result needs no handling; if the
+    # consumer stops early, the thread drains the rest of the stream unread
+    # and holds its blocking-call slot until it is done
+    worker = await _start_blocking(pump)  # noqa: F841 (keep a reference)
+    while True:
+        item = await queue.get()
+        if item is done:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        yield item
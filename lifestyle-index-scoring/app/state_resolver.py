@@ -0,0 +1,246 @@
+# app/state_resolver.py
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Literal, NamedTuple, Optional, Set, Tuple
+
+from .config import get_settings
+from .location_config import STATE_PROFILES
+from .scoring_tables import ScoringTable, StateRecord
+
+StateMatch = Literal["exact", "alias", "city", "fuzzy", "unresolved"]
+
+
+class StateResolution(NamedTuple):
+    state: Optional[str]  # STATE_PROFILES key, None if unresolved
+    method: StateMatch
+    confidence: float
+
+
+# Canonical STATE_PROFILES key -> abbreviations (ISO 3166-2:IN and vehicle
+# registration codes), old names, common misspellings and Hindi / native
+# names (romanized and Devanagari). Matching ignores case, spaces and
+# punctuation, so "Tamil-Nadu", "TAMILNADU" and "tamil nadu" need no entry.
+STATE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    # -------- South India --------
+    "KARNATAKA": ("KA", "Karnatak", "Karnatka", "Karnataka State", "Mysore State", "कर्नाटक"),
+    "KERALA": ("KL", "Keralam", "Kerela", "Keral", "केरल"),
+    "TAMIL NADU": ("TN", "Tamizh Nadu", "Tamil Naadu", "Tamilagam", "Madras State", "तमिलनाडु"),
+    "TELANGANA": ("TS", "TG", "Telengana", "Telangna", "तेलंगाना"),
+    "ANDHRA PRADESH": ("AP", "Andhra", "Andra Pradesh", "आंध्र प्रदेश"),
+
+    # -------- West India --------
+    "MAHARASHTRA": ("MH", "Maharastra", "Maharashtr", "Maharashtra State", "महाराष्ट्र"),
+    "GOA": ("GA", "गोवा"),
+    "GUJARAT": ("GJ", "Gujrat", "Gujarath", "गुजरात"),
+
+    # -------- North India --------
+    "DELHI": ("DL", "NCT", "Delhi NCR", "NCR", "New Delhi", "Dilli", "दिल्ली"),
+    "RAJASTHAN": ("RJ", "Rajastan", "Rajsthan", "राजस्थान"),
+    "HARYANA": ("HR", "Hariyana", "Haryana State", "हरियाणा"),
+    "PUNJAB": ("PB", "Panjab", "पंजाब"),
+    "UTTAR PRADESH": ("UP", "Utter Pradesh", "Uttarpradesh", "उत्तर प्रदेश"),
+    "UTTARAKHAND": ("UK", "UA", "UT", "Uttaranchal", "Uttrakhand", "Utterakhand", "उत्तराखंड"),
+    "HIMACHAL PRADESH": ("HP", "Himachal", "Himanchal Pradesh", "हिमाचल प्रदेश"),
+    "JAMMU AND KASHMIR": ("JK", "J&K", "Jammu Kashmir", "Jammu", "Kashmir", "जम्मू और कश्मीर"),
+
+    # -------- Central India --------
+    "MADHYA PRADESH": ("MP", "Madhya Pradesh State", "Madya Pradesh", "मध्य प्रदेश"),
+    "CHHATTISGARH": ("CG", "CT", "Chattisgarh", "Chhatisgarh", "Chhattisgadh", "छत्तीसगढ़"),
+
+    # -------- East India --------
+    "WEST BENGAL": ("WB", "Bengal", "Paschim Banga", "Paschimbanga", "Bangla", "पश्चिम बंगाल"),
+    "ODISHA": ("OD", "OR", "Orissa", "Odisa", "ओडिशा"),
+    "BIHAR": ("BR", "बिहार"),
+    "JHARKHAND": ("JH", "Jharkand", "Jarkhand", "झारखंड"),
+
+    # -------- North-East India --------
+    "ASSAM": ("AS", "Asom", "असम"),
+    "ARUNACHAL PRADESH": ("AR", "Arunachal", "Arunanchal Pradesh", "अरुणाचल प्रदेश"),
+    "MEGHALAYA": ("ML", "मेघालय"),
+    "MANIPUR": ("MN", "मणिपुर"),
+    "MIZORAM": ("MZ", "मिज़ोरम"),
+    "NAGALAND": ("NL", "नागालैंड"),
+    "TRIPURA": ("TR", "त्रिपुरा"),
+    "SIKKIM": ("SK", "सिक्किम"),
+
+    # -------- Union Territories --------
+    "ANDAMAN AND NICOBAR ISLANDS": ("AN", "A&N", "Andaman", "Andaman and Nicobar", "Andaman Nicobar"),
+    "CHANDIGARH": ("CH", "चंडीगढ़"),
+    "DADRA AND NAGAR HAVELI AND DAMAN AND DIU": (
+        "DH", "DN", "DD", "DNHDD", "Daman", "Diu", "Daman and Diu", "Dadra and Nagar Haveli", "Silvassa",
+    ),
+    "LAKSHADWEEP": ("LD", "Laccadive Islands", "लक्षद्वीप"),
+    "PUDUCHERRY": ("PY", "Pondicherry", "Pondy", "Puduchery", "पुडुचेरी"),
+    "LADAKH": ("LA", "Leh", "लद्दाख"),
+}
+
+# Metro names people type in the state field. The pincode index adds its
+# own city names on top (see get_state_resolver).
+CITY_STATE_ALIASES: Dict[str, str] = {
+    "BANGALORE": "KARNATAKA",
+    "BENGALURU": "KARNATAKA",
+    "MUMBAI": "MAHARASHTRA",
+    "BOMBAY": "MAHARASHTRA",
+    "PUNE": "MAHARASHTRA",
+    "CHENNAI": "TAMIL NADU",
+    "MADRAS": "TAMIL NADU",
+    "KOLKATA": "WEST BENGAL",
+    "CALCUTTA": "WEST BENGAL",
+    "HYDERABAD": "TELANGANA",
+    "AHMEDABAD": "GUJARAT",
+    "GURGAON": "HARYANA",
+    "GURUGRAM": "HARYANA",
+    "NOIDA": "UTTAR PRADESH",
+}
+
+# Words dropped from multi-word inputs ("State of Kerala", "NCT of Delhi")
+_NOISE_WORDS = frozenset({"STATE", "OF", "THE", "UNION", "TERRITORY", "NCT", "GOVT", "INDIA"})
+_PUNCTUATION = str.maketrans({c: " " for c in ".,-_/()'\"`"})
+
+# Confidence reported per method; fuzzy matches report their similarity
+_CONFIDENCE = {"exact": 1.0, "alias": 0.98, "city": 0.9}
+_FUZZY_MIN_LENGTH = 4
+_FUZZY_MIN_SCORE = 0.65
+# A fuzzy match must beat the closest key of any other state by this much,
+# so a fragment shared by several names ("Pradesh") stays unresolved
+_FUZZY_MIN_MARGIN = 0.15
+
+
+def normalize_state_key(name: str) -> str:
+    """Case-, space- and punctuation-insensitive key: "J & K." -> "JANDK"."""
+    tokens = name.upper().replace("&", " AND ").translate(_PUNCTUATION).split()
+    kept = [t for t in tokens if t not in _NOISE_WORDS]
+    return "".join(kept or tokens)
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"^{key}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class StateResolver:
+    """
+    Free-text state / UT name -> STATE_PROFILES key.
+
+    Exact names, aliases and city names live in one dict keyed by
+    normalize_state_key, so they resolve with a single lookup. Everything
+    else goes through a trigram index: postings are counted for the query's
+    trigrams and the best Dice coefficient wins if it clears
+    _FUZZY_MIN_SCORE and leads every other state's best by
+    _FUZZY_MIN_MARGIN. Results are LRU-cached by the raw input.
+    """
+
+    def __init__(
+        self,
+        states: Iterable[str],
+        aliases: Dict[str, Tuple[str, ...]],
+        cities: Dict[str, str],
+        cache_size: int = 8192,
+    ):
+        self._exact: Dict[str, StateResolution] = {}
+        for name, state in cities.items():
+            self._exact[normalize_state_key(name)] = StateResolution(state, "city", _CONFIDENCE["city"])
+        for state, names in aliases.items():
+            for name in names:
+                self._exact[normalize_state_key(name)] = StateResolution(state, "alias", _CONFIDENCE["alias"])
+        for state in states:
+            self._exact[normalize_state_key(state)] = StateResolution(state, "exact", _CONFIDENCE["exact"])
+
+        # Abbreviations are too short to fuzz against meaningfully
+        self._keys: List[str] = [k for k in self._exact if len(k) >= _FUZZY_MIN_LENGTH]
+        self._key_sizes: List[int] = []
+        self._key_states: List[str] = [self._exact[k].state for k in self._keys]
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for key_id, key in enumerate(self._keys):
+            grams = _trigrams(key)
+            self._key_sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(key_id)
+        self._postings = dict(self._postings)
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def _fuzzy(self, key: str) -> Optional[Tuple[str, float]]:
+        grams = _trigrams(key)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for key_id in self._postings.get(gram, ()):
+                shared[key_id] += 1
+        best_id, best_score = -1, 0.0
+        state_scores: Dict[str, float] = defaultdict(float)
+        for key_id, count in shared.items():
+            score = 2.0 * count / (len(grams) + self._key_sizes[key_id])
+            state = self._key_states[key_id]
+            state_scores[state] = max(state_scores[state], score)
+            if score > best_score:
+                best_id, best_score = key_id, score
+        if best_score < _FUZZY_MIN_SCORE:
+            return None
+        best_state = self._key_states[best_id]
+        runner_up = max((s for st, s in state_scores.items() if st != best_state), default=0.0)
+        if best_score - runner_up < _FUZZY_MIN_MARGIN:
+            return None
+        return self._keys[best_id], best_score
+
+    def _resolve_uncached(self, name: Optional[str]) -> StateResolution:
+        if not name or not name.strip():
+            return StateResolution(None, "unresolved", 0.0)
+        key = normalize_state_key(name)
+        hit = self._exact.get(key)
+        if hit is not None:
+            return hit
+        if len(key) >= _FUZZY_MIN_LENGTH:
+            match = self._fuzzy(key)
+            if match is not None:
+                matched_key, score = match
+                target = self._exact[matched_key]
+                # A fuzzy city match is weaker evidence than a fuzzy state match
+                return StateResolution(
+                    target.state, "fuzzy", round(score * target.confidence, 3)
+                )
+        return StateResolution(None, "unresolved", 0.0)
+
+
+@lru_cache
+def get_state_resolver() -> StateResolver:
+    """Resolver over STATE_PROFILES, STATE_ALIASES and every indexed city name."""
+    # Imported here: location_index imports this module
+    from .location_index import get_location_index
+
+    cities = dict(CITY_STATE_ALIASES)
+    index = get_location_index()
+    if index is not None:
+        for city, rec_ids in index.cities.items():
+            states = {index.records[i].state for i in rec_ids}
+            if len(states) == 1 and city not in STATE_PROFILES:
+                cities.setdefault(city, states.pop())
+
+    return StateResolver(
+        STATE_PROFILES,
+        STATE_ALIASES,
+        cities,
+        cache_size=get_settings().state_resolver_cache_size,
+    )
+
+
+def resolve_state_record(
+    table: ScoringTable,
+    state: Optional[str],
+) -> Tuple[Optional[StateRecord], StateResolution]:
+    """
+    The table's record for a free-text state, plus how it was matched.
+    Names already in the table (including states only a reloaded config
+    knows) skip the resolver; the record is None if nothing matches.
+    """
+    key = (state or "").strip().upper()
+    record = table.states.get(key)
+    if record is not None:
+        return record, StateResolution(key, "exact", 1.0)
+    resolution = get_state_resolver().resolve(state)
+    if resolution.state is None:
+        return None, resolution
+    return table.states.get(resolution.state), resolution
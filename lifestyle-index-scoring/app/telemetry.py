@@ -0,0 +1,404 @@
+# app/telemetry.py
+"""
+Request tracing and Prometheus-style metrics, without extra dependencies.
+
+- TelemetryMiddleware gives every request an ID (X-Request-ID in / out, and
+  on every log line via app.logger) and records a per-route latency
+  histogram.
+- `with span("stage"):` times one pipeline stage into the
+  lifestyle_stage_seconds histogram and the current request's trace; slow
+  requests log their full trace.
+- Counters cover image counts / bytes, model calls and tokens, and result
+  cache outcomes. Everything renders as text at GET /metrics.
+
+Metrics are per process: with several uvicorn workers, scrape each worker
+(or run one worker per container). With TELEMETRY_ENABLED=false, span()
+returns a shared no-op context manager and every record call returns
+immediately.
+"""
+
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import get_settings
+from .logger import logger, request_id_var
+
+_settings = get_settings()
+ENABLED: bool = _settings.telemetry_enabled
+
+# (stage, seconds) spans of the current request, in completion order
+_trace_var: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("trace", default=None)
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 4, 5, 6, 8, 10)
+TOKEN_BUCKETS: Tuple[float, ...] = (0, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+# ---------------------------------------------------------
+# Metric types
+# ---------------------------------------------------------
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        if not ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _format_labels(self.labels, values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        if ENABLED:
+            self.value = value
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.value:g}",
+        ]
+
+
+REQUEST_SECONDS = Histogram(
+    "lifestyle_request_seconds", "HTTP request latency.", ("route", "method", "status")
+)
+STAGE_SECONDS = Histogram(
+    "lifestyle_stage_seconds", "Latency of one pipeline stage.", ("stage",)
+)
+REQUEST_IMAGES = Histogram(
+    "lifestyle_request_images",
+    "Images per household, by point in the pipeline.",
+    ("stage",),
+    buckets=COUNT_BUCKETS,
+)
+IMAGE_BYTES = Counter(
+    "lifestyle_image_bytes_total",
+    "Image bytes uploaded and sent to the model after downscaling.",
+    ("stage",),
+)
+IMAGES_SKIPPED = Counter(
+    "lifestyle_images_skipped_total", "Images not sent to the model.", ("reason",)
+)
+IMAGES_PREVIOUSLY_SEEN = Counter(
+    "lifestyle_images_previously_seen_total",
+    "Kept images within the near-duplicate distance of one from an earlier request.",
+)
+PREFILTER = Counter(
+    "lifestyle_prefilter_total",
+    "Images the local pre-filter judged non-household, by verdict and mode "
+    "(enforce, shadow, fallback = all skipped, sent to the model anyway).",
+    ("verdict", "mode"),
+)
+MODEL_CALLS = Counter(
+    "lifestyle_model_calls_total", "Gemini Vision calls.", ("outcome",)
+)
+MODEL_TOKENS = Counter(
+    "lifestyle_model_tokens_total",
+    "Gemini token usage from usage_metadata (prompt, image, cached, candidates, total).",
+    ("kind",),
+)
+REQUEST_TOKENS = Histogram(
+    "lifestyle_request_tokens",
+    "Gemini tokens per scored household, by kind.",
+    ("kind",),
+    buckets=TOKEN_BUCKETS,
+)
+RESULT_CACHE = Counter(
+    "lifestyle_result_cache_total", "Result cache lookups.", ("outcome",)
+)
+MODEL_RETRIES = Counter(
+    "lifestyle_model_retries_total", "Gemini attempts retried, by cause.", ("reason",)
+)
+MODEL_HEDGES = Counter(
+    "lifestyle_model_hedges_total", "Hedged Gemini requests launched / won.", ("outcome",)
+)
+MODEL_OUTPUT = Counter(
+    "lifestyle_model_output_total",
+    "Gemini answers by output mode and how their JSON parsed (clean, repaired, truncated, invalid, empty).",
+    ("mode", "outcome"),
+)
+MODEL_OUTPUT_TOKENS = Counter(
+    "lifestyle_model_output_tokens_total", "Gemini candidate tokens, by output mode.", ("mode",)
+)
+ADMISSION = Counter(
+    "lifestyle_admission_total",
+    "Admission decisions (admitted, rate_limited, shed) by priority class.",
+    ("priority", "decision"),
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "lifestyle_admission_wait_seconds", "Wait for a model-call slot, by priority class.", ("priority",)
+)
+MODEL_INFLIGHT = Gauge(
+    "lifestyle_model_inflight", "Gemini calls holding a model-call slot in this process."
+)
+JOBS = Counter(
+    "lifestyle_jobs_total",
+    "Asynchronous scoring jobs (accepted, rejected, succeeded, failed, callback_ok, callback_error).",
+    ("outcome",),
+)
+JOB_SECONDS = Histogram(
+    "lifestyle_job_seconds", "Asynchronous job queue wait and service time.", ("stage",)
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "lifestyle_job_queue_depth", "Asynchronous scoring jobs waiting for a worker."
+)
+MODEL_BREAKER_STATE = Gauge(
+    "lifestyle_model_breaker_state", "Gemini circuit breaker (0 closed, 1 half-open, 2 open)."
+)
+
+METRICS = (
+    REQUEST_SECONDS,
+    STAGE_SECONDS,
+    REQUEST_IMAGES,
+    IMAGE_BYTES,
+    IMAGES_SKIPPED,
+    IMAGES_PREVIOUSLY_SEEN,
+    PREFILTER,
+    MODEL_CALLS,
+    MODEL_TOKENS,
+    REQUEST_TOKENS,
+    RESULT_CACHE,
+    MODEL_RETRIES,
+    MODEL_HEDGES,
+    MODEL_OUTPUT,
+    MODEL_OUTPUT_TOKENS,
+    MODEL_BREAKER_STATE,
+    ADMISSION,
+    ADMISSION_WAIT_SECONDS,
+    MODEL_INFLIGHT,
+    JOBS,
+    JOB_SECONDS,
+    JOB_QUEUE_DEPTH,
+)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------
+# Spans
+# ---------------------------------------------------------
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, self.stage)
+        trace = _trace_var.get()
+        if trace is not None:
+            trace.append((self.stage, elapsed))
+
+
+_NOOP_SPAN = nullcontext()
+
+
+def span(stage: str):
+    """Time a pipeline stage (works in sync and async code)."""
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(stage)
+
+
+def record_token_usage(response: Any, output_mode: Optional[str] = None) -> None:
+    """
+    Count prompt / candidate tokens if the response carries usage_metadata
+    (candidate tokens also per output mode, when given).
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if not ENABLED or usage is None:
+        return
+    if output_mode is not None:
+        count = getattr(usage, "candidates_token_count", None)
+        if isinstance(count, (int, float)) and count:
+            MODEL_OUTPUT_TOKENS.inc(output_mode, amount=count)
+    for kind, attr in (
+        ("prompt", "prompt_token_count"),
+        ("cached", "cached_content_token_count"),
+        ("candidates", "candidates_token_count"),
+        ("total", "total_token_count"),
+    ):
+        count = getattr(usage, attr, None)
+        if isinstance(count, (int, float)) and count:
+            MODEL_TOKENS.inc(kind, amount=count)
+    image = modality_tokens(usage, "IMAGE")
+    if image:
+        MODEL_TOKENS.inc("image", amount=image)
+
+
+def modality_tokens(usage: Any, modality: str) -> int:
+    """Prompt tokens of one modality (TEXT, IMAGE, ...) from prompt_tokens_details."""
+    total = 0
+    for detail in getattr(usage, "prompt_tokens_details", None) or ():
+        name = getattr(detail.modality, "name", detail.modality)
+        if name == modality:
+            total += int(getattr(detail, "token_count", 0) or 0)
+    return total
+
+
+# ---------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------
+class TelemetryMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware buffering): request ID,
+    per-route latency histogram and slow-request trace logging.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[Any, str] = {}
+
+    def _route_label(self, scope) -> str:
+        # Label by route template, never the raw path, to bound cardinality
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            routes = getattr(scope.get("app"), "routes", ())
+            for route in routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    path = route.path
+                    break
+            else:
+                path = getattr(endpoint, "__name__", "unknown")
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_RE.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        rid_token = request_id_var.set(request_id)
+        trace: List[Tuple[str, float]] = []
+        trace_token = _trace_var.set(trace)
+        status = [500]
+        start = time.perf_counter()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = self._route_label(scope)
+            REQUEST_SECONDS.observe(elapsed, route, scope["method"], str(status[0]))
+            if trace and elapsed * 1000 >= _settings.trace_log_slow_ms:
+                logger.info(
+                    "trace %s %s %.1fms: %s",
+                    scope["method"],
+                    route,
+                    elapsed * 1000,
+                    " ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in trace),
+                )
+            _trace_var.reset(trace_token)
+            request_id_var.reset(rid_token)
@@ -0,0 +1,160 @@
+# benchmarks/admission_bench.py
+"""
+Admission control: decision overhead and behaviour under a batch flood.
+
+1. overhead: microseconds per rate-limit decision (MemoryRateLimiter, over
+   --keys API keys) and per request through AdmissionMiddleware around a
+   no-op ASGI app, against the bare app. A Redis backend adds one round
+   trip per decision on top (not measured here: needs a server).
+2. flood: --batch batch extractions (a partner's bulk upload) are started
+   against the fake Gemini backend, then --interactive interactive ones
+   arrive while the model-call slots are saturated. Reports the interactive
+   and batch slot waits, with priority classes and with everything in one
+   FIFO, plus what was shed once waits passed the per-class SLO.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.admission_bench
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from typing import List
+
+from .extraction_bench import _household
+from .fake_gemini import FakeGenerativeModel, install
+from .load_test import percentile
+
+
+async def _noop_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _drive(app, requests: int, keys: int) -> float:
+    sent = []
+
+    async def send(message) -> None:
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    rng = random.Random(0)
+    scopes = [
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/score/lifestyle",
+            "headers": [(b"x-api-key", f"tenant-{rng.randrange(keys)}".encode())],
+        }
+        for _ in range(1000)
+    ]
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % len(scopes)], receive, send)
+        if len(sent) > 10_000:
+            sent.clear()
+    return (time.perf_counter() - start) / requests
+
+
+async def overhead(requests: int, keys: int) -> None:
+    from app.admission import AdmissionMiddleware, MemoryRateLimiter, _bucket_key
+    from app.config import get_settings
+
+    limiter = MemoryRateLimiter()
+    names = [_bucket_key(f"tenant-{i}") for i in range(keys)]
+    start = time.perf_counter()
+    for i in range(requests):
+        limiter.allow_now(names[i % keys], 1e6, 100)
+    decision = (time.perf_counter() - start) / requests
+    print(f"GCRA decision ({keys} keys)           {decision * 1e6:6.2f} us")
+
+    settings = get_settings()
+    # Registered tenants, each with its own bucket; measure the check, not rejections
+    settings.admission_tenant_rates = {f"tenant-{i}": 1e6 for i in range(keys)}
+    settings.admission_rate_per_second = 1e6
+    bare = await _drive(_noop_app, requests, keys)
+    wrapped = await _drive(AdmissionMiddleware(_noop_app), requests, keys)
+    print(f"no-op ASGI app                       {bare * 1e6:6.2f} us/request")
+    print(
+        f"  + AdmissionMiddleware              {wrapped * 1e6:6.2f} us/request "
+        f"(+{(wrapped - bare) * 1e6:.2f} us, {1 / (wrapped - bare) / 1e3:,.0f}k decisions/s per core)"
+    )
+
+
+async def flood(label: str, batch: int, interactive: int, priorities: bool, slots: int, slo: float) -> None:
+    from fastapi import HTTPException
+
+    from app import admission
+    from app.config import get_settings
+    from app.schemas import LocationContext
+    from app.services.reasoning_engine import extract_lifestyle_signals_from_images
+
+    settings = get_settings()
+    settings.admission_max_model_calls = slots
+    settings.admission_interactive_max_wait_seconds = slo
+    admission._gate = None
+    location = LocationContext(state="Karnataka", city="Bengaluru")
+    waits = {admission.INTERACTIVE: [], admission.BATCH: []}
+    outcomes: Counter = Counter()
+
+    async def one(priority: str, seed: int) -> None:
+        admission.priority_var.set(priority if priorities else admission.BATCH)
+        start = time.perf_counter()
+        try:
+            await extract_lifestyle_signals_from_images(_household(1, seed=seed), location)
+            outcomes[f"{priority}/ok"] += 1
+        except HTTPException as e:
+            outcomes[f"{priority}/{e.status_code}"] += 1
+            return
+        waits[priority].append(time.perf_counter() - start)
+
+    tasks = [asyncio.create_task(one(admission.BATCH, i)) for i in range(batch)]
+    await asyncio.sleep(0.05)  # the flood is queued before interactive traffic arrives
+    for i in range(interactive):
+        tasks.append(asyncio.create_task(one(admission.INTERACTIVE, batch + i)))
+        await asyncio.sleep(0.02)
+    await asyncio.gather(*tasks)
+
+    def fmt(values: List[float]) -> str:
+        if not values:
+            return "        -"
+        return f"p50 {percentile(sorted(values), 50):5.2f} s  p95 {percentile(sorted(values), 95):5.2f} s"
+
+    print(
+        f"{label:14s} interactive latency {fmt(waits[admission.INTERACTIVE])}   "
+        f"batch latency {fmt(waits[admission.BATCH])}   {dict(sorted(outcomes.items()))}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.25, help="fake Gemini latency (s)")
+    parser.add_argument("--slo", type=float, default=2.0, help="interactive max wait (s)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+    await overhead(args.requests, args.keys)
+
+    install(FakeGenerativeModel(latency_s=args.latency))
+    from app.services.vertex_client import ensure_ready
+
+    ensure_ready()
+    print(f"{args.batch} batch + {args.interactive} interactive extractions, {args.slots} slots, {args.latency}s per call:")
+    await flood("one FIFO", args.batch, args.interactive, False, args.slots, 1e9)
+    await flood("priorities", args.batch, args.interactive, True, args.slots, 1e9)
+    await flood(f"+ shed >{args.slo:g}s", args.batch, args.interactive * 10, True, args.slots // 4, args.slo)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+# benchmarks/client_setup_bench.py
+"""
+Per-request Gemini client setup cost: a new GenerativeModel per call (old
+behaviour) vs the shared VisionModelHolder (current behaviour).
+
+--with-transport also forces the SDK to create its prediction client
+(auth discovery + gRPC channel). That needs real GCP credentials.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.client_setup_bench
+    GCP_PROJECT_ID=my-project python -m benchmarks.client_setup_bench --with-transport
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+
+def _time_calls(fn: Callable[[], object], n: int) -> List[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _summary(label: str, samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mode": label,
+        "calls": len(samples),
+        "first_us": round(samples[0], 2),
+        "p50_us": round(statistics.median(ordered), 2),
+        "p99_us": round(ordered[int(len(ordered) * 0.99) - 1], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--with-transport", action="store_true")
+    args = parser.parse_args()
+
+    from app.services import vertex_client
+
+    def per_request() -> object:
+        model = vertex_client.build_vision_model()
+        if args.with_transport:
+            return model._prediction_client
+        return model
+
+    def shared() -> object:
+        model = vertex_client.vision_models.get()
+        if args.with_transport:
+            return model._prediction_client
+        return model
+
+    print(_summary("per_request_model", _time_calls(per_request, args.calls)))
+    print(_summary("shared_model", _time_calls(shared, args.calls)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/extraction_bench.py
+"""
+Latency and token cost of the extraction strategies (EXTRACTION_MODE)
+against the fake Gemini backend.
+
+The fake's latency grows with the images in a call (--latency base plus
+--per-image-latency each), like a real multimodal prompt. For each mode and
+household size it reports median / p95 extraction latency, model calls and
+prompt / output tokens per household; fanout repeats the text prompt once
+per group, which is its token overhead.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.extraction_bench
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+from typing import List
+
+from .fake_gemini import FakeGenerativeModel, install
+
+# (label, EXTRACTION_MODE, EXTRACTION_GROUP_MAX_TOKENS, EXTRACTION_FANOUT_CONCURRENCY)
+MODES = (
+    ("single", "single", 258, 4),
+    ("fanout x1", "fanout", 258, 4),
+    ("fanout x1", "fanout", 258, 10),
+    ("fanout x2", "fanout", 516, 4),
+    ("fanout x4", "fanout", 1032, 4),
+)
+
+
+def _household(count: int, seed: int) -> List[bytes]:
+    """Distinct small JPEGs (one tile each) so nothing is deduplicated or cached."""
+    from PIL import Image
+
+    images = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Image.new("RGB", (320, 240), (seed % 256, (seed * 7 + i * 31) % 256, i * 20 % 256)).save(buf, "JPEG")
+        images.append(buf.getvalue())
+    return images
+
+
+async def run_mode(mode: str, group_tokens: int, concurrency: int, sizes: List[int], rounds: int, model: FakeGenerativeModel) -> None:
+    from app.config import get_settings
+    from app.schemas import LocationContext
+    from app.services.reasoning_engine import extract_lifestyle_signals_from_images
+
+    settings = get_settings()
+    settings.extraction_mode = mode
+    settings.extraction_group_max_tokens = group_tokens
+    settings.extraction_fanout_concurrency = concurrency
+    location = LocationContext(state="Karnataka", city="Bengaluru")
+
+    for size in sizes:
+        calls, prompt, output = model.calls, model.prompt_tokens, model.candidates_tokens
+        latencies = []
+        for r in range(rounds):
+            images = _household(size, seed=r)
+            start = time.perf_counter()
+            await extract_lifestyle_signals_from_images(images, location)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        row = {
+            "images": size,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+            "calls": (model.calls - calls) / rounds,
+            "prompt_tokens": (model.prompt_tokens - prompt) / rounds,
+            "output_tokens": (model.candidates_tokens - output) / rounds,
+        }
+        print(
+            f"  {size:2d} images  p50 {row['p50_ms']:7.1f} ms  p95 {row['p95_ms']:7.1f} ms  "
+            f"{row['calls']:4.1f} calls  {row['prompt_tokens']:6.0f} prompt + "
+            f"{row['output_tokens']:4.0f} output tokens"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake base latency per call (s)")
+    parser.add_argument("--per-image-latency", type=float, default=0.15, help="fake latency per image (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+    model = install(
+        FakeGenerativeModel(
+            latency_s=args.latency,
+            per_image_s=args.per_image_latency,
+            jitter_s=args.jitter,
+        )
+    )
+    # Load the SDK (for image parts) before timing anything
+    from app.services.vertex_client import ensure_ready
+
+    ensure_ready()
+
+    for label, mode, group_tokens, concurrency in MODES:
+        print(f"{label} (mode={mode}, group_max_tokens={group_tokens}, concurrency={concurrency})")
+        await run_mode(mode, group_tokens, concurrency, args.sizes, args.rounds, model)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
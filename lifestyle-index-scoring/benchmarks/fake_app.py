@@ -0,0 +1,18 @@
+# benchmarks/fake_app.py
+"""
+The service wired to the fake Gemini backend, for running under uvicorn:
+
+    GCP_PROJECT_ID=local FAKE_GEMINI_LATENCY=0.5 \
+        uvicorn benchmarks.fake_app:app --workers 4
+
+Each worker process imports this module and installs its own fake model,
+configured from FAKE_GEMINI_* (see fake_gemini.from_env).
+"""
+
+from .fake_gemini import from_env, install
+
+fake_model = install(from_env())
+
+from app.main import app  # noqa: E402
+
+__all__ = ["app", "fake_model"]
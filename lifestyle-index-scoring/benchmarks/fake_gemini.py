@@ -0,0 +1,336 @@
+# benchmarks/fake_gemini.py
+"""
+Local stand-in for the Vertex AI Gemini Vision model.
+
+Lets the service run end-to-end without GCP credentials. `install()` replaces
+`vertex_client.build_vision_model` (and the context-cached variant) so every
+call goes to a FakeGenerativeModel that sleeps for a configurable latency
+(plus a per-image share, a prefill share per uncached prompt token, jitter
+and an occasional slow tail), fails a configurable
+fraction of calls and returns canned JSON drawn from OUTPUTS: clean, wrapped
+in a ```json fence, surrounded by prose, truncated (malformed) or empty.
+Calls with a JSON response schema (generation_config) always get the clean
+answer, as constrained decoding would give, unless the fake is built with
+structured_output=False: then they fail with 400 like a model without
+response-schema support.
+
+Token usage mirrors Gemini's usage_metadata: the system instruction counts
+as prompt tokens (as cached_content_token_count too when the model was
+built from a context cache) and prompt_tokens_details splits TEXT / IMAGE.
+
+`from_env()` builds the model from FAKE_GEMINI_* variables, which is how
+benchmarks.fake_app configures each uvicorn worker process.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from google.api_core import exceptions as api_exceptions
+
+DEFAULT_RESPONSE = json.dumps(
+    {
+        "assets": [
+            {"name": "AIR_CONDITIONER", "confidence": 0.9, "quantity": 1, "extra": {}},
+            {"name": "REFRIGERATOR", "confidence": 0.85, "quantity": 1, "extra": {}},
+            {"name": "SMART_TV", "confidence": 0.8, "quantity": 1, "extra": {}},
+        ],
+        "notes": "fake backend response",
+    }
+)
+
+# Shapes real model output takes; malformed is cut off mid-answer (only the
+# assets before the cut are recovered) and empty always fails
+OUTPUTS: Dict[str, str] = {
+    "clean": DEFAULT_RESPONSE,
+    "fenced": f"```json\n{DEFAULT_RESPONSE}\n```",
+    "prose": f"Here is the analysis of the photos:\n{DEFAULT_RESPONSE}\nLet me know if you need more.",
+    "malformed": DEFAULT_RESPONSE[: len(DEFAULT_RESPONSE) // 2],
+    "empty": "",
+}
+
+
+def parse_output_mix(spec: str) -> Dict[str, float]:
+    """
+    "clean=0.9,fenced=0.05,malformed=0.05" -> weights per OUTPUTS name.
+    A bare name ("fenced") means always that output.
+    """
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OUTPUTS:
+            raise ValueError(f"unknown fake output {name!r} (choose from {', '.join(OUTPUTS)})")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"empty fake output mix: {spec!r}")
+    return mix
+
+
+_IMAGE_TOKENS = 258
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt_tokens: int = 0, image_tokens: int = 0, cached_tokens: int = 0):
+        self.text = text
+        candidates = len(text) // 4
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            cached_content_token_count=cached_tokens,
+            candidates_token_count=candidates,
+            total_token_count=prompt_tokens + candidates,
+            prompt_tokens_details=[
+                SimpleNamespace(modality="TEXT", token_count=prompt_tokens - image_tokens),
+                SimpleNamespace(modality="IMAGE", token_count=image_tokens),
+            ],
+        )
+
+    def chunks(self, count: int) -> List["FakeResponse"]:
+        """Split into streaming chunks; only the last carries usage_metadata."""
+        size = max(1, -(-len(self.text) // count))
+        parts = [FakeResponse(self.text[i : i + size]) for i in range(0, len(self.text), size)] or [FakeResponse("")]
+        for part in parts[:-1]:
+            part.usage_metadata = None
+        parts[-1].usage_metadata = self.usage_metadata
+        return parts
+
+
+class FakeGenerativeModel:
+    """
+    Mimics the parts of vertexai GenerativeModel the service uses.
+
+    native_async=False hides generate_content_async so the thread-pool
+    fallback in vertex_client is exercised instead. Calls draw latency,
+    failure and output from one seeded RNG, so a run is reproducible for a
+    given request order.
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.5,
+        response_text: Optional[str] = None,
+        native_async: bool = True,
+        jitter_s: float = 0.0,
+        failure_rate: float = 0.0,
+        outputs: Union[str, Dict[str, float], None] = None,
+        seed: Optional[int] = 0,
+        slow_rate: float = 0.0,
+        slow_s: float = 0.0,
+        per_image_s: float = 0.0,
+        structured_output: bool = True,
+        per_prompt_token_s: float = 0.0,
+    ):
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.slow_s = slow_s
+        self.per_image_s = per_image_s
+        self.per_prompt_token_s = per_prompt_token_s
+        self.structured_output = structured_output
+        if response_text is not None:
+            self._names, self._texts, self._weights = ["custom"], [response_text], [1.0]
+        else:
+            mix = parse_output_mix(outputs) if isinstance(outputs, str) else (outputs or {"clean": 1.0})
+            self._names = list(mix)
+            self._texts = [OUTPUTS[name] for name in mix]
+            self._weights = list(mix.values())
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.candidates_tokens = 0
+        self.outputs: Counter = Counter()
+        self.context_caches = 0
+        if not native_async:
+            self.generate_content_async = None
+
+    def bind(self, system_instruction: Optional[str] = None, cached: bool = False) -> "_BoundFakeModel":
+        """
+        This model as GenerativeModel(system_instruction=...) or
+        from_cached_content() would build it: a view sharing the RNG and
+        counters that sends `system_instruction` with every call.
+        """
+        if cached:
+            with self._lock:
+                self.context_caches += 1
+        return _BoundFakeModel(self, system_instruction, cached)
+
+    @staticmethod
+    def _wants_json(generation_config: Any) -> bool:
+        raw = getattr(generation_config, "_raw_generation_config", generation_config)
+        if isinstance(raw, dict):
+            return raw.get("response_mime_type") == "application/json"
+        return getattr(raw, "response_mime_type", "") == "application/json"
+
+    def _draw(
+        self,
+        contents: Any,
+        generation_config: Any = None,
+        system_instruction: Optional[str] = None,
+        cached: bool = False,
+    ):
+        """Pick (delay, error or None, response) for one call."""
+        structured = generation_config is not None and self._wants_json(generation_config)
+        # Rough prompt size: ~258 tokens per image, ~4 characters per text token
+        parts = contents if isinstance(contents, list) else [contents]
+        images = sum(1 for p in parts if not isinstance(p, str))
+        image_tokens = _IMAGE_TOKENS * images
+        instruction_tokens = len(system_instruction or "") // 4
+        cached_tokens = instruction_tokens if cached else 0
+        prompt_tokens = (
+            instruction_tokens + sum(len(p) // 4 for p in parts if isinstance(p, str)) + image_tokens
+        )
+
+        with self._lock:
+            self.calls += 1
+            if structured and not self.structured_output:
+                self.failures += 1
+                return 0.0, api_exceptions.InvalidArgument(
+                    "response_schema is not supported for this model"
+                ), None
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            delay = (
+                self.latency_s
+                + self.per_image_s * images
+                + self.per_prompt_token_s * (prompt_tokens - cached_tokens)
+            )
+            if self.jitter_s:
+                delay += self._rng.uniform(0, self.jitter_s)
+            if self.slow_rate and self._rng.random() < self.slow_rate:
+                self.slow_calls += 1
+                delay += self.slow_s
+            if self.failure_rate and self._rng.random() < self.failure_rate:
+                self.failures += 1
+                return delay, api_exceptions.ServiceUnavailable("fake Gemini backend failure"), None
+            if structured:
+                self.outputs["schema"] += 1
+                response = FakeResponse(OUTPUTS["clean"], prompt_tokens, image_tokens, cached_tokens)
+            else:
+                i = self._rng.choices(range(len(self._texts)), weights=self._weights)[0] if len(self._texts) > 1 else 0
+                self.outputs[self._names[i]] += 1
+                response = FakeResponse(self._texts[i], prompt_tokens, image_tokens, cached_tokens)
+            self.candidates_tokens += response.usage_metadata.candidates_token_count
+        return delay, None, response
+
+    # Streaming: the first chunk arrives after STREAM_FIRST_CHUNK of the
+    # call's latency, the rest evenly over the remainder
+    STREAM_CHUNKS = 8
+    STREAM_FIRST_CHUNK = 0.3
+
+    def generate_content(self, contents: Any, stream: bool = False, generation_config: Any = None, **kwargs: Any) -> Any:
+        delay, error, response = self._draw(contents, generation_config, **kwargs)
+        if stream:
+            return self._stream_sync(delay, error, response)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, generation_config: Any = None, **kwargs: Any) -> Any:
+        delay, error, response = self._draw(contents, generation_config, **kwargs)
+        if stream:
+            return self._stream_async(delay, error, response)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    def _stream_gaps(self, delay: float, parts: int) -> List[float]:
+        first = delay * self.STREAM_FIRST_CHUNK
+        rest = (delay - first) / max(1, parts - 1)
+        return [first] + [rest] * (parts - 1)
+
+    def _stream_sync(self, delay: float, error: Optional[Exception], response: Optional[FakeResponse]) -> Iterator[FakeResponse]:
+        if error is not None:
+            time.sleep(delay * self.STREAM_FIRST_CHUNK)
+            raise error
+        parts = response.chunks(self.STREAM_CHUNKS)
+        for gap, part in zip(self._stream_gaps(delay, len(parts)), parts):
+            time.sleep(gap)
+            yield part
+
+    async def _stream_async(self, delay: float, error: Optional[Exception], response: Optional[FakeResponse]) -> AsyncIterator[FakeResponse]:
+        if error is not None:
+            await asyncio.sleep(delay * self.STREAM_FIRST_CHUNK)
+            raise error
+        parts = response.chunks(self.STREAM_CHUNKS)
+        for gap, part in zip(self._stream_gaps(delay, len(parts)), parts):
+            await asyncio.sleep(gap)
+            yield part
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "candidates_tokens": self.candidates_tokens,
+            "context_caches": self.context_caches,
+            "outputs": dict(self.outputs),
+        }
+
+
+class _BoundFakeModel:
+    """A FakeGenerativeModel with a system instruction (see bind())."""
+
+    def __init__(self, model: FakeGenerativeModel, system_instruction: Optional[str], cached: bool):
+        self._model = model
+        self._instruction = {"system_instruction": system_instruction, "cached": cached}
+        if model.__dict__.get("generate_content_async", True) is None:
+            self.generate_content_async = None
+
+    def generate_content(self, contents: Any, **kwargs: Any) -> Any:
+        return self._model.generate_content(contents, **kwargs, **self._instruction)
+
+    async def generate_content_async(self, contents: Any, **kwargs: Any) -> Any:
+        return await self._model.generate_content_async(contents, **kwargs, **self._instruction)
+
+
+def from_env() -> FakeGenerativeModel:
+    """
+    Build a model from FAKE_GEMINI_LATENCY / _PER_IMAGE_LATENCY /
+    _PER_PROMPT_TOKEN_LATENCY / _JITTER / _SLOW_RATE / _SLOW_LATENCY /
+    _FAILURE_RATE / _OUTPUTS / _SEED / _BLOCKING / _STRUCTURED.
+    """
+    return FakeGenerativeModel(
+        latency_s=float(os.getenv("FAKE_GEMINI_LATENCY", "0.5")),
+        per_image_s=float(os.getenv("FAKE_GEMINI_PER_IMAGE_LATENCY", "0")),
+        per_prompt_token_s=float(os.getenv("FAKE_GEMINI_PER_PROMPT_TOKEN_LATENCY", "0")),
+        jitter_s=float(os.getenv("FAKE_GEMINI_JITTER", "0")),
+        slow_rate=float(os.getenv("FAKE_GEMINI_SLOW_RATE", "0")),
+        slow_s=float(os.getenv("FAKE_GEMINI_SLOW_LATENCY", "0")),
+        failure_rate=float(os.getenv("FAKE_GEMINI_FAILURE_RATE", "0")),
+        outputs=os.getenv("FAKE_GEMINI_OUTPUTS", "clean"),
+        seed=int(os.getenv("FAKE_GEMINI_SEED", "0")),
+        native_async=os.getenv("FAKE_GEMINI_BLOCKING", "").lower() not in ("1", "true", "yes"),
+        structured_output=os.getenv("FAKE_GEMINI_STRUCTURED", "1").lower() in ("1", "true", "yes"),
+    )
+
+
+def install(model: FakeGenerativeModel) -> FakeGenerativeModel:
+    """Route all vertex_client model calls to `model`."""
+    from app.services import vertex_client
+
+    vertex_client.build_vision_model = lambda model_name=None, system_instruction=None: model.bind(
+        system_instruction
+    )
+    vertex_client.build_cached_vision_model = lambda model_name, system_instruction, ttl_seconds: model.bind(
+        system_instruction, cached=True
+    )
+    vertex_client.vision_models.invalidate()
+    return model
@@ -0,0 +1,116 @@
+# benchmarks/ingest_bench.py
+"""
+Peak memory and payload size of image ingestion, old vs new.
+
+Generates a corpus of 12 MP JPEGs (phone-camera sized) and runs one
+request's worth of uploads through either:
+  raw    - await img.read() for every file, bytes forwarded unchanged
+  ingest - ingest_upload(): chunked capped read + downscale/re-encode
+
+The held images are then base64-encoded, as the SDK does for inline image
+parts, so the peak includes the outgoing Vertex AI request body. Each mode
+runs in a fresh subprocess so ru_maxrss is a clean per-mode peak.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.ingest_bench --images 10
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), "lifestyle_ingest_corpus")
+
+
+def build_corpus(n: int, width: int = 4000, height: int = 3000) -> List[str]:
+    from PIL import Image, ImageDraw, ImageFilter
+
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    paths = []
+    rng = random.Random(42)
+    for i in range(n):
+        path = os.path.join(CORPUS_DIR, f"photo_{i:02d}_{width}x{height}.jpg")
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        # Noise + shapes gives camera-like JPEG sizes (several MB at q=95)
+        img = Image.effect_noise((width, height), 60).convert("RGB")
+        draw = ImageDraw.Draw(img)
+        for _ in range(40):
+            x, y = rng.randrange(width), rng.randrange(height)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            draw.rectangle([x, y, x + rng.randrange(200, 900), y + rng.randrange(200, 900)], fill=color)
+        img = img.filter(ImageFilter.GaussianBlur(1))
+        img.save(path, "JPEG", quality=95)
+    return paths
+
+
+class _FakeUpload:
+    """Just enough of starlette's UploadFile for read_upload_capped."""
+
+    def __init__(self, path: str):
+        self.filename = os.path.basename(path)
+        self._f = open(path, "rb")
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+
+async def _run(mode: str, paths: List[str]) -> dict:
+    from app.services.image_ingest import ingest_upload
+
+    held: List[bytes] = []
+    start = time.perf_counter()
+    for p in paths:
+        up = _FakeUpload(p)
+        if mode == "raw":
+            held.append(await up.read())
+        else:
+            held.append(await ingest_upload(up))
+    elapsed = time.perf_counter() - start
+    request_body = [base64.b64encode(b) for b in held]
+
+    return {
+        "mode": mode,
+        "images": len(paths),
+        "input_bytes": sum(os.path.getsize(p) for p in paths),
+        "payload_bytes": sum(len(b) for b in held),
+        "request_body_bytes": sum(len(b) for b in request_body),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--mode", choices=["raw", "ingest"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        paths = build_corpus(args.images)
+        print(json.dumps(asyncio.run(_run(args.mode, paths))))
+        return
+
+    build_corpus(args.images)
+    for mode in ("raw", "ingest"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.ingest_bench", "--images", str(args.images), "--mode", mode],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        print(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/job_bench.py
+"""
+A burst of households against the synchronous endpoint and the job API,
+with the fake Gemini backend (in process, httpx ASGI transport).
+
+sync: --burst concurrent POST /score/lifestyle; each connection stays open
+for the whole model call, and every request in the burst is in flight at once.
+
+jobs: the same burst against POST /score/lifestyle/jobs with --workers and
+--max-depth, then polling until every accepted job has finished. Reports
+how long submissions hold a connection, how many were turned away with
+429 (and their Retry-After), and the queue wait / service time the workers
+record.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.job_bench
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import time
+from collections import Counter
+from typing import List
+
+from .fake_gemini import FakeGenerativeModel, install
+from .load_test import percentile
+
+
+def _image(i: int) -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 64), (i % 256, i * 7 % 256, i * 13 % 256)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def _ms(values: List[float], q: float) -> str:
+    return f"{percentile(sorted(values), q) * 1000:7.1f} ms"
+
+
+async def run_sync(client, burst: int) -> None:
+    async def one(i: int) -> float:
+        start = time.perf_counter()
+        r = await client.post(
+            "/score/lifestyle",
+            files=[("images", ("a.jpg", _image(i), "image/jpeg"))],
+            data={"state": "Karnataka"},
+        )
+        r.raise_for_status()
+        return time.perf_counter() - start
+
+    held = await asyncio.gather(*(one(i) for i in range(burst)))
+    print(f"sync  {burst} requests  connection held p50 {_ms(held, 50)}  p95 {_ms(held, 95)}")
+
+
+async def run_jobs(client, burst: int) -> None:
+    async def submit(i: int):
+        start = time.perf_counter()
+        r = await client.post(
+            "/score/lifestyle/jobs",
+            files=[("images", ("a.jpg", _image(burst + i), "image/jpeg"))],
+            data={"state": "Karnataka"},
+        )
+        return time.perf_counter() - start, r
+
+    start = time.perf_counter()
+    submitted = await asyncio.gather(*(submit(i) for i in range(burst)))
+    codes = Counter(r.status_code for _, r in submitted)
+    retry_after = sorted({r.headers["retry-after"] for _, r in submitted if r.status_code == 429})
+    ids = [r.json()["job_id"] for _, r in submitted if r.status_code == 202]
+
+    pending = set(ids)
+    statuses = {}
+    while pending:
+        await asyncio.sleep(0.05)
+        for job_id in list(pending):
+            status = (await client.get(f"/score/lifestyle/jobs/{job_id}")).json()
+            if status["finished_at"] is not None:
+                statuses[job_id] = status
+                pending.discard(job_id)
+    elapsed = time.perf_counter() - start
+
+    held = [t for t, _ in submitted]
+    wait = [s["started_at"] - s["created_at"] for s in statuses.values()]
+    service = [s["finished_at"] - s["started_at"] for s in statuses.values()]
+    outcomes = Counter(s["status"] for s in statuses.values())
+    print(
+        f"jobs  {burst} submissions  connection held p50 {_ms(held, 50)}  p95 {_ms(held, 95)}  "
+        f"status codes {dict(codes)}  Retry-After {retry_after}"
+    )
+    print(
+        f"      queue wait p50 {_ms(wait, 50)}  p95 {_ms(wait, 95)}  service p50 {_ms(service, 50)}  "
+        f"outcomes {dict(outcomes)}  drained in {elapsed:.2f} s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--burst", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Gemini latency (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-depth", type=int, default=40)
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+    os.environ.setdefault("IMAGE_DEDUP_ENABLED", "false")
+    os.environ.setdefault("PREFILTER_MODE", "off")  # the flat test images would be skipped as blank
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+    os.environ["JOB_WORKERS"] = str(args.workers)
+    os.environ["JOB_QUEUE_MAX_DEPTH"] = str(args.max_depth)
+    install(FakeGenerativeModel(latency_s=args.latency))
+
+    import httpx
+
+    from app.main import app
+    from app.services import vertex_client
+
+    vertex_client.ensure_ready()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await run_sync(client, args.burst)
+        await run_jobs(client, args.burst)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,414 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test for POST /score/lifestyle against the fake Gemini backend.
+
+Two modes:
+- inprocess: the FastAPI app on this process's event loop (httpx ASGI
+  transport). Cheap and deterministic; CPU includes the client's own work.
+- uvicorn: `uvicorn benchmarks.fake_app:app --workers N` in a subprocess,
+  driven over real HTTP. CPU and RSS are the server process tree only.
+
+Each concurrency level reports p50/p95/p99 latency, throughput, status
+counts, the slowest `/` health probe, CPU time per request and RSS. Results
+go to JSON (--output) together with the commit and settings, and --compare
+flags throughput / tail-latency regressions against an earlier file
+(exit code 1).
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.load_test --latency 0.5
+    GCP_PROJECT_ID=local python -m benchmarks.load_test --latency 0.5 --blocking
+    GCP_PROJECT_ID=local python -m benchmarks.load_test --mode uvicorn --workers 4 \\
+        --failure-rate 0.02 --output-mode freeform --outputs clean=0.9,fenced=0.05,malformed=0.05 \\
+        --output bench.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .fake_gemini import FakeGenerativeModel, install, parse_output_mix
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample_images(count: int) -> List[bytes]:
+    """Small real JPEGs so the ingest/dedup stages run as they would in production."""
+    from PIL import Image
+
+    images = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Image.new("RGB", (640, 480), (180, 160 - 20 * i, 140 + 10 * i)).save(buf, "JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images
+
+
+# ---------------------------------------------------------
+# Process resources (Linux /proc; psutil when installed)
+# ---------------------------------------------------------
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _proc_tree(pid: int) -> List[int]:
+    pids, i = [pid], 0
+    while i < len(pids):
+        try:
+            with open(f"/proc/{pids[i]}/task/{pids[i]}/children") as f:
+                pids.extend(int(p) for p in f.read().split())
+        except OSError:
+            pass
+        i += 1
+    return pids
+
+
+def sample_resources(pid: int) -> Optional[Tuple[float, float]]:
+    """(CPU seconds, RSS bytes) summed over `pid` and its descendants."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+            cpu = sum(sum(p.cpu_times()[:2]) for p in procs)
+            rss = sum(p.memory_info().rss for p in procs)
+            return cpu, float(rss)
+        except psutil.Error:
+            return None
+
+    if not os.path.exists(f"/proc/{pid}"):
+        return None
+    cpu = rss = 0.0
+    for p in _proc_tree(pid):
+        try:
+            with open(f"/proc/{p}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+            rss += int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu, rss
+
+
+# ---------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _score_once(client: httpx.AsyncClient, images: List[bytes]) -> Tuple[float, int]:
+    start = time.perf_counter()
+    try:
+        resp = await client.post(
+            "/score/lifestyle",
+            data={"state": "Karnataka", "city": "Bengaluru"},
+            files=[("images", (f"room{i}.jpg", img, "image/jpeg")) for i, img in enumerate(images)],
+        )
+        status = resp.status_code
+    except httpx.HTTPError:
+        status = 0  # transport error / timeout
+    return time.perf_counter() - start, status
+
+
+async def _health_probe(client: httpx.AsyncClient, stop: asyncio.Event) -> List[float]:
+    samples: List[float] = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+    return samples
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    total: int,
+    images: List[bytes],
+    server_pid: int,
+) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded() -> Tuple[float, int]:
+        async with sem:
+            return await _score_once(client, images)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_health_probe(client, stop))
+
+    before = sample_resources(server_pid)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    after = sample_resources(server_pid)
+
+    stop.set()
+    health = await probe
+
+    latencies = sorted(lat for lat, _ in results)
+    statuses = Counter(str(status) for _, status in results)
+    ok = statuses.get("200", 0)
+    cpu_ms = rss_mb = None
+    if before is not None and after is not None:
+        cpu_ms = round((after[0] - before[0]) / total * 1000, 3)
+        rss_mb = round(after[1] / 2**20, 1)
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": ok,
+        "error_rate": round(1 - ok / total, 4),
+        "statuses": dict(sorted(statuses.items())),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "latency_max_ms": round(latencies[-1] * 1000, 2),
+        "health_max_ms": round(max(health) * 1000, 2) if health else None,
+        "cpu_ms_per_request": cpu_ms,
+        "rss_mb": rss_mb,
+    }
+
+
+# ---------------------------------------------------------
+# Servers
+# ---------------------------------------------------------
+def _fake_env(args: argparse.Namespace) -> Dict[str, str]:
+    return {
+        "FAKE_GEMINI_LATENCY": str(args.latency),
+        "FAKE_GEMINI_PER_IMAGE_LATENCY": str(args.per_image_latency),
+        "FAKE_GEMINI_JITTER": str(args.jitter),
+        "FAKE_GEMINI_SLOW_RATE": str(args.slow_rate),
+        "FAKE_GEMINI_SLOW_LATENCY": str(args.slow_latency),
+        "FAKE_GEMINI_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_GEMINI_OUTPUTS": args.outputs,
+        "FAKE_GEMINI_SEED": str(args.seed),
+        "FAKE_GEMINI_BLOCKING": "1" if args.blocking else "",
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, proc: subprocess.Popen, timeout_s: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"uvicorn did not become ready within {timeout_s:.0f}s")
+
+
+async def run_uvicorn(args: argparse.Namespace, images: List[bytes]) -> List[dict]:
+    port = args.port or _free_port()
+    env = {**os.environ, **_fake_env(args)}
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.fake_app:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=PROJECT_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await _wait_ready(base_url, proc)
+        limits = httpx.Limits(max_connections=max(args.levels) + 8)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            await _score_once(client, images)  # warm up every lazy path once
+            return [
+                await run_level(client, level, args.requests, images, proc.pid)
+                for level in args.levels
+            ]
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def run_inprocess(args: argparse.Namespace, images: List[bytes]) -> List[dict]:
+    model = install(
+        FakeGenerativeModel(
+            latency_s=args.latency,
+            per_image_s=args.per_image_latency,
+            jitter_s=args.jitter,
+            slow_rate=args.slow_rate,
+            slow_s=args.slow_latency,
+            failure_rate=args.failure_rate,
+            outputs=args.outputs,
+            seed=args.seed,
+            native_async=not args.blocking,
+        )
+    )
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await _score_once(client, images)
+        levels = [
+            await run_level(client, level, args.requests, images, os.getpid())
+            for level in args.levels
+        ]
+    print(f"fake backend: {model.stats()}", file=sys.stderr)
+    return levels
+
+
+# ---------------------------------------------------------
+# Results
+# ---------------------------------------------------------
+def _git(*cmd: str) -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", *cmd], cwd=PROJECT_DIR, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def run_metadata(args: argparse.Namespace) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        # Service settings overridden for this run (retries, hedging, caches...)
+        "env": {
+            k: v
+            for k, v in sorted(os.environ.items())
+            if k.startswith(("GEMINI_", "VERTEX_", "RESULT_CACHE_", "IMAGE_", "TELEMETRY_"))
+        },
+    }
+
+
+def compare(current: List[dict], baseline_path: str, tolerance: float) -> bool:
+    """Print per-level deltas against a baseline file; True if any regressed."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    base_levels = {lvl["concurrency"]: lvl for lvl in baseline["levels"]}
+    print(f"vs {baseline_path} (commit {baseline['meta'].get('commit')}), tolerance {tolerance:.0%}")
+
+    regressed = False
+    # (metric, higher is better)
+    for metric, higher_better in (
+        ("throughput_rps", True),
+        ("latency_p95_ms", False),
+        ("latency_p99_ms", False),
+        ("cpu_ms_per_request", False),
+    ):
+        for lvl in current:
+            base = base_levels.get(lvl["concurrency"], {}).get(metric)
+            value = lvl.get(metric)
+            if not base or value is None:
+                continue
+            change = (value - base) / base
+            worse = -change if higher_better else change
+            flag = "REGRESSION" if worse > tolerance else ""
+            regressed = regressed or bool(flag)
+            print(f"  c={lvl['concurrency']:<4d} {metric:20s} {base:10.2f} -> {value:10.2f} ({change:+.1%}) {flag}")
+    return regressed
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers (uvicorn mode)")
+    parser.add_argument("--port", type=int, default=0, help="uvicorn port (default: a free one)")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency (s)")
+    parser.add_argument("--per-image-latency", type=float, default=0.0, help="extra latency per image (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of model calls that are slow")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="extra latency of a slow call (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of model calls that fail")
+    parser.add_argument(
+        "--output-mode",
+        choices=("schema", "freeform"),
+        default="schema",
+        help="GEMINI_OUTPUT_MODE of the service (schema answers are always clean)",
+    )
+    parser.add_argument(
+        "--outputs",
+        default="clean",
+        help="fake output mix for freeform mode, e.g. clean=0.9,fenced=0.05,malformed=0.05",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--images", type=int, default=1, help="images per request")
+    parser.add_argument("--requests", type=int, default=32, help="requests per level")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="hide generate_content_async to exercise the thread-pool fallback",
+    )
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression (fraction)")
+    args = parser.parse_args()
+    parse_output_mix(args.outputs)  # fail fast on a typo
+
+    # Every request uploads the same images; measure the model path, not cache
+    # hits (and the flat placeholder images would be pre-filtered as blank)
+    os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+    os.environ.setdefault("PREFILTER_MODE", "off")
+    os.environ["GEMINI_OUTPUT_MODE"] = args.output_mode
+    images = _sample_images(args.images)
+
+    if args.mode == "uvicorn":
+        levels = await run_uvicorn(args, images)
+    else:
+        levels = await run_inprocess(args, images)
+
+    for lvl in levels:
+        print(json.dumps(lvl))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": run_metadata(args), "levels": levels}, f, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.compare and compare(levels, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
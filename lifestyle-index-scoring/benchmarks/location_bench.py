@@ -0,0 +1,111 @@
+# benchmarks/location_bench.py
+"""
+Load cost, footprint and lookup latency of the pincode / city index and
+the free-text state resolver.
+
+The bundled seed file only has ranges, so a synthetic India-sized directory
+(--pincodes single-pincode rows spread over ~700 districts, nested inside
+the seed ranges) is generated to measure at full scale.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.location_bench
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from app.location_index import DEFAULT_PINCODE_INDEX_PATH, load_pincode_index
+from app.scoring_tables import CLIMATE_ZONES, METRO_FLAGS, get_scoring_table
+from app.state_resolver import get_state_resolver
+
+
+def write_directory(path: str, pincodes: int, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    with open(DEFAULT_PINCODE_INDEX_PATH, "r", encoding="utf-8", newline="") as f:
+        seed_rows = list(csv.DictReader(f))
+    taken = {
+        p
+        for row in seed_rows
+        for p in range(int(row["start"]), int(row["end"] or row["start"]) + 1)
+    }
+    districts = [
+        (f"District {i}", rng.choice(seed_rows)["state"], rng.choice(CLIMATE_ZONES))
+        for i in range(700)
+    ]
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start", "end", "district", "state", "tier", "climate", "metro_flag", "cities"])
+        for row in seed_rows:
+            writer.writerow([row[k] for k in ("start", "end", "district", "state", "tier", "climate", "metro_flag", "cities")])
+        chosen = set()
+        while len(chosen) < pincodes:
+            pin = rng.randint(110001, 855999)
+            if pin not in taken:
+                chosen.add(pin)
+        for pin in sorted(chosen):
+            district, state, climate = districts[pin % len(districts)]
+            writer.writerow([pin, "", district, state, 3, climate, METRO_FLAGS[1], district])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pincodes", type=int, default=19_000)
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "pincodes.csv")
+    write_directory(path, args.pincodes)
+
+    start = time.perf_counter()
+    index = load_pincode_index(path)
+    load_s = time.perf_counter() - start
+
+    tracemalloc.start()
+    measured = load_pincode_index(path)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+
+    print(f"load            {load_s * 1000:8.1f} ms for {args.pincodes} pincodes")
+    print(f"segments        {len(index):8d} ({index.nbytes() / 1024:.0f} KiB index columns)")
+    print(f"retained        {retained / 1024:8.0f} KiB (tracemalloc, incl. records + city map)")
+
+    table = get_scoring_table()
+    cases = (
+        ("pincode hit", lambda: index.lookup_pincode("560034")),
+        ("pincode miss", lambda: index.lookup_pincode("999999")),
+        ("city exact", lambda: index.lookup_city("Bengaluru", "KARNATAKA")),
+        ("city fuzzy", lambda: index.lookup_city("Bengaluruu", "KARNATAKA")),
+        ("resolve", lambda: index.resolve(table, "Karnataka", "Bengaluru", "560034")),
+    )
+    for label, fn in cases:
+        best = min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+        print(f"{label:15s} {best * 1e9:8.0f} ns/call")
+
+    cold = index._match_city_uncached
+    start = time.perf_counter()
+    for _ in range(100):
+        cold("Bengaluruu", "KARNATAKA")
+    print(f"city fuzzy cold {(time.perf_counter() - start) / 100 * 1e6:8.1f} us/call (LRU miss)")
+
+    resolver = get_state_resolver()
+    for label, name in (
+        ("state exact", "Karnataka"),
+        ("state alias", "Orissa"),
+        ("state city", "Bangalore"),
+        ("state fuzzy", "Mahrashtra"),
+    ):
+        cold = min(timeit.repeat(lambda: resolver._resolve_uncached(name), number=2000, repeat=5)) / 2000
+        warm = min(timeit.repeat(lambda: resolver.resolve(name), number=args.number, repeat=5)) / args.number
+        print(f"{label:15s} {cold * 1e9:8.0f} ns cold, {warm * 1e9:5.0f} ns cached -> {resolver.resolve(name)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/model_outputs.py
+"""
+Corpus of Gemini answer shapes seen in practice, for parse_bench.
+
+Each case is (name, text, expected): expected is the number of assets
+parse_gemini_response must return, or None when it must fail with a 500.
+"""
+
+import json
+from typing import List, Optional, Tuple
+
+from .fake_gemini import DEFAULT_RESPONSE
+
+_ASSETS = json.loads(DEFAULT_RESPONSE)["assets"]
+_LONG_NOTES = (
+    "The living room shows a wall-mounted split AC above the window and a large "
+    "flat-screen TV; the kitchen has a double-door refrigerator. "
+) * 40
+
+
+def _answer(assets=_ASSETS, notes: str = "fake backend response", indent: Optional[int] = None) -> str:
+    return json.dumps({"assets": assets, "notes": notes}, indent=indent)
+
+
+PRETTY = _answer(indent=2)
+LONG = _answer(notes=_LONG_NOTES, indent=2)
+MANY = _answer(
+    assets=[
+        {"name": f"ASSET_{i}", "confidence": 0.5, "quantity": 1, "extra": {"room_type": "hall"}}
+        for i in range(40)
+    ],
+    indent=2,
+)
+
+CASES: List[Tuple[str, str, Optional[int]]] = [
+    ("clean", DEFAULT_RESPONSE, 3),
+    ("pretty", PRETTY, 3),
+    ("fenced", f"```json\n{PRETTY}\n```", 3),
+    ("fenced_no_lang", f"```\n{PRETTY}\n```", 3),
+    ("fenced_inline_json", f"```json {DEFAULT_RESPONSE}```", 3),
+    ("json_prefix", f"json\n{PRETTY}", 3),
+    ("prose_around", f"Here is the analysis of the photos:\n{PRETTY}\nLet me know if you need more.", 3),
+    ("prose_braces_before", f"Assets found {{see below}}:\n```json\n{PRETTY}\n```", 3),
+    ("prose_brace_after", f"{PRETTY}\nHope that helps :}}", 3),
+    ("braces_in_notes", _answer(notes="Brand logos {Daikin} and [LG] visible; \"premium\" look } {"), 3),
+    ("bom_and_whitespace", "﻿\n\n  " + PRETTY + "  \n\n", 3),
+    ("unicode", _answer(notes="घर में एसी और फ्रिज है — ✓"), 3),
+    ("trailing_commas", PRETTY.replace("}\n  ]", "},\n  ]").replace('"extra": {}', '"extra": {},'), 3),
+    ("double_comma", DEFAULT_RESPONSE.replace("}, {", "},, {", 1), 3),
+    ("truncated_in_notes", DEFAULT_RESPONSE[: DEFAULT_RESPONSE.index('"notes"') + 12], 3),
+    ("truncated_after_two", DEFAULT_RESPONSE[: DEFAULT_RESPONSE.index("SMART_TV") - 5], 2),
+    ("truncated_in_extra", PRETTY[: PRETTY.rindex('"extra"') + 12], 2),
+    ("truncated_fenced", "```json\n" + PRETTY[: PRETTY.index("REFRIGERATOR")], 1),
+    ("truncated_escape", DEFAULT_RESPONSE[: DEFAULT_RESPONSE.index('"notes"')] + '"notes": "said \\', 3),
+    ("truncated_long_notes", LONG[: len(LONG) // 2], 3),
+    ("truncated_many", MANY[: MANY.index('"ASSET_30"') - 10], 30),
+    ("assets_null", '{"assets": null, "notes": "nothing visible"}', 0),
+    ("assets_object", '{"assets": {"name": "CAR"}, "notes": "wrong shape"}', 0),
+    ("bad_entries", _answer(assets=[
+        "CAR",
+        {"name": 5},
+        {"confidence": 0.9},
+        {"name": "car", "confidence": "high", "quantity": "two", "extra": ["x"]},
+        {"name": "smart tv", "confidence": 1.7, "quantity": 0, "extra": {"size": 55, "rooms": ["a"]}},
+        {"name": "AC", "confidence": None, "quantity": -3},
+    ]), 3),
+    ("long_notes", LONG, 3),
+    ("many_assets", MANY, 40),
+    ("empty", "", None),
+    ("whitespace", "   \n ", None),
+    ("refusal", "I'm sorry, I can't help with identifying items in these images.", None),
+    ("truncated_before_assets", '```json\n{\n  "assets": [\n    {"name": "AIR_CONDI', None),
+    ("single_quotes", "{'assets': [{'name': 'CAR', 'confidence': 0.9}]}", None),
+]
@@ -0,0 +1,93 @@
+# benchmarks/output_mode_bench.py
+"""
+Parse failures and token cost per GEMINI_OUTPUT_MODE against the fake
+Gemini backend.
+
+freeform calls draw their answer from --outputs (the shapes free-form
+prompts produce: fences, prose, truncation, empty answers); schema calls
+always get the clean JSON constrained decoding returns. For each mode it
+reports how answers parsed (clean / repaired / truncated / invalid /
+empty), failed extractions (HTTP 500, i.e. a paid call wasted) and
+prompt / output tokens per call. Gemini bills the response schema as prompt tokens, which the
+fake does not see, so its estimated size is added for schema mode.
+
+Finally it runs schema mode against a fake without response-schema support
+to show the fallback: one rejected call, then free-form.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.output_mode_bench
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from collections import Counter
+
+from .extraction_bench import _household
+from .fake_gemini import FakeGenerativeModel, install
+
+# A free-form answer mix with a few percent of each failure shape
+DEFAULT_OUTPUTS = "clean=0.86,fenced=0.05,prose=0.04,malformed=0.03,empty=0.02"
+
+
+async def run(mode: str, calls: int, model: FakeGenerativeModel) -> None:
+    from fastapi import HTTPException
+
+    from app.config import get_settings
+    from app.schemas import LocationContext
+    from app.services.reasoning_engine import extract_lifestyle_signals_from_images
+    from app.services.response_schema import signals_response_schema
+    from app.telemetry import MODEL_OUTPUT
+
+    get_settings().gemini_output_mode = mode
+    location = LocationContext(state="Karnataka", city="Bengaluru")
+    before = dict(MODEL_OUTPUT._values)
+    start_calls, prompt, output = model.calls, model.prompt_tokens, model.candidates_tokens
+    errors: Counter = Counter()
+    for i in range(calls):
+        try:
+            await extract_lifestyle_signals_from_images(_household(1, seed=i), location)
+        except HTTPException as e:
+            errors[e.status_code] += 1
+
+    outcomes = {
+        f"{m}/{outcome}": int(total - before.get((m, outcome), 0))
+        for (m, outcome), total in MODEL_OUTPUT._values.items()
+        if total - before.get((m, outcome), 0)
+    }
+    made = model.calls - start_calls
+    schema_calls = mode == "schema" and model.structured_output
+    schema_tokens = len(json.dumps(signals_response_schema())) // 4 if schema_calls else 0
+    print(
+        f"{mode:9s} {made:4d} model calls  failed extractions {sum(errors.values()):3d} "
+        f"({sum(errors.values()) / calls:5.1%})  prompt {(model.prompt_tokens - prompt) / made + schema_tokens:5.0f} "
+        f"+ output {(model.candidates_tokens - output) / made:4.0f} tokens/call"
+    )
+    print(f"          parse outcomes {outcomes}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--outputs", default=DEFAULT_OUTPUTS, help="free-form answer mix (see fake_gemini)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+    model = install(FakeGenerativeModel(latency_s=0.0, outputs=args.outputs))
+    from app.services.vertex_client import ensure_ready
+
+    ensure_ready()
+
+    for mode in ("freeform", "schema"):
+        await run(mode, args.calls, model)
+
+    print("schema mode, model without response-schema support:")
+    legacy = install(FakeGenerativeModel(latency_s=0.0, outputs=args.outputs, structured_output=False))
+    await run("schema", 20, legacy)
+    print(f"          fake outputs {dict(legacy.outputs)}, rejected calls {legacy.failures}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
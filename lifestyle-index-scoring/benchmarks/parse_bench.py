@@ -0,0 +1,150 @@
+# benchmarks/parse_bench.py
+"""
+Correctness, fuzzing and speed of Gemini answer parsing
+(reasoning_engine.parse_gemini_response).
+
+1. corpus: every case in benchmarks.model_outputs must yield its expected
+   asset count (or a 500). Exits 1 on a mismatch.
+2. fuzz: random truncations, deletions, insertions of JSON punctuation and
+   duplications of corpus answers. Parsing may only ever raise
+   HTTPException, never anything else.
+3. speed: microseconds per parse against the previous implementation
+   (strip / splitlines / join / find / rfind, json.loads, one validated
+   DetectedAsset per entry), reproduced below as `legacy_parse`.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.parse_bench [--fuzz 20000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from collections import Counter
+from types import SimpleNamespace
+
+from .model_outputs import CASES
+
+_PUNCTUATION = '{}[],:"\\ '
+
+
+def legacy_parse(text: str):
+    from app.schemas import DetectedAsset, GeminiRawSignals
+
+    txt = text.strip()
+    if txt.startswith("```"):
+        lines = txt.splitlines()
+        if lines and lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].startswith("```"):
+            lines = lines[:-1]
+        txt = "\n".join(lines).strip()
+        if txt.lower().startswith("json"):
+            txt = txt[4:].strip()
+    if "{" in txt and "}" in txt:
+        start, end = txt.find("{"), txt.rfind("}")
+        if end > start:
+            txt = txt[start : end + 1].strip()
+    raw = json.loads(txt)
+    assets = []
+    for a in raw.get("assets", []) or []:
+        try:
+            assets.append(
+                DetectedAsset(
+                    name=a.get("name", "").strip().upper().replace(" ", "_"),
+                    confidence=max(0.0, min(1.0, float(a.get("confidence", 0.0)))),
+                    quantity=max(1, int(a.get("quantity", 1))),
+                    extra=a.get("extra", {}) or {},
+                )
+            )
+        except Exception:
+            continue
+    return GeminiRawSignals(assets=assets, notes=raw.get("notes"))
+
+
+def _mutate(text: str, rng: random.Random) -> str:
+    if not text:
+        return text
+    i = rng.randrange(len(text))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return text[:i]
+    if kind == 1:
+        return text[:i] + text[i + rng.randint(1, 20) :]
+    if kind == 2:
+        return text[:i] + rng.choice(_PUNCTUATION) + text[i:]
+    j = min(len(text), i + rng.randint(1, 40))
+    return text[:j] + text[i:j] + text[j:]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=20000, help="fuzzed answers to parse")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from fastapi import HTTPException
+
+    from app.logger import logger
+    from app.schemas import LocationContext
+    from app.services.model_json import _loader
+    from app.services.reasoning_engine import parse_gemini_response
+
+    logger.setLevel("CRITICAL")
+    location = LocationContext(state="Karnataka")
+
+    def parse(text: str):
+        return parse_gemini_response(SimpleNamespace(text=text), location)
+
+    print(f"JSON loader: {_loader()[0].__module__}")
+
+    # ---- corpus ----
+    failures = 0
+    for name, text, expected in CASES:
+        try:
+            got = len(parse(text).assets)
+        except HTTPException:
+            got = None
+        try:
+            legacy = len(legacy_parse(text).assets)
+        except Exception:
+            legacy = None
+        ok = got == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:24s} assets {str(got):>4s} (expected {str(expected):>4s}, previously {str(legacy):>4s})")
+
+    # ---- fuzz ----
+    rng = random.Random(args.seed)
+    outcomes: Counter = Counter()
+    texts = [text for _, text, _ in CASES if text]
+    for _ in range(args.fuzz):
+        text = _mutate(rng.choice(texts), rng)
+        try:
+            parse(text)
+            outcomes["parsed"] += 1
+        except HTTPException:
+            outcomes["http_500"] += 1
+        except Exception as e:  # the parser must never crash
+            failures += 1
+            outcomes[type(e).__name__] += 1
+            if outcomes[type(e).__name__] == 1:
+                print(f"CRASH {type(e).__name__}: {e!r} on {text[:200]!r}")
+    print(f"fuzz: {args.fuzz} answers -> {dict(outcomes)}")
+
+    # ---- speed ----
+    for name in ("clean", "fenced", "prose_around", "long_notes", "many_assets", "truncated_many"):
+        text = next(t for n, t, _ in CASES if n == name)
+        new = min(timeit.repeat(lambda: parse(text), number=500, repeat=5)) / 500
+        try:
+            legacy_parse(text)
+            old = f"{min(timeit.repeat(lambda: legacy_parse(text), number=500, repeat=5)) / 500 * 1e6:7.1f} us"
+        except Exception:
+            old = "  error"
+        print(f"{name:16s} {len(text):6d} chars  now {new * 1e6:7.1f} us  previously {old}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
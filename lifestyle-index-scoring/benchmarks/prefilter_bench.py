@@ -0,0 +1,186 @@
+# benchmarks/prefilter_bench.py
+"""
+Local pre-filter: accuracy on a labelled corpus, share of remote model calls
+avoided, and per-image latency.
+
+The corpus is either a directory (--corpus DIR) laid out as
+
+    DIR/keep/*.jpg            household photos, must reach the model
+    DIR/skip/<reason>/*.jpg   blank / document / screenshot / ... uploads
+
+or, by default, a synthetic one: camera-like household frames (shapes
+under uneven light, texture, sensor noise, 1600x1200 JPEG; dim and small
+ones too) plus lens-cap, pocket and overexposed
+shots, printed documents and app screenshots. Synthetic numbers show the
+cost and that the thresholds leave photos alone; the real skip rate has to
+be measured on a labelled sample of production uploads.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.prefilter_bench [--corpus DIR]
+"""
+
+import argparse
+import io
+import os
+import random
+import time
+from collections import Counter
+from typing import List, Tuple
+
+from .load_test import percentile
+
+Sample = Tuple[bytes, str]  # (image, label: "keep" or the expected skip reason)
+
+
+def _jpeg(img) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=88)
+    return buf.getvalue()
+
+
+def _photo(rng: random.Random, size=(1600, 1200), dim: float = 1.0) -> bytes:
+    """
+    A room-like frame: furniture-sized shapes under uneven lighting, surface
+    texture and sensor noise (the shading is what tells it from a flat UI).
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    w, h = size
+    noise = np.random.default_rng(rng.randrange(1 << 30))
+    img = Image.new("RGB", size, tuple(rng.randrange(60, 200) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(rng.randrange(6, 14)):
+        x, y = rng.randrange(w), rng.randrange(h)
+        box = [x, y, x + rng.randrange(80, w // 2), y + rng.randrange(80, h // 2)]
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        (draw.rectangle if rng.random() < 0.6 else draw.ellipse)(box, fill=colour)
+    pixels = np.asarray(img, dtype=np.float32)
+
+    # Light falling off from a window / lamp somewhere in the frame
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+    lx, ly = rng.uniform(-0.2, 1.2) * w, rng.uniform(-0.2, 1.2) * h
+    falloff = np.hypot(xs - lx, ys - ly) / np.hypot(w, h)
+    pixels *= (1.15 - 0.7 * falloff)[..., None] * dim
+    # Surface texture (fabric, wood grain, plaster) at a few pixels' scale
+    texture = Image.fromarray(noise.normal(128, 40, (h // 8, w // 8)).clip(0, 255).astype(np.uint8))
+    pixels += (np.asarray(texture.resize(size, Image.BICUBIC), dtype=np.float32)[..., None] - 128) * 0.25
+    pixels += noise.normal(0, 4, pixels.shape)
+    return _jpeg(Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)))
+
+
+def _blank(rng: random.Random) -> bytes:
+    import numpy as np
+    from PIL import Image
+
+    level = rng.choice([rng.randrange(0, 12), rng.randrange(250, 256), rng.randrange(60, 200)])
+    pixels = np.full((1200, 1600, 3), level, dtype=np.float32)
+    pixels += np.random.default_rng(rng.randrange(1 << 30)).normal(0, 2, pixels.shape)
+    return _jpeg(Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)))
+
+
+def _document(rng: random.Random) -> bytes:
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (1240, 1754), (250, 250, 248))
+    draw = ImageDraw.Draw(img)
+    y = 120
+    while y < 1650:
+        x = 100
+        while x < 1100:
+            word = rng.randrange(30, 140)
+            draw.rectangle([x, y, min(x + word, 1140), y + 14], fill=(30, 30, 30))
+            x += word + 18
+        y += rng.choice([34, 34, 34, 70])
+    return _jpeg(img)
+
+
+def _screenshot(rng: random.Random) -> bytes:
+    from PIL import Image, ImageDraw
+
+    palette = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(4)]
+    img = Image.new("RGB", (1080, 2340), palette[0])
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, 1080, 220], fill=palette[1])
+    y = 300
+    while y < 2200:
+        draw.rectangle([40, y, 1040, y + 180], fill=palette[2])
+        draw.rectangle([80, y + 40, 80 + rng.randrange(200, 800), y + 70], fill=palette[3])
+        y += 220
+    return _jpeg(img)
+
+
+def synthetic_corpus(households: int, skips: int, seed: int = 0) -> List[Sample]:
+    rng = random.Random(seed)
+    samples: List[Sample] = [(_photo(rng), "keep") for _ in range(households)]
+    # Dim evening shots and small uploads must stay too
+    samples += [(_photo(rng, dim=0.35), "keep") for _ in range(households // 5)]
+    samples += [(_photo(rng, size=(480, 360)), "keep") for _ in range(households // 5)]
+    for make, reason in ((_blank, "blank"), (_document, "document"), (_screenshot, "screenshot")):
+        samples += [(make(rng), reason) for _ in range(skips)]
+    rng.shuffle(samples)
+    return samples
+
+
+def load_corpus(root: str) -> List[Sample]:
+    samples: List[Sample] = []
+    for dirpath, _, files in os.walk(root):
+        rel = os.path.relpath(dirpath, root).split(os.sep)
+        label = "keep" if rel[0] == "keep" else rel[1] if rel[0] == "skip" and len(rel) > 1 else None
+        if label is None:
+            continue
+        for name in sorted(files):
+            with open(os.path.join(dirpath, name), "rb") as f:
+                samples.append((f.read(), label))
+    if not samples:
+        raise SystemExit(f"No images under {root}/keep or {root}/skip/<reason>")
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="labelled directory (keep/, skip/<reason>/)")
+    parser.add_argument("--households", type=int, default=200, help="synthetic household photos")
+    parser.add_argument("--skips", type=int, default=40, help="synthetic uploads per skip reason")
+    parser.add_argument("--repeat", type=int, default=3, help="timing passes over the corpus")
+    args = parser.parse_args()
+
+    from app.services.image_prefilter import prefilter_images
+
+    samples = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.households, args.skips)
+    prefilter_images([samples[0][0]])  # warm up imports and the classifier
+
+    timings: List[float] = []
+    verdicts: List[str] = []
+    for rep in range(args.repeat):
+        for data, _ in samples:
+            start = time.perf_counter()
+            result = prefilter_images([data])
+            timings.append(time.perf_counter() - start)
+            if rep == 0:
+                verdicts.append(result.skipped[0].reason if result.skipped else "keep")
+
+    confusion = Counter(zip((label for _, label in samples), verdicts))
+    keep_total = sum(1 for _, label in samples if label == "keep")
+    skip_total = len(samples) - keep_total
+    wrongly_skipped = sum(n for (label, got), n in confusion.items() if label == "keep" and got != "keep")
+    caught = sum(n for (label, got), n in confusion.items() if label != "keep" and got != "keep")
+    skipped = sum(1 for v in verdicts if v != "keep")
+
+    timings.sort()
+    print(f"corpus: {len(samples)} images ({keep_total} household, {skip_total} to skip)")
+    for (label, got), n in sorted(confusion.items()):
+        print(f"  {label:12s} -> {got:12s} {n:5d}")
+    print(
+        f"non-household caught  {caught}/{skip_total} ({caught / max(1, skip_total):.1%})   "
+        f"household photos wrongly skipped  {wrongly_skipped}/{keep_total}"
+    )
+    print(f"remote model calls avoided  {skipped}/{len(samples)} images ({skipped / len(samples):.1%})")
+    print(
+        f"latency per image  p50 {percentile(timings, 50) * 1000:5.1f} ms  "
+        f"p99 {percentile(timings, 99) * 1000:5.1f} ms  max {timings[-1] * 1000:5.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
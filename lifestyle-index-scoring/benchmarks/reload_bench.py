@@ -0,0 +1,150 @@
+# benchmarks/reload_bench.py
+"""
+Cost of hot-reloading the scoring config, and its effect on live scoring.
+
+  - load:  read + validate + compile a config file (what a reload does
+           off the event loop)
+  - swap:  publishing the compiled table (what readers can race with)
+  - live:  score_lifestyle latency from scoring threads, without and with a
+           reload every --interval-ms alternating between two versions.
+           Every score is checked against the version in its breakdown, so
+           a request that mixed two tables would be caught.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.reload_bench
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import timeit
+from typing import Dict, List
+
+from app.location_config import STATE_PROFILES
+from app.schemas import DetectedAsset, GeminiRawSignals, LocationContext
+from app.scoring_config import ASSET_WEIGHTS
+from app.scoring_tables import (
+    get_scoring_table,
+    load_scoring_table,
+    reload_scoring_table,
+    swap_scoring_table,
+)
+from app.services.scoring_engine import score_lifestyle
+
+from .scoring_bench import HOUSEHOLD, STATE
+
+
+def write_config(directory: str, version: str, scale: float) -> str:
+    weights = copy.deepcopy(ASSET_WEIGHTS)
+    for w in weights.values():
+        w["base"] *= scale
+    path = os.path.join(directory, f"scoring-{version}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": version, "asset_weights": weights, "state_profiles": STATE_PROFILES}, f
+        )
+    return path
+
+
+def pct(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def live(
+    seconds: float,
+    threads: int,
+    reload_paths: List[str],
+    interval_ms: float,
+    expected: Dict[str, float],
+) -> Dict[str, float]:
+    signals = GeminiRawSignals(
+        assets=[DetectedAsset(name=n, quantity=q, confidence=c) for n, q, c in HOUSEHOLD]
+    )
+    location = LocationContext(state=STATE)
+    stop = threading.Event()
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    mismatches = [0] * threads
+
+    def worker(i: int) -> None:
+        out = latencies[i]
+        while not stop.is_set():
+            start = time.perf_counter()
+            score, breakdown = score_lifestyle(signals, location)
+            out.append(time.perf_counter() - start)
+            if abs(score - expected[breakdown.scoring_version]) > 1e-9:
+                mismatches[i] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+
+    reloads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if reload_paths:
+            reload_scoring_table(reload_paths[reloads % len(reload_paths)])
+            reloads += 1
+            time.sleep(interval_ms / 1000)
+        else:
+            time.sleep(0.05)
+    stop.set()
+    for t in workers:
+        t.join()
+
+    samples = [x for per_thread in latencies for x in per_thread]
+    return {
+        "scores": len(samples),
+        "reloads": reloads,
+        "mismatches": sum(mismatches),
+        "p50_us": round(pct(samples, 0.50) * 1e6, 2),
+        "p99_us": round(pct(samples, 0.99) * 1e6, 2),
+        "max_us": round(max(samples) * 1e6, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_a = write_config(tmp, "bench-a", 1.0)
+        path_b = write_config(tmp, "bench-b", 1.25)
+
+        loads = timeit.repeat(lambda: load_scoring_table(path_a), number=1, repeat=50)
+        print(f"load+compile    median {statistics.median(loads) * 1e3:7.3f} ms"
+              f"   max {max(loads) * 1e3:7.3f} ms")
+
+        table = load_scoring_table(path_a)
+        number = 200_000
+        swap = min(timeit.repeat(lambda: swap_scoring_table(table), number=number, repeat=5))
+        print(f"swap            {swap / number * 1e6:7.3f} us")
+
+        location = LocationContext(state=STATE)
+        signals = GeminiRawSignals(
+            assets=[DetectedAsset(name=n, quantity=q, confidence=c) for n, q, c in HOUSEHOLD]
+        )
+        expected = {}
+        for path in (path_a, path_b):
+            reload_scoring_table(path)
+            score, breakdown = score_lifestyle(signals, location)
+            expected[breakdown.scoring_version] = score
+        assert get_scoring_table().version == "bench-b"
+
+        print("live, no reloads   ", live(args.seconds, args.threads, [], 0, expected))
+        print(
+            f"live, reload/{args.interval_ms:g}ms",
+            live(args.seconds, args.threads, [path_a, path_b], args.interval_ms, expected),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/rescore_bench.py
+"""
+Full-book what-if rescoring throughput.
+
+Fills a throwaway signal store with synthetic households (random assets
+from ASSET_WEIGHTS, random states) and times rescore_store against a
+candidate that bumps every base weight by 10%. Also times the vectorized
+kernel on its own and checks it against the scalar score_lifestyle.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.rescore_bench --households 1000000
+"""
+
+import argparse
+import copy
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from app.location_config import STATE_PROFILES
+from app.schemas import DetectedAsset, GeminiRawSignals, LocationContext
+from app.scoring_config import ASSET_WEIGHTS
+from app.scoring_tables import get_scoring_table
+from app.services.rescoring import (
+    load_columns,
+    location_contexts,
+    make_candidate,
+    rescore_store,
+    score_columns,
+)
+from app.services.scoring_engine import score_lifestyle
+from app.services.scoring_kernel import compile_weights
+from app.services.signal_store import SignalStore
+
+
+def populate(path: str, households: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    names = list(ASSET_WEIGHTS) + ["UNKNOWN_ASSET"]
+    states = [s.title() for s in STATE_PROFILES] + ["Bangalore"]
+    # (state, city, pincode) with finer profiles than the state alone
+    finer = [
+        ("Karnataka", "Bengaluru", "560034"),
+        ("Karnataka", "Mysore", None),
+        ("Karnataka", None, "581301"),
+        ("Maharashtra", "Pune", "411014"),
+        ("Tamil Nadu", "Ooty", None),
+    ]
+
+    def location():
+        if rng.random() < 0.3:
+            return rng.choice(finer)
+        return rng.choice(states), None, None
+
+    SignalStore(path)  # create schema
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO signals (signal_id, created_at, state, city, pincode, signals_json)"
+            " VALUES (?, 0, ?, ?, ?, '{}')",
+            ((i, *location()) for i in range(1, households + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO signal_assets (signal_id, name, quantity, confidence) VALUES (?, ?, ?, ?)",
+            (
+                (i, name, rng.randint(1, 3), round(rng.random(), 2))
+                for i in range(1, households + 1)
+                for name in rng.sample(names, rng.randint(0, 8))
+            ),
+        )
+    conn.close()
+
+
+def verify_against_scalar(cols, vectorized: np.ndarray, sample: int = 5000) -> float:
+    """Max |vectorized - score_lifestyle| over the first `sample` households."""
+    by_household = {}
+    for h, name, q, c in zip(cols.household.tolist(), cols.names, cols.quantity, cols.confidence):
+        if h < sample:
+            by_household.setdefault(h, []).append(
+                DetectedAsset(name=name, quantity=int(q), confidence=float(c))
+            )
+
+    worst = 0.0
+    for h in range(min(sample, len(cols.states))):
+        scalar, _ = score_lifestyle(
+            GeminiRawSignals(assets=by_household.get(h, [])),
+            LocationContext(state=cols.states[h], city=cols.cities[h], pincode=cols.pincodes[h]),
+        )
+        worst = max(worst, abs(scalar - float(vectorized[h])))
+    return worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--households", type=int, default=200_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "rescore_bench.sqlite3")
+    start = time.perf_counter()
+    populate(path, args.households)
+    print(f"populated {args.households} households in {time.perf_counter() - start:.1f}s")
+
+    weights = copy.deepcopy(ASSET_WEIGHTS)
+    for w in weights.values():
+        w["base"] *= 1.1
+    candidate = make_candidate(asset_weights=weights, version="base+10%")
+
+    store = SignalStore(path)
+    summary = rescore_store(store, candidate)
+    print(summary.json(indent=2))
+    print(f"end-to-end: {args.households / summary.elapsed_seconds:,.0f} households/s")
+
+    cols = load_columns(store)
+    compiled = compile_weights()
+    start = time.perf_counter()
+    vectorized = score_columns(cols, compiled, location_contexts(cols, get_scoring_table()))
+    kernel_s = time.perf_counter() - start
+    print(f"kernel only: {kernel_s * 1000:.1f} ms ({args.households / kernel_s:,.0f} households/s)")
+    print(f"max |kernel - scalar| on sample: {verify_against_scalar(cols, vectorized):.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/response_bench.py
+"""
+Payload size and build / serialization time of the scoring response per
+view (compact, full, debug), against the previous path: build the full
+LifestyleScoreResponse and serialize it with pydantic's `.json()`.
+
+A household with --assets detected assets (each with a few `extra`
+attributes) and a paragraph of model notes. "build" is
+build_score_response (scoring included), "serialize" is render_score;
+both are measured with orjson and with the stdlib fallback used when
+orjson is not installed.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.response_bench
+"""
+
+import argparse
+import sys
+import timeit
+from typing import Callable
+
+from app import responses
+from app.schemas import DetectedAsset, GeminiRawSignals, LocationContext, TokenUsage
+from app.services.scoring_pipeline import build_score_response
+
+_ASSET_NAMES = [
+    "AIR_CONDITIONER", "REFRIGERATOR", "SMART_TV", "WASHING_MACHINE", "CAR", "TWO_WHEELER",
+    "MODULAR_KITCHEN", "LAPTOP", "MICROWAVE", "WATER_PURIFIER", "SOFA", "CEILING_FAN",
+]
+
+
+def _household(count: int) -> GeminiRawSignals:
+    assets = [
+        DetectedAsset(
+            name=_ASSET_NAMES[i % len(_ASSET_NAMES)],
+            confidence=0.9 - i * 0.02,
+            quantity=1 + i % 3,
+            extra={"brand": "LG", "room_type": "living room", "condition": "good"},
+        )
+        for i in range(count)
+    ]
+    notes = "Wall-mounted split AC above the window; double-door refrigerator in the kitchen. " * 4
+    return GeminiRawSignals(assets=assets, notes=notes)
+
+
+def _us(fn: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def run(label: str, raw: GeminiRawSignals, location: LocationContext, number: int) -> None:
+    print(f"{label}:")
+    full = build_score_response(raw, location)
+    build = _us(lambda: build_score_response(raw, location), number)
+    legacy = _us(full.json, number)
+    print(
+        f"  {'before (.json())':18s} {len(full.json().encode()):6d} bytes   build {build:6.1f} us   "
+        f"serialize {legacy:6.1f} us   total {build + legacy:6.1f} us"
+    )
+    for view in responses.RESPONSE_VIEWS:
+        fields = responses.select_fields(view)
+        response = build_score_response(raw, location, fields=fields)
+        if fields is not None and "token_usage" in fields:
+            response.token_usage = TokenUsage(model_calls=1, prompt_tokens=1300, output_tokens=180)
+        body = responses.render_score(response, fields)
+        build = _us(lambda: build_score_response(raw, location, fields=fields), number)
+        serialize = _us(lambda: responses.render_score(response, fields), number)
+        print(
+            f"  {view:18s} {len(body):6d} bytes   build {build:6.1f} us   "
+            f"serialize {serialize:6.1f} us   total {build + serialize:6.1f} us"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, default=12)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    raw = _household(args.assets)
+    location = LocationContext(state="Karnataka", city="Bengaluru", pincode="560001")
+    print(f"household with {args.assets} assets")
+    run("orjson", raw, location, args.number)
+
+    # Same code path as a deployment without orjson installed
+    sys.modules["orjson"] = None
+    responses._dumper.cache_clear()
+    run("stdlib json (orjson not installed)", raw, location, args.number)
+
+
+if __name__ == "__main__":
+    main()
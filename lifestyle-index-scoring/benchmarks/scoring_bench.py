@@ -0,0 +1,77 @@
+# benchmarks/scoring_bench.py
+"""
+Per-call cost of the online scoring core: the original nested-dict walk
+(get_state_profile + _compute_asset_score_for_state per asset) vs the
+precompiled ScoringTable used by score_lifestyle.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.scoring_bench
+"""
+
+import argparse
+import timeit
+
+from app.location_config import get_state_profile
+from app.schemas import DetectedAsset, GeminiRawSignals, LocationContext
+from app.scoring_tables import get_scoring_table
+from app.services.scoring_engine import (
+    _compute_asset_score_for_state,
+    compute_raw_score,
+    score_lifestyle,
+)
+
+HOUSEHOLD = [
+    ("AIR_CONDITIONER", 2, 0.93),
+    ("REFRIGERATOR", 1, 0.88),
+    ("SMART_TV", 1, 0.8),
+    ("WASHING_MACHINE", 1, 0.75),
+    ("CAR", 1, 0.6),
+    ("TWO_WHEELER", 2, 0.7),
+    ("MODULAR_KITCHEN", 1, 0.5),
+    ("CEILING_FAN", 4, 0.9),  # unknown asset
+]
+STATE = "Karnataka"
+
+
+def dict_walk() -> float:
+    profile = get_state_profile(STATE)
+    total = 0.0
+    for name, quantity, confidence in HOUSEHOLD:
+        contrib = _compute_asset_score_for_state(
+            name, quantity, confidence, profile["metro_flag"], profile["climate"]
+        )
+        if contrib > 0:
+            total += contrib
+    return total
+
+
+def table_lookup() -> float:
+    table = get_scoring_table()
+    state = table.lookup_state(STATE)
+    total, _ = compute_raw_score(HOUSEHOLD, state.context, table)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    assert abs(dict_walk() - table_lookup()) < 1e-9
+
+    signals = GeminiRawSignals(
+        assets=[DetectedAsset(name=n, quantity=q, confidence=c) for n, q, c in HOUSEHOLD]
+    )
+    location = LocationContext(state=STATE)
+
+    for label, fn in (
+        ("dict_walk", dict_walk),
+        ("table_lookup", table_lookup),
+        ("score_lifestyle", lambda: score_lifestyle(signals, location)),
+    ):
+        best = min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+        print(f"{label:16s} {best * 1e6:7.3f} us/call ({len(HOUSEHOLD)} assets)")
+
+
+if __name__ == "__main__":
+    main()
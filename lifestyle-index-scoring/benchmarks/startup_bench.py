@@ -0,0 +1,140 @@
+# benchmarks/startup_bench.py
+"""
+Import time and cold start of the service, each in a fresh interpreter.
+
+- import: wall time of `import <module>` (plus whether the Vertex AI SDK got
+  pulled in), for the API entry point and the pure scoring modules.
+- cold start: `uvicorn app.main:app` from process launch until GET / answers,
+  and until the first POST /score/lifestyle would find the model ready
+  (health reports vertex_client.sdk_loaded), per VERTEX_INIT_MODE.
+
+For a per-module breakdown use:
+    GCP_PROJECT_ID=local python -X importtime -c "import app.main" 2>&1 | sort -t'|' -k2 -n | tail
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.startup_bench
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .load_test import PROJECT_DIR
+
+MODULES = (
+    "app.main",
+    "app.services.scoring_pipeline",
+    "app.services.scoring_engine",
+    "app.services.rescoring",
+    "app.rescore",
+)
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "vertexai": "vertexai" in sys.modules}}))
+"""
+
+
+def time_import(module: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_cold_start(env: dict, wait_for_model: bool = True, timeout_s: float = 60.0) -> dict:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_DIR,
+        env=env,
+    )
+    result = {"ready_s": None, "model_ready_s": None}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            while time.perf_counter() - start < timeout_s and proc.poll() is None:
+                try:
+                    resp = client.get("/")
+                except httpx.HTTPError:
+                    time.sleep(0.01)
+                    continue
+                now = time.perf_counter() - start
+                if result["ready_s"] is None:
+                    result["ready_s"] = round(now, 3)
+                    if not wait_for_model:
+                        break
+                vertex = resp.json().get("vertex_client", {})
+                # Older builds load the SDK before serving and do not report sdk_loaded
+                if vertex.get("sdk_loaded", True) and vertex.get("builds", 1):
+                    result["model_ready_s"] = round(now, 3)
+                    break
+                time.sleep(0.01)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["eager", "background", "lazy"])
+    args = parser.parse_args()
+
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    env.setdefault("GCP_PROJECT_ID", "local")
+
+    for module in MODULES:
+        runs = [time_import(module, env) for _ in range(args.repeat)]
+        if "error" in runs[0]:
+            print(f"import {module:32s} failed: {runs[0]['error']}")
+            continue
+        best = min(r["seconds"] for r in runs)
+        print(f"import {module:32s} {best * 1000:8.0f} ms  vertexai loaded: {runs[0]['vertexai']}")
+
+    offline = {k: v for k, v in env.items() if k != "GCP_PROJECT_ID"}
+    result = time_import("app.main", offline)
+    print(f"import app.main without GCP_PROJECT_ID: {'ok' if 'error' not in result else result['error']}")
+
+    for mode in args.modes:
+        # In lazy mode nothing builds the model until a scoring request arrives
+        runs = [
+            time_cold_start({**env, "VERTEX_INIT_MODE": mode}, wait_for_model=mode != "lazy")
+            for _ in range(args.repeat)
+        ]
+        ready = [r["ready_s"] for r in runs if r["ready_s"] is not None]
+        model_ready = [r["model_ready_s"] for r in runs if r["model_ready_s"] is not None]
+        print(
+            f"cold start {mode:10s} serving after {statistics.median(ready) if ready else float('nan'):6.2f} s, "
+            f"model ready after {statistics.median(model_ready) if model_ready else float('nan'):6.2f} s "
+            f"(median of {args.repeat})"
+        )
+
+
+if __name__ == "__main__":
+    main()
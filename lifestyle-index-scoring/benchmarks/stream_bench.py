@@ -0,0 +1,115 @@
+# benchmarks/stream_bench.py
+"""
+Time to first useful byte of POST /score/lifestyle/stream versus the
+buffered POST /score/lifestyle, over real HTTP (uvicorn + fake Gemini).
+
+For the stream it reports when the `accepted`, first `asset` and `final`
+events arrive; for the buffered endpoint, the full response time. Every
+request uses a fresh household so neither the result cache nor dedup
+short-circuits the model call.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.stream_bench --latency 2.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from .extraction_bench import _household
+from .load_test import PROJECT_DIR, _free_port, _wait_ready, percentile
+
+FORM = {"state": "Karnataka", "city": "Bengaluru"}
+
+
+def _files(images: List[bytes]) -> list:
+    return [("images", (f"img{i}.jpg", img, "image/jpeg")) for i, img in enumerate(images)]
+
+
+async def buffered_once(client: httpx.AsyncClient, images: List[bytes]) -> Dict[str, float]:
+    start = time.perf_counter()
+    resp = await client.post("/score/lifestyle", files=_files(images), data=FORM)
+    resp.raise_for_status()
+    return {"final": time.perf_counter() - start}
+
+
+async def stream_once(client: httpx.AsyncClient, images: List[bytes]) -> Dict[str, float]:
+    marks: Dict[str, float] = {}
+    start = time.perf_counter()
+    async with client.stream("POST", "/score/lifestyle/stream", files=_files(images), data=FORM) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line:
+                continue
+            event = json.loads(line)["event"]
+            if event == "error":
+                raise RuntimeError(line)
+            key = "first_asset" if event == "asset" else event
+            marks.setdefault(key, time.perf_counter() - start)
+    return marks
+
+
+def _summary(runs: List[Dict[str, float]], key: str) -> str:
+    values = sorted(r[key] for r in runs if key in r)
+    if not values:
+        return f"{key:12s}        -"
+    return f"{key:12s} p50 {statistics.median(values) * 1000:7.0f} ms  p95 {percentile(values, 95) * 1000:7.0f} ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=2.0, help="fake model call latency (s)")
+    parser.add_argument("--blocking", action="store_true", help="fake without generate_content_async")
+    args = parser.parse_args()
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "LOG_LEVEL": "WARNING",
+        "FAKE_GEMINI_LATENCY": str(args.latency),
+        "FAKE_GEMINI_BLOCKING": "1" if args.blocking else "",
+    }
+    env.setdefault("GCP_PROJECT_ID", "local")
+    env.setdefault("PREFILTER_MODE", "off")  # the flat test images would be skipped as blank
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.fake_app:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=PROJECT_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await _wait_ready(base_url, proc)
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            await buffered_once(client, _household(args.images, seed=255))  # warm up
+            buffered = [await buffered_once(client, _household(args.images, seed=i)) for i in range(args.requests)]
+            streamed = [
+                await stream_once(client, _household(args.images, seed=100 + i)) for i in range(args.requests)
+            ]
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    print(f"fake latency {args.latency:.1f} s, {args.images} images, {args.requests} requests each")
+    print("buffered  " + _summary(buffered, "final"))
+    for key in ("accepted", "first_asset", "final"):
+        print("stream    " + _summary(streamed, key))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+# benchmarks/token_bench.py
+"""
+Prompt token budget per household, with and without the Vertex AI context
+cache for the system instruction (GEMINI_CONTEXT_CACHE_ENABLED), against
+the fake Gemini backend.
+
+The fake counts tokens like Gemini's usage_metadata (instruction + prompt
+text at ~4 characters per token, 258 per image tile; the instruction as
+cached tokens when the model came from a context cache) and adds
+--per-prompt-token-latency for every uncached prompt token, a stand-in for
+prefill time. For each household size it reports the per-request
+TokenUsage the service records, "billable" prompt tokens with cached
+tokens weighted by --cached-price-ratio (Vertex bills cached input at a
+fraction of the normal rate) and the median extraction latency.
+
+Real Vertex AI only caches content of at least a minimum size (thousands
+of tokens), above this service's instruction; the bench lowers
+GEMINI_CONTEXT_CACHE_MIN_TOKENS to 0 so the fake caches it anyway. To
+check against Vertex AI itself (needs credentials, not run by this bench):
+
+    GEMINI_CONTEXT_CACHE_ENABLED=1 RESPONSE_INCLUDE_TOKEN_USAGE=1 \\
+        uvicorn app.main:app
+    curl -F images=@room.jpg -F state=Karnataka localhost:8000/score/lifestyle
+
+and compare `token_usage` (cached_tokens) and GET / -> vertex_client
+(context_caches_created) with the cache off. With an instruction below the
+minimum the log says it is not cached and the numbers match the uncached run.
+
+Usage:
+    GCP_PROJECT_ID=local python -m benchmarks.token_bench
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+from .extraction_bench import _household
+from .fake_gemini import FakeGenerativeModel, install
+
+
+async def run(label: str, cache: bool, sizes: List[int], rounds: int, ratio: float) -> None:
+    from app.config import get_settings
+    from app.schemas import LocationContext, TokenUsage
+    from app.services import vertex_client
+    from app.services.reasoning_engine import (
+        current_system_instruction,
+        extract_lifestyle_signals_from_images,
+    )
+
+    settings = get_settings()
+    settings.gemini_context_cache_enabled = cache
+    vertex_client.vision_models.invalidate()
+    vertex_client.ensure_ready(current_system_instruction())
+    location = LocationContext(state="Karnataka", city="Bengaluru")
+
+    for size in sizes:
+        total = TokenUsage()
+        latencies = []
+        for r in range(rounds):
+            usage = TokenUsage()
+            start = time.perf_counter()
+            await extract_lifestyle_signals_from_images(_household(size, seed=r), location, usage)
+            latencies.append(time.perf_counter() - start)
+            for field in total.__fields__:
+                setattr(total, field, getattr(total, field) + getattr(usage, field))
+        prompt = total.prompt_tokens / rounds
+        cached = total.cached_tokens / rounds
+        billable = prompt - cached + cached * ratio
+        print(
+            f"{label:13s} {size:3d} images  prompt {prompt:6.0f} (image {total.image_tokens / rounds:5.0f}, "
+            f"cached {cached:4.0f})  billable {billable:6.0f}  output {total.output_tokens / rounds:3.0f}  "
+            f"p50 {statistics.median(latencies) * 1000:6.1f} ms"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,3,10", help="images per household")
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake base latency (s)")
+    parser.add_argument("--per-prompt-token-latency", type=float, default=0.0002)
+    parser.add_argument("--cached-price-ratio", type=float, default=0.25)
+    parser.add_argument("--output-mode", default="schema", choices=("schema", "freeform"))
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESULT_CACHE_BACKEND", "none")
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+    os.environ["GEMINI_CONTEXT_CACHE_MIN_TOKENS"] = "0"
+    os.environ["GEMINI_OUTPUT_MODE"] = args.output_mode
+    model = install(
+        FakeGenerativeModel(latency_s=args.latency, per_prompt_token_s=args.per_prompt_token_latency)
+    )
+    from app.services import vertex_client
+    from app.services.reasoning_engine import current_system_instruction
+
+    instruction = current_system_instruction()
+    print(
+        f"{args.output_mode} mode, system instruction ~{vertex_client.estimate_text_tokens(instruction)} tokens"
+    )
+    sizes = [int(s) for s in args.sizes.split(",")]
+    for label, cache in (("no cache", False), ("context cache", True)):
+        await run(label, cache, sizes, args.rounds, args.cached_price_ratio)
+    print(f"fake backend: {model.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+# tests/conftest.py
+"""
+Shared setup: a local-only environment (no GCP project, no result cache,
+no signal store) and the fake Gemini backend from benchmarks.fake_gemini.
+Settings are read once per process, so the environment is set before any
+app module is imported.
+"""
+
+import asyncio
+import os
+import random
+
+os.environ.setdefault("GCP_PROJECT_ID", "local")
+os.environ["RESULT_CACHE_BACKEND"] = "none"
+os.environ["SIGNAL_STORE_PATH"] = ""
+
+import httpx
+import pytest
+
+from benchmarks.fake_gemini import FakeGenerativeModel, install
+from benchmarks.prefilter_bench import _blank, _document, _photo
+
+
+@pytest.fixture
+def fake_gemini():
+    """Install a fresh zero-latency fake model; call it with kwargs to swap in another."""
+
+    def make(**kwargs) -> FakeGenerativeModel:
+        kwargs.setdefault("latency_s", 0.0)
+        return install(FakeGenerativeModel(**kwargs))
+
+    make()
+    return make
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """`settings(name=value, ...)` overrides the cached Settings for one test."""
+    from app.config import get_settings
+
+    def override(**values) -> None:
+        for name, value in values.items():
+            monkeypatch.setattr(get_settings(), name, value)
+
+    return override
+
+
+@pytest.fixture
+def client(fake_gemini):
+    """
+    `async with client() as c:` an httpx.AsyncClient bound to the app in
+    process through httpx.ASGITransport (no server, no lifespan). For tests
+    that need several requests in one event loop.
+    """
+    from app.main import app
+
+    def make() -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    return make
+
+
+@pytest.fixture
+def api(client):
+    """Synchronous `api(method, path, **httpx_kwargs)`, one event loop per call."""
+
+    async def request(method: str, path: str, **kwargs) -> httpx.Response:
+        async with client() as c:
+            return await c.request(method, path, **kwargs)
+
+    return lambda method, path, **kwargs: asyncio.run(request(method, path, **kwargs))
+
+
+@pytest.fixture
+def upload():
+    """`files=upload(*images)` for the multipart `images` field."""
+
+    def files(*images: bytes):
+        return [("images", (f"img{i}.jpg", data, "image/jpeg")) for i, data in enumerate(images)]
+
+    return files
+
+
+@pytest.fixture
+def photo() -> bytes:
+    """A camera-like household frame, which the local pre-filter keeps."""
+    return _photo(random.Random(1), size=(640, 480))
+
+
+@pytest.fixture
+def blank() -> bytes:
+    return _blank(random.Random(2))
+
+
+@pytest.fixture
+def document() -> bytes:
+    return _document(random.Random(3))
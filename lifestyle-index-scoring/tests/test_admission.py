@@ -0,0 +1,232 @@
+# tests/test_admission.py
+
+import asyncio
+
+import pytest
+
+from app import admission
+from app.admission import (
+    BATCH,
+    DEFAULT_BUCKET,
+    INTERACTIVE,
+    AdmissionMiddleware,
+    MemoryRateLimiter,
+    ModelGate,
+    Overloaded,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# -----------------------------
+# GCRA
+# -----------------------------
+def test_gcra_allows_burst_then_paces():
+    clock = Clock()
+    limiter = MemoryRateLimiter(clock=clock)
+    # rate 2/s, burst 3: three pass at once, then one per 0.5s
+    assert [limiter.allow_now("k", 2.0, 3.0) for _ in range(3)] == [0.0] * 3
+    wait = limiter.allow_now("k", 2.0, 3.0)
+    assert wait == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.allow_now("k", 2.0, 3.0) == 0.0
+    assert limiter.allow_now("k", 2.0, 3.0) > 0
+
+
+def test_gcra_buckets_are_independent_and_refill():
+    clock = Clock()
+    limiter = MemoryRateLimiter(clock=clock)
+    while limiter.allow_now("a", 1.0, 1.0) == 0.0:
+        pass
+    assert limiter.allow_now("b", 1.0, 1.0) == 0.0
+    clock.now += 10
+    assert limiter.allow_now("a", 1.0, 1.0) == 0.0
+
+
+def test_rejected_request_does_not_consume_tokens():
+    clock = Clock()
+    limiter = MemoryRateLimiter(clock=clock)
+    limiter.allow_now("k", 1.0, 1.0)
+    limiter.allow_now("k", 1.0, 1.0)
+    first = limiter.allow_now("k", 1.0, 1.0)
+    assert limiter.allow_now("k", 1.0, 1.0) == pytest.approx(first)
+
+
+def test_full_buckets_are_pruned_past_max_keys(monkeypatch):
+    monkeypatch.setattr(MemoryRateLimiter, "MAX_KEYS", 3)
+    clock = Clock()
+    limiter = MemoryRateLimiter(clock)
+    for key in ("a", "b", "c"):
+        assert limiter.allow_now(key, rate=1.0, burst=1.0) == 0.0
+    clock.now += 10
+    assert limiter.allow_now("d", rate=1.0, burst=1.0) == 0.0
+    assert limiter.allow_now("e", rate=1.0, burst=1.0) == 0.0
+    assert len(limiter._tat) <= 3
+    assert limiter.allow_now("d", rate=1.0, burst=1.0) > 0  # still throttled
+
+
+# -----------------------------
+# ModelGate
+# -----------------------------
+def test_gate_serves_interactive_before_batch():
+    async def scenario():
+        gate = ModelGate(1, {INTERACTIVE: 5.0, BATCH: 5.0})
+        await gate.acquire(BATCH)  # holder
+        order = []
+
+        async def waiter(priority, name):
+            await gate.acquire(priority)
+            order.append(name)
+            gate.release(0.01)
+
+        tasks = [
+            asyncio.create_task(waiter(BATCH, "batch-1")),
+            asyncio.create_task(waiter(BATCH, "batch-2")),
+            asyncio.create_task(waiter(INTERACTIVE, "interactive")),
+        ]
+        await asyncio.sleep(0)
+        assert gate.stats()["waiting"] == {INTERACTIVE: 1, BATCH: 2}
+        gate.release(0.01)
+        await asyncio.gather(*tasks)
+        return order, gate.in_flight
+
+    order, in_flight = asyncio.run(scenario())
+    assert order == ["interactive", "batch-1", "batch-2"]
+    assert in_flight == 0
+
+
+def test_gate_sheds_when_expected_wait_exceeds_slo():
+    async def scenario():
+        gate = ModelGate(1, {INTERACTIVE: 0.5, BATCH: 60.0})
+        await gate.acquire(INTERACTIVE)
+        gate.release(2.0)  # calls take ~2s
+        await gate.acquire(INTERACTIVE)
+        with pytest.raises(Overloaded) as err:
+            await gate.acquire(INTERACTIVE)
+        assert err.value.priority == INTERACTIVE
+        # Batch tolerates the wait, so it queues instead
+        batch = asyncio.create_task(gate.acquire(BATCH))
+        await asyncio.sleep(0)
+        assert not batch.done()
+        gate.release(2.0)
+        await batch
+        return gate.shed
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_gate_sheds_waiters_that_time_out():
+    async def scenario():
+        gate = ModelGate(1, {INTERACTIVE: 0.05, BATCH: 0.05})
+        await gate.acquire(BATCH)
+        with pytest.raises(Overloaded):
+            await gate.acquire(INTERACTIVE)
+        gate.release(0.01)
+        return gate.in_flight, gate.stats()["waiting"]
+
+    assert asyncio.run(scenario()) == (0, {INTERACTIVE: 0, BATCH: 0})
+
+
+# -----------------------------
+# Middleware buckets
+# -----------------------------
+@pytest.fixture
+def middleware(settings):
+    settings(
+        admission_backend="memory",
+        admission_processes=1,
+        admission_rate_per_second=1.0,
+        admission_burst=2.0,
+        admission_tenant_rates={"registered": 5.0},
+    )
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return AdmissionMiddleware(app)
+
+
+def _status(mw, api_key=None) -> int:
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    scope = {"type": "http", "method": "POST", "path": "/score/lifestyle", "headers": headers}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(mw(scope, receive, send))
+    return sent[0]["status"]
+
+
+def test_registered_key_gets_its_own_bucket(middleware):
+    key, rate = middleware.tenants["registered"]
+    assert key != DEFAULT_BUCKET and "registered" not in key
+    assert rate == 5.0
+
+
+def test_unregistered_keys_share_the_default_bucket(middleware):
+    # burst 2 at 1/s: two requests pass, then the shared bucket is empty...
+    assert _status(middleware) == 200
+    assert _status(middleware, "fresh-key-1") == 200
+    # ...whichever new key the client invents
+    assert _status(middleware, "fresh-key-2") == 429
+    assert _status(middleware, "fresh-key-3") == 429
+    # The registered tenant is unaffected
+    assert _status(middleware, "registered") == 200
+
+
+def test_rejection_carries_retry_after(middleware):
+    _status(middleware)
+    _status(middleware)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": "POST", "path": "/score/lifestyle", "headers": []}
+    asyncio.run(middleware(scope, receive, send))
+    headers = dict(sent[0]["headers"])
+    assert sent[0]["status"] == 429
+    assert int(headers[b"retry-after"]) >= 1
+
+
+def test_priority_follows_path_and_header(middleware):
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(admission.priority_var.get())
+
+    middleware.app = app
+    for path, headers in (
+        ("/score/lifestyle", []),
+        ("/score/lifestyle", [(b"x-priority", b"batch")]),
+        ("/score/lifestyle/jobs", []),
+    ):
+        scope = {"type": "http", "method": "GET", "path": path, "headers": headers}
+        asyncio.run(middleware(scope, None, None))
+    assert seen == [INTERACTIVE, BATCH, BATCH]
+
+
+def test_shed_model_call_is_503_with_retry_after(api, monkeypatch, settings, photo, upload):
+    class SaturatedGate:
+        async def acquire(self, priority):
+            raise Overloaded(priority, retry_after=2.5)
+
+    settings(admission_max_model_calls=1)
+    monkeypatch.setattr(admission, "get_model_gate", SaturatedGate)
+    response = api("POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(photo))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,78 @@
+# tests/test_api.py
+
+import asyncio
+import time
+
+import pytest
+
+
+def test_health(api):
+    response = api("GET", "/")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+@pytest.mark.parametrize("native_async", [True, False], ids=["native", "thread"])
+def test_model_call_does_not_block_the_event_loop(
+    client, fake_gemini, photo, upload, native_async
+):
+    # The fake sleeps 0.3s per call: in generate_content_async, or blocking
+    # in generate_content, which must then run on a worker thread
+    fake_gemini(latency_s=0.3, native_async=native_async)
+
+    async def scenario():
+        async with client() as c:
+            score = asyncio.create_task(
+                c.post("/score/lifestyle", data={"state": "Goa"}, files=upload(photo))
+            )
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            health = await c.get("/")
+            probe_s = time.perf_counter() - started
+            in_flight = not score.done()
+            return health.status_code, probe_s, in_flight, (await score).status_code
+
+    health, probe_s, in_flight, scored = asyncio.run(scenario())
+    assert (health, in_flight, scored) == (200, True, 200)
+    assert probe_s < 0.15
+
+
+def test_concurrent_requests_overlap(client, fake_gemini, photo, upload):
+    fake_gemini(latency_s=0.2)
+
+    async def scenario():
+        async with client() as c:
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    c.post("/score/lifestyle", data={"state": "Goa"}, files=upload(photo))
+                    for _ in range(6)
+                )
+            )
+            return [r.status_code for r in responses], time.perf_counter() - started
+
+    statuses, elapsed = asyncio.run(scenario())
+    assert statuses == [200] * 6
+    assert elapsed < 6 * 0.2 / 2
+
+
+def test_score_full_response(api, photo, upload):
+    response = api(
+        "POST",
+        "/score/lifestyle",
+        data={"state": "Karnataka", "pincode": "560034"},
+        files=upload(photo),
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert 0 < body["lifestyle_index"] <= 100
+    assert body["persona_hint"]
+    assert {a["name"] for a in body["gemini_raw"]["assets"]} == {
+        "AIR_CONDITIONER",
+        "REFRIGERATOR",
+        "SMART_TV",
+    }
+    assert body["breakdown"]["location_source"] == "pincode"
+    assert body["breakdown"]["district"] == "Bengaluru Urban"
+    # Cross-request repeats are never reported back to the caller
+    assert "previously_seen_images" not in body
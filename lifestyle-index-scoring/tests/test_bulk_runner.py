@@ -0,0 +1,85 @@
+# tests/test_bulk_runner.py
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+from app.schemas import HouseholdManifestEntry
+from app.services import bulk_runner
+from app.services.bulk_runner import run_batch
+from app.services.resilience import CircuitOpenError
+
+
+@pytest.fixture
+def image_root(tmp_path, photo):
+    (tmp_path / "h.jpg").write_bytes(photo)
+    return str(tmp_path)
+
+
+def _entries(count: int, images=("h.jpg",)):
+    return [
+        HouseholdManifestEntry(household_id=f"H{i}", images=list(images), state="Karnataka")
+        for i in range(count)
+    ]
+
+
+def _run(entries, image_root, concurrency=2):
+    async def collect():
+        return [r async for r in run_batch(entries, concurrency, image_root)]
+
+    return asyncio.run(collect())
+
+
+def test_households_are_scored(fake_gemini, image_root):
+    results = _run(_entries(3), image_root)
+    assert sorted(r.household_id for r in results) == ["H0", "H1", "H2"]
+    assert {r.status for r in results} == {"ok"}
+
+
+@pytest.mark.parametrize(
+    "error",
+    [RuntimeError("model exploded"), CircuitOpenError("gemini", 5.0), KeyError("assets")],
+    ids=["runtime", "circuit_open", "parse"],
+)
+def test_model_failures_are_reported_per_household(monkeypatch, image_root, caplog, error):
+    async def fail(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(bulk_runner, "score_household", fail)
+    with caplog.at_level(logging.ERROR):
+        results = _run(_entries(5), image_root)
+
+    assert sorted(r.household_id for r in results) == [f"H{i}" for i in range(5)]
+    assert {r.status for r in results} == {"error"}
+    assert all(r.error.startswith(type(error).__name__) for r in results)
+    assert sum("Bulk scoring failed" in m for m in caplog.messages) == 5
+
+
+def test_bad_paths_are_errors_not_crashes(fake_gemini, image_root):
+    results = _run(_entries(1, images=("../outside.jpg",)) + _entries(1, images=()), image_root)
+    assert [r.status for r in results] == ["error", "error"]
+
+
+def test_manifest_errors_surface_after_the_results(fake_gemini, image_root):
+    def manifest():
+        yield from _entries(2)
+        raise OSError("manifest unreadable")
+
+    with pytest.raises(OSError, match="manifest unreadable"):
+        _run(manifest(), image_root, concurrency=1)
+
+
+def test_batch_endpoint_streams_model_errors(api, monkeypatch, settings, image_root):
+    async def fail(*args, **kwargs):
+        raise TimeoutError("model timed out")
+
+    settings(bulk_image_root=image_root)
+    monkeypatch.setattr(bulk_runner, "score_household", fail)
+    households = [e.dict() for e in _entries(3)]
+    response = api("POST", "/score/lifestyle/batch", json={"households": households})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["household_id"] for line in lines) == ["H0", "H1", "H2"]
+    assert {line["status"] for line in lines} == {"error"}
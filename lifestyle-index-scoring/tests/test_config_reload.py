@@ -0,0 +1,160 @@
+# tests/test_config_reload.py
+
+import asyncio
+import copy
+import json
+import os
+
+import pytest
+
+from app import scoring_tables
+from app.scoring_config import ASSET_WEIGHTS
+from app.scoring_tables import (
+    BUILTIN_VERSION,
+    get_scoring_table,
+    load_scoring_table,
+    validate_scoring_config,
+)
+from app.services import config_reload
+
+_AC = ASSET_WEIGHTS["AIR_CONDITIONER"]
+
+
+def _weights(**changes):
+    weight = copy.deepcopy(dict(_AC))
+    weight.update(changes)
+    return {"AIR_CONDITIONER": weight}
+
+
+@pytest.fixture(autouse=True)
+def builtin_table(monkeypatch):
+    """Every test starts from, and leaves behind, the built-in table."""
+    builtin = scoring_tables.compile_scoring_table(version=BUILTIN_VERSION)
+    monkeypatch.setattr(scoring_tables, "_TABLE", builtin)
+    monkeypatch.setattr(scoring_tables, "_RELOAD_STATS", dict(scoring_tables._RELOAD_STATS))
+
+
+def test_builtin_tables_validate():
+    validate_scoring_config(ASSET_WEIGHTS, scoring_tables.STATE_PROFILES)
+
+
+@pytest.mark.parametrize(
+    "asset_weights, state_profiles, message",
+    [
+        (["AIR_CONDITIONER"], None, "asset_weights must be a mapping"),
+        ({"AC": 12.0}, None, r"asset_weights\['AC'\] must be a mapping"),
+        ({"AC": {"base": 1.0}}, None, "is missing"),
+        (_weights(base="12"), None, r"\['base'\] must be a number"),
+        (_weights(metro_multiplier=True), None, r"\['metro_multiplier'\] must be a number"),
+        (_weights(climate_adjust=[1.0]), None, r"\['climate_adjust'\] must be a mapping"),
+        (_weights(climate_adjust={"arctic": 1.0}), None, "unknown climate zones"),
+        (_weights(climate_adjust={"cold": "high"}), None, r"\['cold'\] must be a number"),
+        (None, {"GOA": "coastal"}, "must be a mapping"),
+        (None, {"GOA": {"climate": "hot_humid"}}, "is missing"),
+        (None, {"GOA": {"climate": "tropical", "metro_flag": "metro"}}, "unknown climate"),
+        (None, {"GOA": {"climate": "hot_humid", "metro_flag": "urban"}}, "unknown metro_flag"),
+    ],
+)
+def test_bad_configs_are_value_errors(asset_weights, state_profiles, message):
+    with pytest.raises(ValueError, match=message):
+        validate_scoring_config(asset_weights, state_profiles)
+
+
+def _write(tmp_path, doc, name="scoring.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(doc) if not isinstance(doc, str) else doc)
+    return str(path)
+
+
+def test_load_versions_by_content_hash(tmp_path):
+    path = _write(tmp_path, {"asset_weights": _weights(base=20.0)})
+    table = load_scoring_table(path)
+    assert table.version.startswith("sha256:")
+    assert table.asset_coef["AIR_CONDITIONER"] != get_scoring_table().asset_coef["AIR_CONDITIONER"]
+    # The omitted table stays built in
+    live = get_scoring_table()
+    assert {k: r.context for k, r in table.states.items()} == {
+        k: r.context for k, r in live.states.items()
+    }
+
+
+def test_reload_swaps_and_skips_unchanged(tmp_path):
+    goa = {"goa": {"climate": "cold", "metro_flag": "metro"}}
+    path = _write(tmp_path, {"version": "v2", "state_profiles": goa})
+    first = asyncio.run(config_reload.reload(path))
+    assert first["changed"] and first["version"] == "v2"
+    assert get_scoring_table().states["GOA"].climate == "cold"
+    assert asyncio.run(config_reload.reload(path))["changed"] is False
+
+
+@pytest.mark.parametrize(
+    "doc",
+    [
+        "{not json",
+        "[1, 2]",
+        {"asset_weights": _weights(base="heavy")},
+        {"state_profiles": {"GOA": {"climate": "hot_humid", "metro_flag": 1}}},
+    ],
+)
+def test_bad_reload_keeps_the_live_table(tmp_path, doc):
+    live = get_scoring_table()
+    path = _write(tmp_path, doc)
+    with pytest.raises(ValueError):
+        asyncio.run(config_reload.reload(path))
+    assert get_scoring_table() is live
+    assert scoring_tables.scoring_table_stats()["last_error"].startswith(("ValueError", "JSONDecodeError"))
+
+
+def test_logged_reload_survives_bad_files(tmp_path, settings):
+    settings(scoring_config_path=_write(tmp_path, {"asset_weights": {"AC": None}}))
+    live = get_scoring_table()
+    asyncio.run(config_reload._reload_logged("test"))
+    assert get_scoring_table() is live
+
+
+def test_missing_file_is_os_error(tmp_path):
+    with pytest.raises(OSError):
+        asyncio.run(config_reload.reload(str(tmp_path / "missing.json")))
+
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+def test_reload_endpoint_needs_a_configured_path(api, settings):
+    settings(scoring_config_path="")
+    assert api("POST", "/score/config/reload").status_code == 403
+
+
+def test_reload_endpoint_swaps_the_version_requests_score_with(api, settings, tmp_path, photo, upload):
+    path = _write(tmp_path, {"version": "v-endpoint", "asset_weights": _weights(base=30.0)})
+    settings(scoring_config_path=path)
+    response = api("POST", "/score/config/reload")
+    assert response.status_code == 200
+    assert response.json()["version"] == "v-endpoint"
+
+    scored = api("POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(photo)).json()
+    assert scored["breakdown"]["scoring_version"] == "v-endpoint"
+
+    _write(tmp_path, "{broken")
+    response = api("POST", "/score/config/reload")
+    assert response.status_code == 400
+    assert api("GET", "/score/config").json()["version"] == "v-endpoint"
+
+
+def test_poller_reloads_on_mtime_change(tmp_path, settings):
+    path = _write(tmp_path, {"version": "v1"})
+    settings(scoring_config_path=path)
+
+    async def scenario():
+        task = asyncio.ensure_future(config_reload._poll(path, 0.01))
+        await asyncio.sleep(0.05)
+        _write(tmp_path, {"version": "v2"})
+        os.utime(path, (1, 1))
+        for _ in range(100):
+            if get_scoring_table().version == "v2":
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert get_scoring_table().version == "v2"
@@ -0,0 +1,82 @@
+# tests/test_image_dedup.py
+
+import io
+import random
+
+import pytest
+from PIL import Image
+
+from app.services.image_dedup import PerceptualHashIndex, dedup_images, dhash, hamming
+from app.services.image_ingest import ImageTooLarge
+from app.telemetry import IMAGES_PREVIOUSLY_SEEN
+from benchmarks.prefilter_bench import synthetic_corpus
+
+
+def _photos(count: int, seed: int):
+    return [data for data, _ in synthetic_corpus(households=count, skips=0, seed=seed)][:count]
+
+
+@pytest.mark.filterwarnings("error::DeprecationWarning")
+def test_dhash_survives_reencoding():
+    photo, = _photos(1, seed=3)
+    with Image.open(io.BytesIO(photo)) as img:
+        buf = io.BytesIO()
+        img.resize((800, 600)).save(buf, "JPEG", quality=60)
+    assert hamming(dhash(photo), dhash(buf.getvalue())) <= 4
+
+
+def test_dedup_keeps_the_first_of_each_group():
+    a, b, c = _photos(3, seed=5)
+    index = PerceptualHashIndex(100)
+    result = dedup_images([a, b, a, b"junk", c, b], ["a", "b", "a2", "junk", "c", "b2"], 6, index)
+    assert result.kept_indices == [0, 1, 3, 4]
+    assert [(s.index, s.duplicate_of) for s in result.skipped] == [(2, 0), (5, 1)]
+    assert result.previously_seen == []
+
+    again = dedup_images([c], max_distance=6, index=index)
+    assert again.previously_seen == [0]
+
+
+def test_hash_index_is_bounded_and_finds_near_hashes():
+    index = PerceptualHashIndex(2)
+    for h in (0b1, 0b10, 0b100):
+        index.add(h << 40)
+    assert len(index) == 2
+    assert index.find(0b1 << 40, 0) is None  # evicted
+    assert index.find((0b100 << 40) | 0b11, 2) == 0b100 << 40
+
+
+def test_random_bytes_do_not_crash_dedup():
+    rng = random.Random(0)
+    junk = bytes(rng.randrange(256) for _ in range(2048))
+    assert dhash(junk) is None
+
+
+def test_dhash_applies_the_pixel_cap(settings):
+    settings(image_max_pixels=10_000)
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 100)).save(buf, "PNG")
+    with pytest.raises(ImageTooLarge):
+        dhash(buf.getvalue())
+
+
+# -----------------------------
+# Through the API
+# -----------------------------
+def test_near_duplicate_upload_is_skipped(api, photo, upload):
+    response = api("POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(photo, photo))
+    assert response.status_code == 200
+    skipped = response.json()["skipped_images"]
+    assert [(s["index"], s["reason"], s["duplicate_of"]) for s in skipped] == [
+        (1, "near_duplicate", 0)
+    ]
+
+
+def test_repeats_across_requests_are_counted_not_returned(api, upload):
+    photo, = _photos(1, seed=11)
+    seen = lambda: sum(IMAGES_PREVIOUSLY_SEEN._values.values())  # noqa: E731
+    before = seen()
+    for _ in range(2):
+        body = api("POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(photo)).json()
+        assert "previously_seen_images" not in body
+    assert seen() == before + 1
@@ -0,0 +1,137 @@
+# tests/test_image_ingest.py
+
+import asyncio
+import io
+
+import httpx
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from app.request_size import RequestSizeMiddleware
+from app.services.image_ingest import (
+    ImageTooLarge,
+    downscale_image,
+    open_image,
+    read_upload_capped,
+)
+
+
+def _png(size, colour=(90, 120, 150)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, colour).save(buf, "PNG")
+    return buf.getvalue()
+
+
+# -----------------------------
+# Downscale and re-encode
+# -----------------------------
+def test_large_photo_is_downscaled_to_jpeg(photo):
+    with Image.open(io.BytesIO(photo)) as img:
+        buf = io.BytesIO()
+        img.resize((3200, 2400)).save(buf, "PNG")
+    out = downscale_image(buf.getvalue(), 1024, 85)
+    with Image.open(io.BytesIO(out)) as img:
+        assert (img.format, img.size) == ("JPEG", (1024, 768))
+
+
+def test_small_jpeg_and_undecodable_bytes_pass_through(photo):
+    assert downscale_image(photo, 1024, 85) is photo
+    assert downscale_image(b"not an image", 1024, 85) == b"not an image"
+
+
+# -----------------------------
+# Pixel cap
+# -----------------------------
+def test_open_image_rejects_images_over_the_pixel_cap():
+    data = _png((200, 100))
+    with open_image(data, max_pixels=20_000) as img:
+        assert img.size == (200, 100)
+    with pytest.raises(ImageTooLarge) as err:
+        open_image(data, max_pixels=19_999)
+    assert err.value.status_code == 413
+    assert "200x100" in err.value.reason
+
+
+def test_downscale_applies_the_pixel_cap(settings):
+    settings(image_max_pixels=10_000)
+    with pytest.raises(ImageTooLarge):
+        downscale_image(_png((200, 100)), 1024, 85)
+
+
+def test_decompression_bomb_is_413(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000)
+    with pytest.raises(ImageTooLarge, match="decompression bomb"):
+        open_image(_png((100, 100)), max_pixels=10**9)
+
+
+# -----------------------------
+# Byte limits
+# -----------------------------
+def test_upload_read_stops_past_the_cap():
+    upload = UploadFile(io.BytesIO(b"x" * 1000), filename="big.jpg")
+    assert asyncio.run(read_upload_capped(upload, max_bytes=1000, chunk_size=64)) == b"x" * 1000
+    upload = UploadFile(io.BytesIO(b"x" * 1001), filename="big.jpg")
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(read_upload_capped(upload, max_bytes=1000, chunk_size=64))
+    assert err.value.status_code == 413
+
+
+@pytest.fixture
+def limited_api(settings, fake_gemini):
+    """The app behind a RequestSizeMiddleware with a 64 KB limit."""
+    from app.main import app
+
+    settings(request_max_bytes=64 * 1024)
+    limited = RequestSizeMiddleware(app)
+    received = []
+
+    async def request(content, headers=None) -> httpx.Response:
+        async def counting(scope, receive, send):
+            async def counted():
+                message = await receive()
+                received.append(len(message.get("body", b"")))
+                return message
+
+            await limited(scope, counted, send)
+
+        transport = httpx.ASGITransport(app=counting)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/score/lifestyle",
+                content=content,
+                headers={"content-type": "multipart/form-data; boundary=b", **(headers or {})},
+            )
+
+    return lambda content, headers=None: (asyncio.run(request(content, headers)), received)
+
+
+def test_declared_oversized_body_is_rejected_unread(limited_api):
+    response, received = limited_api(b"x" * (65 * 1024))
+    assert response.status_code == 413
+    assert "MB limit" in response.json()["detail"]
+    assert received == []
+
+
+def test_streamed_oversized_body_is_cut_off(limited_api):
+    head = (
+        b"--b\r\nContent-Disposition: form-data; name=\"images\"; filename=\"a.jpg\"\r\n"
+        b"Content-Type: image/jpeg\r\n\r\n"
+    )
+    chunk = b"x" * (16 * 1024)
+
+    async def body():
+        yield head
+        for _ in range(64):
+            yield chunk
+
+    response, received = limited_api(body())
+    assert response.status_code == 413
+    assert sum(received) <= 64 * 1024 + len(chunk)
+
+
+def test_request_within_the_limit_is_served(limited_api, photo, upload):
+    request = httpx.Request("POST", "http://test", data={"state": "Goa"}, files=upload(photo))
+    body = request.read()
+    response, _ = limited_api(body, {"content-type": request.headers["content-type"]})
+    assert response.status_code == 200, response.text
@@ -0,0 +1,92 @@
+# tests/test_jobs.py
+
+import asyncio
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.schemas import JobStatus
+from app.services import job_queue
+
+
+def test_job_round_trip(client, photo, monkeypatch, upload):
+    monkeypatch.setattr(job_queue, "_job_queue", None)
+
+    async def scenario():
+        async with client() as c:
+            submitted = await c.post(
+                "/score/lifestyle/jobs", data={"state": "Punjab"}, files=upload(photo)
+            )
+            assert submitted.status_code == 202
+            location = submitted.headers["Location"]
+            for _ in range(200):
+                status = (await c.get(location)).json()
+                if status["status"] in ("succeeded", "failed"):
+                    break
+                await asyncio.sleep(0.01)
+            await job_queue.shutdown()
+            return status
+
+    status = asyncio.run(scenario())
+    assert status["status"] == "succeeded", status
+    assert status["result"]["lifestyle_index"] > 0
+
+
+def test_unknown_job_is_404(api):
+    assert api("GET", "/score/lifestyle/jobs/nope").status_code == 404
+
+
+# -----------------------------
+# Callbacks
+# -----------------------------
+@pytest.fixture
+def callback_server():
+    """A local HTTP server that answers POST / with a 302 to /landing."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            hits.append(self.path)
+            self.rfile.read(int(self.headers["Content-Length"]))
+            if self.path == "/":
+                self.send_response(302)
+                self.send_header("Location", "/landing")
+            else:
+                self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_callback_does_not_follow_redirects(callback_server):
+    base, hits = callback_server
+    assert job_queue._post_json(f"{base}/landing", b"{}", timeout=5) == 204
+    with pytest.raises(urllib.error.HTTPError) as err:
+        job_queue._post_json(f"{base}/", b"{}", timeout=5)
+    assert err.value.code == 302
+    assert hits == ["/landing", "/"]
+
+
+def test_redirected_callback_is_a_failed_delivery(callback_server, caplog):
+    base, hits = callback_server
+    status = JobStatus(job_id="j1", status="succeeded", created_at=0.0)
+    asyncio.run(job_queue._notify(f"{base}/", status))
+    assert hits == ["/"]
+    assert "Job callback to 127.0.0.1 failed" in caplog.text
@@ -0,0 +1,196 @@
+# tests/test_location_index.py
+
+import json
+
+import pytest
+
+from app.location_index import (
+    LocationRecord,
+    PincodeIndex,
+    _flatten,
+    get_location_index,
+    load_pincode_index,
+)
+from app.location_config import STATE_PROFILES
+from app.scoring_tables import compile_scoring_table, load_scoring_table
+
+
+# -----------------------------
+# Range flattening
+# -----------------------------
+def test_flatten_innermost_range_wins():
+    # state circle 0 with city 1 inside, itself containing a locality 2
+    ranges = [(100, 199, 0), (120, 159, 1), (130, 139, 2)]
+    assert _flatten(ranges) == [
+        (100, 119, 0),
+        (120, 129, 1),
+        (130, 139, 2),
+        (140, 159, 1),
+        (160, 199, 0),
+    ]
+
+
+def test_flatten_keeps_gaps_and_merges_touching_segments():
+    ranges = [(100, 109, 0), (110, 119, 0), (200, 209, 1), (150, 150, 2)]
+    assert _flatten(ranges) == [(100, 119, 0), (150, 150, 2), (200, 209, 1)]
+
+
+def test_flatten_nested_range_at_the_edges():
+    assert _flatten([(100, 199, 0), (100, 109, 1), (190, 199, 2)]) == [
+        (100, 109, 1),
+        (110, 189, 0),
+        (190, 199, 2),
+    ]
+
+
+def test_flatten_rejects_partial_overlap():
+    with pytest.raises(ValueError, match="partially overlaps"):
+        _flatten([(100, 199, 0), (150, 249, 1)])
+
+
+def _index():
+    circle = LocationRecord(None, "KARNATAKA", 3, "temperate", "non_metro")
+    city = LocationRecord("Bengaluru Urban", "KARNATAKA", 1, "temperate", "metro")
+    other = LocationRecord("Chennai", "TAMIL NADU", 1, "hot_humid", "metro")
+    return PincodeIndex(
+        [
+            (560000, 599999, circle, []),
+            (560001, 560300, city, ["Bengaluru", "Bangalore"]),
+            (600001, 600130, other, ["Chennai"]),
+        ]
+    )
+
+
+def test_pincode_lookup():
+    index = _index()
+    assert index.lookup_pincode("560034").district == "Bengaluru Urban"
+    assert index.lookup_pincode(" 560 034 ").district == "Bengaluru Urban"
+    assert index.lookup_pincode("562100").district is None
+    assert index.lookup_pincode("600500") is None
+    for bad in (None, "", "abc", "12345", "1000000"):
+        assert index.lookup_pincode(bad) is None
+
+
+def test_city_lookup_is_fuzzy_and_state_scoped():
+    index = _index()
+    assert index.lookup_city("bangalore").district == "Bengaluru Urban"
+    assert index.lookup_city("Bengaluruu", "KARNATAKA").district == "Bengaluru Urban"
+    assert index.lookup_city("Chennai", "KARNATAKA") is None
+
+
+def test_bundled_index_loads():
+    index = get_location_index()
+    assert len(index) > 0
+    assert index.lookup_pincode("400001").district == "Mumbai"
+
+
+def test_loader_reports_bad_rows(tmp_path):
+    path = tmp_path / "ranges.csv"
+    path.write_text(
+        "start,end,district,state,tier,climate,metro_flag,cities\n"
+        "560001,560300,Bengaluru Urban,KARNATAKA,1,temperate,metro,Bengaluru\n"
+        "560400,560300,X,KARNATAKA,1,temperate,metro,\n"
+    )
+    with pytest.raises(ValueError, match=":3: bad pincode range"):
+        load_pincode_index(str(path))
+
+
+# -----------------------------
+# Rest-of-circle profiles
+# -----------------------------
+def test_state_wide_row_uses_its_own_profile():
+    index = _index()
+    flipped = {k: dict(v) for k, v in STATE_PROFILES.items()}
+    flipped["KARNATAKA"] = {"climate": "cold", "metro_flag": "metro"}
+    table = compile_scoring_table(state_profiles=flipped)
+
+    profile, source, _ = index.resolve(table, "Karnataka", pincode="562100")
+    assert source == "circle"
+    assert (profile.climate, profile.metro_flag, profile.tier) == ("temperate", "non_metro", 3)
+
+    # District rows still win
+    profile, source, _ = index.resolve(table, "Karnataka", pincode="560034")
+    assert source == "pincode"
+    assert (profile.climate, profile.metro_flag) == ("temperate", "metro")
+
+
+def test_configured_circle_profile_overrides_the_row():
+    index = _index()
+    table = compile_scoring_table(
+        circle_profiles={"KARNATAKA": {"climate": "cold", "metro_flag": "metro"}}
+    )
+    profile, source, _ = index.resolve(table, "Karnataka", pincode="562100")
+    assert source == "circle"
+    assert (profile.climate, profile.metro_flag) == ("cold", "metro")
+
+
+def test_circle_profiles_load_from_the_scoring_config(tmp_path):
+    path = tmp_path / "scoring.json"
+    profile = {"climate": "cold", "metro_flag": "metro"}
+    path.write_text(json.dumps({"circle_profiles": {"karnataka": profile}}))
+    table = load_scoring_table(str(path))
+    assert table.circles["KARNATAKA"].climate == "cold"
+    assert table.content_hash != compile_scoring_table().content_hash
+
+    path.write_text(json.dumps({"circle_profiles": {"KARNATAKA": {"climate": "alpine"}}}))
+    with pytest.raises(ValueError, match=r"circle_profiles\['KARNATAKA'\] is missing"):
+        load_scoring_table(str(path))
+
+
+def test_state_wide_row_supplies_an_unresolvable_state():
+    index = _index()
+    profile, source, _ = index.resolve(compile_scoring_table(), "???", pincode="562100")
+    assert source == "circle"
+    assert (profile.state, profile.metro_flag) == ("KARNATAKA", "non_metro")
+
+
+def test_unlisted_city_is_in_the_rest_of_its_circle():
+    index = _index()
+    table = compile_scoring_table()
+    profile, source, _ = index.resolve(table, "Karnataka", city="Hubballi")
+    assert (source, profile.metro_flag) == ("circle", "non_metro")
+    # No state-wide row for Tamil Nadu in this index: the state profile applies
+    profile, source, _ = index.resolve(table, "Tamil Nadu", city="Madurai")
+    assert source == "state"
+    # No city at all: the state profile, not the circle
+    assert index.resolve(table, "Karnataka")[1] == "state"
+
+
+def test_bundled_index_scores_rest_of_circle_as_non_metro():
+    table = compile_scoring_table()
+    for location in ({"pincode": "580001"}, {"city": "Hubli"}):
+        profile, source, _ = get_location_index().resolve(table, "Karnataka", **location)
+        assert (source, profile.metro_flag, profile.climate) == ("circle", "non_metro", "temperate")
+
+
+def test_city_beats_state_wide_pincode():
+    index = _index()
+    table = compile_scoring_table()
+    profile, source, _ = index.resolve(table, "Karnataka", city="Bangalore", pincode="562100")
+    assert (source, profile.district) == ("city", "Bengaluru Urban")
+
+
+def test_pincode_in_another_state_is_ignored():
+    index = _index()
+    table = compile_scoring_table()
+    profile, source, resolution = index.resolve(table, "Tamil Nadu", pincode="560034")
+    assert source == "state"
+    assert resolution.state == "TAMIL NADU"
+
+
+def test_candidate_circle_profiles_rescore_circle_households(tmp_path):
+    from app.schemas import DetectedAsset, GeminiRawSignals, LocationContext
+    from app.services.rescoring import make_candidate, rescore_store
+    from app.services.signal_store import SignalStore
+
+    store = SignalStore(str(tmp_path / "signals.sqlite3"))
+    signals = GeminiRawSignals(
+        assets=[DetectedAsset(name="AIR_CONDITIONER", confidence=1.0, quantity=2)]
+    )
+    for household_id, pincode in (("circle", "580001"), ("district", "560034")):
+        location = LocationContext(state="Karnataka", pincode=pincode)
+        store.record(signals, location, household_id=household_id)
+
+    assert rescore_store(store, make_candidate()).changed == 0
+    hot = {"karnataka": {"climate": "hot_arid", "metro_flag": "metro"}}
+    assert rescore_store(store, make_candidate(circle_profiles=hot)).changed == 1
@@ -0,0 +1,94 @@
+# tests/test_model_json.py
+
+from types import SimpleNamespace
+
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas import LocationContext
+from app.services import model_json
+from app.services.model_json import parse_model_json
+from app.services.reasoning_engine import parse_gemini_output, parse_gemini_response
+from benchmarks.fake_gemini import DEFAULT_RESPONSE, OUTPUTS
+from benchmarks.model_outputs import CASES
+
+ASSETS = ["AIR_CONDITIONER", "REFRIGERATOR", "SMART_TV"]
+
+
+def _names(raw):
+    return [a["name"] for a in raw["assets"]]
+
+
+@pytest.mark.parametrize("shape", ["clean", "fenced", "prose"])
+def test_wrapped_answers_parse_clean(shape):
+    raw, outcome = parse_model_json(OUTPUTS[shape])
+    assert outcome == "clean"
+    assert _names(raw) == ASSETS
+
+
+def test_trailing_commas_are_repaired():
+    text = '{"assets": [{"name": "CAR", "confidence": 0.9, "quantity": 1,},], "notes": "x",}'
+    raw, outcome = parse_model_json(text)
+    assert outcome == "repaired"
+    assert _names(raw) == ["CAR"]
+
+
+def test_truncated_answer_keeps_complete_assets():
+    cut = DEFAULT_RESPONSE.index('{"name": "SMART_TV"') + 10
+    raw, outcome = parse_model_json(DEFAULT_RESPONSE[:cut])
+    assert outcome == "truncated"
+    assert _names(raw) == ["AIR_CONDITIONER", "REFRIGERATOR"]
+
+
+def test_braces_inside_strings_and_prose():
+    text = 'Note {sic}: ```json\n{"assets": [{"name": "SOFA", "extra": {"text": "a } b"}}]}\n```'
+    raw, outcome = parse_model_json(text)
+    assert outcome in ("clean", "repaired")
+    assert raw["assets"][0]["extra"]["text"] == "a } b"
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "[1, 2, 3]"])
+def test_invalid_answers(text):
+    assert parse_model_json(text) == (None, "invalid")
+
+
+def test_parse_gemini_output_reports_truncation():
+    location = LocationContext(state="Goa")
+    cut = DEFAULT_RESPONSE.index('{"name": "SMART_TV"')
+    signals, outcome = parse_gemini_output(SimpleNamespace(text=DEFAULT_RESPONSE[:cut]), location)
+    assert outcome == "truncated"
+    assert [a.name for a in signals.assets] == ["AIR_CONDITIONER", "REFRIGERATOR"]
+
+
+def test_parse_gemini_output_rejects_empty_and_garbage():
+    location = LocationContext(state="Goa")
+    for text in ("", "the model refused"):
+        with pytest.raises(HTTPException) as err:
+            parse_gemini_output(SimpleNamespace(text=text), location)
+        assert err.value.status_code == 500
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_loader(request, monkeypatch):
+    """Run with orjson when it is installed, and always with the stdlib."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(
+            model_json, "_loader", lambda: (json.loads, (json.JSONDecodeError,))
+        )
+    return request.param
+
+
+@pytest.mark.parametrize("name, text, expected", CASES, ids=[case[0] for case in CASES])
+def test_model_output_corpus(json_loader, name, text, expected):
+    location = LocationContext(state="Goa")
+    if expected is None:
+        with pytest.raises(HTTPException) as err:
+            parse_gemini_response(SimpleNamespace(text=text), location)
+        assert err.value.status_code == 500
+    else:
+        signals = parse_gemini_response(SimpleNamespace(text=text), location)
+        assert len(signals.assets) == expected
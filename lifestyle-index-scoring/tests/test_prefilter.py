@@ -0,0 +1,88 @@
+# tests/test_prefilter.py
+
+import io
+
+import pytest
+from PIL import Image
+
+from app.services.image_ingest import ImageTooLarge
+from app.services.image_prefilter import (
+    ImageStats,
+    classify_stats,
+    prefilter_images,
+)
+from benchmarks.prefilter_bench import synthetic_corpus
+
+
+def _png(size, colour=(90, 120, 150)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, colour).save(buf, "PNG")
+    return buf.getvalue()
+
+
+# -----------------------------
+# Pre-filter verdicts
+# -----------------------------
+def test_prefilter_verdicts_on_the_synthetic_corpus():
+    samples = synthetic_corpus(households=5, skips=3, seed=7)
+    result = prefilter_images([data for data, _ in samples], classifier=None)
+    verdicts = {i: "keep" for i in result.kept_indices}
+    verdicts.update({s.index: s.reason for s in result.skipped})
+    assert [verdicts[i] for i in range(len(samples))] == [label for _, label in samples]
+
+
+@pytest.mark.parametrize(
+    "stats, verdict",
+    [
+        (dict(mean=8, std=3, flat=0.9, white=0, saturation=0, colours=0.001), "blank"),
+        (dict(mean=250, std=4, flat=0.9, white=1, saturation=1, colours=0.001), "blank"),
+        (dict(mean=200, std=60, flat=0.7, white=0.6, saturation=2, colours=0.05), "document"),
+        (dict(mean=120, std=50, flat=0.8, white=0.1, saturation=60, colours=0.005), "screenshot"),
+        (dict(mean=110, std=45, flat=0.2, white=0.05, saturation=40, colours=0.4), None),
+    ],
+)
+def test_classify_stats(stats, verdict):
+    assert classify_stats(ImageStats(**stats)) == verdict
+
+
+def test_undecodable_images_are_kept_for_the_model():
+    result = prefilter_images([b"not an image"], classifier=None)
+    assert result.kept_indices == [0] and not result.skipped
+
+
+def test_prefilter_applies_the_pixel_cap(settings):
+    settings(image_max_pixels=10_000)
+    with pytest.raises(ImageTooLarge):
+        prefilter_images([_png((200, 100))], classifier=None)
+
+
+# -----------------------------
+# Through the API
+# -----------------------------
+def test_prefilter_reports_skipped_images(api, photo, document, upload):
+    response = api(
+        "POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(document, photo)
+    )
+    assert response.status_code == 200
+    assert [(s["index"], s["reason"]) for s in response.json()["skipped_images"]] == [
+        (0, "document")
+    ]
+
+
+def test_all_images_filtered_is_422_not_a_score(api, blank, document, upload):
+    response = api(
+        "POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(blank, document)
+    )
+    assert response.status_code == 422
+    assert "blank" in response.json()["detail"]
+
+
+def test_all_images_filtered_can_fall_back_to_the_model(
+    api, settings, blank, document, upload
+):
+    settings(prefilter_all_skipped="model")
+    response = api(
+        "POST", "/score/lifestyle", data={"state": "Goa"}, files=upload(blank, document)
+    )
+    assert response.status_code == 200
+    assert response.json()["skipped_images"] == []
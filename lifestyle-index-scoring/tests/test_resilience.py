@@ -0,0 +1,250 @@
+# tests/test_resilience.py
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services import vertex_client
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyWindow,
+    backoff_delay,
+    hedged,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# -----------------------------
+# Circuit breaker
+# -----------------------------
+def test_breaker_opens_after_consecutive_failures():
+    clock = Clock()
+    transitions = []
+    breaker = CircuitBreaker("gemini", 3, 10.0, on_transition=transitions.append, clock=clock)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.record_success()  # resets the run
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.before_call()
+    assert err.value.retry_after == pytest.approx(10.0)
+    assert transitions == [CircuitBreaker.OPEN]
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    clock = Clock()
+    breaker = CircuitBreaker("gemini", 1, 10.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens():
+    clock = Clock()
+    breaker = CircuitBreaker("gemini", 5, 10.0, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now = 10.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["rejected"] == 0
+
+
+def test_abandoned_probe_stops_blocking_after_reset():
+    clock = Clock()
+    breaker = CircuitBreaker("gemini", 1, 10.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.before_call()  # probe never reports back
+    clock.now = 20.0
+    breaker.before_call()
+
+
+# -----------------------------
+# Latency window, backoff
+# -----------------------------
+def test_latency_window_quantile():
+    window = LatencyWindow(size=100)
+    assert window.quantile(0.95) is None
+    for i in range(200):
+        window.observe(float(i))
+    assert len(window) == 100
+    assert window.quantile(0.0) == 100.0
+    assert window.quantile(0.95) == 195.0
+
+
+def test_backoff_is_capped_full_jitter():
+    class Top:
+        @staticmethod
+        def uniform(low, high):
+            return high
+
+    assert backoff_delay(0, 0.5, 8.0, Top) == 0.5
+    assert backoff_delay(3, 0.5, 8.0, Top) == 4.0
+    assert backoff_delay(10, 0.5, 8.0, Top) == 8.0
+
+
+# -----------------------------
+# Hedging
+# -----------------------------
+def _calls(*delays, fail=()):
+    """call() factory: the n-th call sleeps delays[n], raising if n in fail."""
+    started, cancelled = [], []
+
+    async def call():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(delays[n])
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        if n in fail:
+            raise RuntimeError(f"call {n} failed")
+        return n
+
+    return call, started, cancelled
+
+
+def test_fast_call_is_not_hedged():
+    call, started, _ = _calls(0.0)
+    assert asyncio.run(hedged(call, 0.5)) == (0, False)
+    assert started == [0]
+
+
+def test_slow_call_is_hedged_and_loser_cancelled():
+    call, started, cancelled = _calls(1.0, 0.0)
+    hedges = []
+    assert asyncio.run(hedged(call, 0.01, on_hedge=lambda: hedges.append(1))) == (1, True)
+    assert started == [0, 1]
+    assert cancelled == [0]
+    assert hedges == [1]
+
+
+def test_first_call_can_still_win_after_hedging():
+    call, _, cancelled = _calls(0.05, 1.0)
+    assert asyncio.run(hedged(call, 0.01)) == (0, False)
+    assert cancelled == [1]
+
+
+def test_hedge_survives_one_failure():
+    call, _, _ = _calls(0.05, 0.1, fail={0})
+    assert asyncio.run(hedged(call, 0.01)) == (1, True)
+
+
+def test_hedge_raises_when_both_fail():
+    call, _, _ = _calls(0.02, 0.03, fail={0, 1})
+    with pytest.raises(RuntimeError, match="call 1 failed"):
+        asyncio.run(hedged(call, 0.01))
+
+
+def test_hedging_disabled():
+    call, started, _ = _calls(0.05)
+    assert asyncio.run(hedged(call, None)) == (0, False)
+    assert started == [0]
+
+
+# -----------------------------
+# Blocking SDK calls
+# -----------------------------
+def test_abandoned_blocking_call_keeps_its_slot(monkeypatch):
+    monkeypatch.setattr(vertex_client, "_blocking_call_semaphore", None)
+    monkeypatch.setattr(vertex_client.get_settings(), "vertex_blocking_call_limit", 1)
+    release = threading.Event()
+
+    class BlockingModel:
+        def generate_content(self, contents, **kwargs):
+            release.wait(5)
+            return "done"
+
+    async def scenario():
+        model = BlockingModel()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(vertex_client._generate_async_untimed(model, [], {}), 0.05)
+        semaphore = vertex_client._get_blocking_semaphore()
+        # The timed-out call's thread is still running: its slot is not free
+        held_while_running = semaphore.locked()
+        release.set()
+        result = await vertex_client._generate_async_untimed(model, [], {})
+        return held_while_running, result, semaphore.locked()
+
+    assert asyncio.run(scenario()) == (True, "done", False)
+
+
+# -----------------------------
+# Retries and the breaker around Gemini calls
+# -----------------------------
+class ApiError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture
+def scripted(monkeypatch, fake_gemini, settings):
+    """Make each Gemini attempt raise or return the next scripted outcome."""
+    settings(gemini_retry_base_seconds=0.001, gemini_retry_max_seconds=0.001, gemini_max_retries=2)
+    breaker = CircuitBreaker("gemini", failure_threshold=3, reset_seconds=60.0)
+    monkeypatch.setattr(vertex_client, "get_circuit_breaker", lambda: breaker)
+    attempts = []
+
+    def script(*outcomes):
+        async def attempt(model, contents, kwargs):
+            outcome = outcomes[len(attempts)]
+            attempts.append(outcome)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(vertex_client, "_generate_async", attempt)
+        return lambda: asyncio.run(vertex_client._generate_resilient([], {}))
+
+    return script, attempts, breaker
+
+
+def test_transient_errors_are_retried(scripted):
+    script, attempts, breaker = scripted
+    call = script(ApiError(503), asyncio.TimeoutError(), "ok")
+    assert call() == "ok"
+    assert len(attempts) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_are_not_retried_or_counted(scripted):
+    script, attempts, breaker = scripted
+    call = script(ApiError(400), "unused")
+    with pytest.raises(ApiError):
+        call()
+    assert len(attempts) == 1
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_open_breaker_fails_fast(scripted):
+    script, attempts, breaker = scripted
+    call = script(*[ApiError(503)] * 3, "unused")
+    with pytest.raises(ApiError):
+        call()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        call()
+    assert len(attempts) == 3
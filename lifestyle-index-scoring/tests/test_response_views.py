@@ -0,0 +1,60 @@
+# tests/test_response_views.py
+
+import pytest
+
+from app.responses import dumps, render_score, select_fields
+from app.schemas import GeminiRawSignals, LocationContext
+from app.services.scoring_pipeline import build_score_response
+
+
+def _response(fields=None):
+    raw = GeminiRawSignals(assets=[{"name": "SMART_TV", "confidence": 0.9}], notes="x")
+    return build_score_response(raw, LocationContext(state="Kerala"), fields=fields)
+
+
+def test_views_and_explicit_fields():
+    assert select_fields("full") is None
+    assert select_fields("compact") == {"lifestyle_index", "persona_hint"}
+    assert select_fields("compact", "breakdown, explanation") == {"breakdown", "explanation"}
+    with pytest.raises(ValueError):
+        select_fields("tiny")
+
+
+def test_rendered_views_match_the_full_response():
+    full = _response()
+    assert render_score(full) == dumps(full.dict())
+    compact = _response(select_fields("compact"))
+    assert compact.explanation == ""  # not composed when not selected
+    assert render_score(compact, select_fields("compact")) == dumps(
+        {"lifestyle_index": full.lifestyle_index, "persona_hint": full.persona_hint}
+    )
+
+
+# -----------------------------
+# Through the API
+# -----------------------------
+def test_score_compact_view(api, photo, upload):
+    response = api(
+        "POST", "/score/lifestyle?view=compact", data={"state": "Kerala"}, files=upload(photo)
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()) == ["lifestyle_index", "persona_hint"]
+
+
+def test_unknown_field_is_400(api, photo, upload):
+    response = api(
+        "POST", "/score/lifestyle?fields=nope", data={"state": "Kerala"}, files=upload(photo)
+    )
+    assert response.status_code == 400
+    assert "nope" in response.json()["detail"]
+
+
+def test_openapi_documents_the_selectable_shape(api):
+    paths = api("GET", "/openapi.json").json()["paths"]
+    scored = paths["/score/lifestyle"]["post"]["responses"]["200"]
+    assert scored["content"]["application/json"]["schema"]["$ref"].endswith(
+        "/LifestyleScoreResponse"
+    )
+    assert "view=compact" in scored["description"]
+    streamed = paths["/score/lifestyle/stream"]["post"]["responses"]["200"]
+    assert sorted(streamed["content"]) == ["application/x-ndjson", "text/event-stream"]
@@ -0,0 +1,65 @@
+# tests/test_result_cache.py
+
+import asyncio
+import sqlite3
+
+from app.schemas import DetectedAsset, GeminiRawSignals
+from app.services.result_cache import MemoryLRUBackend, ResultCache, SQLiteBackend
+
+SIGNALS = GeminiRawSignals(assets=[DetectedAsset(name="SMART_TV", confidence=0.9, quantity=1)])
+
+
+def _rows(path) -> list:
+    with sqlite3.connect(path) as conn:
+        return [key for key, in conn.execute("SELECT key FROM signals_cache ORDER BY key")]
+
+
+def test_keys_depend_on_images_prompt_and_model():
+    key = ResultCache.make_key([b"a", b"b"], "v1", "gemini")
+    assert key == ResultCache.make_key([b"a", b"b"], "v1", "gemini")
+    assert key != ResultCache.make_key([b"ab"], "v1", "gemini")
+    assert key != ResultCache.make_key([b"a", b"b"], "v2", "gemini")
+    assert key != ResultCache.make_key([b"a", b"b"], "v1", "gemini-pro")
+
+
+def test_round_trip_and_stats():
+    cache = ResultCache(MemoryLRUBackend(10), ttl_seconds=60)
+
+    async def scenario():
+        assert await cache.get("k") is None
+        await cache.set("k", SIGNALS)
+        return await cache.get("k")
+
+    assert asyncio.run(scenario()) == SIGNALS
+    assert cache.stats() == {"hits": 1, "misses": 1, "errors": 0, "hit_ratio": 0.5}
+
+
+def test_sqlite_backend_drops_expired_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SQLiteBackend(path, max_entries=100)
+    backend.set("old", "x", ttl_seconds=-1)
+    assert backend.get("old") is None
+    backend.set("new", "y", ttl_seconds=60)
+    assert _rows(path) == ["new"]
+
+
+def test_sqlite_backend_enforces_the_entry_cap(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SQLiteBackend(path, max_entries=3)
+    for i in range(5):
+        backend.set(f"k{i}", "x", ttl_seconds=60 + i)
+    assert _rows(path) == ["k2", "k3", "k4"]
+
+    # A smaller cap applies to an existing file on open
+    SQLiteBackend(path, max_entries=1)
+    assert _rows(path) == ["k4"]
+
+
+def test_unreadable_entry_is_a_miss_and_is_dropped(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entries=10)
+    backend.set("k", '{"assets": "not a list"}', ttl_seconds=60)
+    cache = ResultCache(backend, ttl_seconds=60)
+
+    assert asyncio.run(cache.get("k")) is None
+    assert backend.get("k") is None
+    assert cache.stats()["misses"] == 1 and cache.stats()["errors"] == 1
@@ -0,0 +1,97 @@
+# tests/test_scoring_kernel.py
+
+import random
+
+import numpy as np
+import pytest
+
+from app.location_index import resolve_location
+from app.schemas import DetectedAsset, GeminiRawSignals, LocationContext
+from app.scoring_config import ASSET_WEIGHTS
+from app.scoring_tables import compile_scoring_table
+from app.services.scoring_engine import PERSONA_BUCKETS, infer_persona_from_score, score_lifestyle
+from app.services.scoring_kernel import PERSONAS, compile_weights, persona_codes, score_batch
+
+LOCATIONS = [
+    ("Karnataka", None, None),
+    ("Karnataka", None, "560034"),
+    ("Karnataka", "Mysore", None),
+    ("TN", None, None),
+    ("Orissa", None, None),
+    ("Rajasthan", "Jaipur", "302001"),
+    ("Maharashtra", None, "411001"),
+    ("Kerala", "Kochi", None),
+    ("Atlantis", None, None),
+]
+
+
+def _households(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = list(ASSET_WEIGHTS) + ["UNKNOWN_GADGET", "smart tv", "Air Conditioner"]
+    for _ in range(count):
+        assets = [
+            DetectedAsset(
+                name=rng.choice(names),
+                confidence=round(rng.random(), 2),
+                quantity=rng.randrange(0, 4),
+            )
+            for _ in range(rng.randrange(0, 12))
+        ]
+        state, city, pincode = rng.choice(LOCATIONS)
+        yield GeminiRawSignals(assets=assets), LocationContext(state=state, city=city, pincode=pincode)
+
+
+@pytest.mark.parametrize("flip_profiles", [False, True])
+def test_kernel_matches_score_lifestyle(flip_profiles):
+    asset_weights = ASSET_WEIGHTS
+    state_profiles = None
+    if flip_profiles:
+        from app.location_config import STATE_PROFILES
+
+        state_profiles = {
+            name: {"climate": "cold", "metro_flag": "non_metro"} for name in STATE_PROFILES
+        }
+    table = compile_scoring_table(asset_weights, state_profiles)
+    compiled = compile_weights(asset_weights, state_profiles)
+
+    households = list(_households(300))
+    household, names, quantity, confidence, states, contexts = [], [], [], [], [], []
+    for i, (signals, location) in enumerate(households):
+        for asset in signals.assets:
+            household.append(i)
+            names.append(asset.name)
+            quantity.append(asset.quantity)
+            confidence.append(asset.confidence)
+        states.append(location.state)
+        profile, source, _ = resolve_location(table, location.state, location.city, location.pincode)
+        contexts.append(profile.context if source in ("pincode", "city", "circle") else -1)
+
+    normalized, _ = score_batch(
+        compiled,
+        household=np.asarray(household, dtype=np.int64),
+        asset_idx=compiled.encode_assets(names),
+        quantity=np.asarray(quantity, dtype=np.float64),
+        confidence=np.asarray(confidence, dtype=np.float64),
+        household_state=compiled.encode_states(states),
+        household_context=np.asarray(contexts, dtype=np.int8),
+    )
+
+    expected = [score_lifestyle(s, loc, table=table)[0] for s, loc in households]
+    np.testing.assert_allclose(normalized, expected, atol=0.01)
+
+
+def test_persona_codes_match_infer_persona():
+    # Every bucket edge, and just below it
+    edges = [t for t, _ in PERSONA_BUCKETS]
+    scores = np.array(sorted({0.0, 100.0, *edges, *(t - 0.01 for t in edges)}))
+    for score, code in zip(scores, persona_codes(scores)):
+        assert PERSONAS[code] == infer_persona_from_score(float(score))
+
+
+def test_score_is_capped_and_empty_household_scores_zero():
+    location = LocationContext(state="Karnataka")
+    many = GeminiRawSignals(
+        assets=[DetectedAsset(name=name, confidence=1.0, quantity=5) for name in ASSET_WEIGHTS]
+    )
+    assert score_lifestyle(many, location)[0] == 100.0
+    assert score_lifestyle(GeminiRawSignals(assets=[]), location)[0] == 0.0
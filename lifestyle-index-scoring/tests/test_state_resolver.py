@@ -0,0 +1,39 @@
+# tests/test_state_resolver.py
+
+import pytest
+
+from app.state_resolver import StateResolver, get_state_resolver
+
+
+@pytest.mark.parametrize(
+    "text, state, method",
+    [
+        ("Karnataka", "KARNATAKA", "exact"),
+        ("tamil-nadu", "TAMIL NADU", "exact"),
+        ("TN", "TAMIL NADU", "alias"),
+        ("Orissa", "ODISHA", "alias"),
+        ("Bangalore", "KARNATAKA", "city"),
+        ("Karnatakka", "KARNATAKA", "fuzzy"),
+        ("Utar Pradesh", "UTTAR PRADESH", "fuzzy"),
+    ],
+)
+def test_state_resolution(text, state, method):
+    resolution = get_state_resolver().resolve(text)
+    assert (resolution.state, resolution.method) == (state, method)
+
+
+@pytest.mark.parametrize("text", ["Pradesh", "Uttar", "xyz", "", None])
+def test_ambiguous_or_unknown_states_stay_unresolved(text):
+    assert get_state_resolver().resolve(text).state is None
+
+
+def test_fuzzy_match_needs_a_clear_winner():
+    resolver = StateResolver(["MADHYA PRADESH", "ANDHRA PRADESH", "UTTAR PRADESH"], {}, {})
+    assert resolver.resolve("Pradesh").state is None
+    assert resolver.resolve("Madya Pradesh").state == "MADHYA PRADESH"
+    assert resolver.resolve("Madya Pradesh").method == "fuzzy"
+
+
+def test_results_are_cached_by_raw_input():
+    resolver = get_state_resolver()
+    assert resolver.resolve("  karnataka ") is resolver.resolve("  karnataka ")
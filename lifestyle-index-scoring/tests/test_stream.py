@@ -0,0 +1,95 @@
+# tests/test_stream.py
+
+import json
+
+import pytest
+
+from app.routers import score_router
+from app.services.asset_stream import IncrementalAssetParser
+from app.services.resilience import CircuitOpenError
+from benchmarks.fake_gemini import OUTPUTS
+
+ASSETS = ["AIR_CONDITIONER", "REFRIGERATOR", "SMART_TV"]
+
+
+# -----------------------------
+# Incremental asset parser
+# -----------------------------
+@pytest.mark.parametrize("shape", ["clean", "fenced", "prose"])
+def test_incremental_parser_at_every_split(shape):
+    text = OUTPUTS[shape]
+    for cut in range(len(text) + 1):
+        parser = IncrementalAssetParser()
+        found = parser.feed(text[:cut]) + parser.feed(text[cut:])
+        assert [a["name"] for a in found] == ASSETS, cut
+        assert parser.text == text
+
+
+def test_incremental_parser_char_by_char_with_escapes():
+    text = '{"notes": "\\"assets\\": [", "assets": [{"name": "A", "extra": {"q": "}\\"{"}}, {"name": "B"}]}'
+    parser = IncrementalAssetParser()
+    found = []
+    for ch in text:
+        found += parser.feed(ch)
+    assert [a["name"] for a in found] == ["A", "B"]
+    assert found[0]["extra"] == {"q": '}"{'}
+
+
+def test_incremental_parser_stops_at_end_of_array():
+    parser = IncrementalAssetParser()
+    assert parser.feed('{"assets": [{"name": "A"}], "other": [{"name": "B"}]}') == [{"name": "A"}]
+    assert parser.feed('{"name": "C"}') == []
+
+
+# -----------------------------
+# Streaming endpoint
+# -----------------------------
+def test_stream_ends_with_the_synchronous_result(api, photo, upload):
+    location = {"state": "Rajasthan", "city": "Jaipur"}
+    streamed = api("POST", "/score/lifestyle/stream", data=location, files=upload(photo))
+    assert streamed.status_code == 200
+    events = [json.loads(line) for line in streamed.text.splitlines()]
+    assert events[0]["event"] == "accepted"
+    assert [e["event"] for e in events[1:-1]] == ["asset"] * 3
+    assert events[-1]["event"] == "final"
+
+    direct = api("POST", "/score/lifestyle", data=location, files=upload(photo)).json()
+    assert events[-1]["result"]["lifestyle_index"] == direct["lifestyle_index"]
+    assert events[-1]["result"]["breakdown"] == direct["breakdown"]
+
+
+def test_stream_reports_model_errors_in_band(api, fake_gemini, settings, photo, upload):
+    # Schema calls always get clean JSON from the fake; free-form ones get the mix
+    settings(gemini_output_mode="freeform")
+    fake_gemini(outputs="empty")
+    response = api(
+        "POST",
+        "/score/lifestyle/stream",
+        data={"state": "Delhi"},
+        files=upload(photo),
+    )
+    assert response.status_code == 200
+    last = json.loads(response.text.splitlines()[-1])
+    assert last["event"] == "error"
+    assert last["status"] == 500
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [(RuntimeError("stream broke"), 500), (CircuitOpenError("gemini", 5.0), 503)],
+    ids=["unexpected", "circuit_open"],
+)
+def test_stream_closes_with_an_error_event_on_unexpected_failures(
+    api, monkeypatch, photo, upload, error, status
+):
+    async def failing(*args, **kwargs):
+        yield {"event": "accepted", "images": 1, "skipped_images": []}
+        raise error
+
+    monkeypatch.setattr(score_router, "stream_household", failing)
+    response = api("POST", "/score/lifestyle/stream", data={"state": "Goa"}, files=upload(photo))
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == ["accepted", "error"]
+    assert events[-1]["status"] == status
+    assert "stream broke" not in events[-1]["detail"]